@@ -6,12 +6,35 @@ import json
 import logging
 
 from app.ai.client import AIClient
-from app.ai.prompts import ANALYZER_SYSTEM, ANALYZER_PROMPT
+from app.ai.prompts import ANALYZER_SYSTEM, ANALYZER_PROMPT, ANALYZER_PROMPT_NO_CATEGORY
 from app.core.context import SEOData
 
 logger = logging.getLogger(__name__)
 
 
+def build_prompt_fields(game_data: dict, existing_categories: list[str] | None = None) -> dict:
+    """分析任务的模板字段（分析器与合并模式共用）"""
+    categories = existing_categories or ["uncategorized"]
+    return {
+        "game_name": game_data.get("name", ""),
+        "game_description": game_data.get("short_description", ""),
+        "developer": ", ".join(game_data.get("developers", [])),
+        "steam_tags": ", ".join(
+            g.get("description", "") for g in game_data.get("genres", [])
+        ),
+        "existing_categories": "\n".join(f"- {c}" for c in categories),
+    }
+
+
+def parse_analysis(result: dict) -> dict:
+    """把模型返回的 JSON 转为 {category, tags, seo}"""
+    return {
+        "category": result.get("category", "uncategorized"),
+        "tags": result.get("tags", []),
+        "seo": SEOData(**result.get("seo", {})),
+    }
+
+
 class AIAnalyzer:
     def __init__(self, ai_client: AIClient | None = None):
         self.client = ai_client or AIClient()
@@ -20,19 +43,18 @@ class AIAnalyzer:
         self,
         game_data: dict,
         existing_categories: list[str] | None = None,
+        with_category: bool = True,
     ) -> dict:
-        """一次 AI 调用返回 {category, tags, seo}"""
-        categories = existing_categories or ["uncategorized"]
-
-        prompt = ANALYZER_PROMPT.format(
-            game_name=game_data.get("name", ""),
-            game_description=game_data.get("short_description", ""),
-            developer=", ".join(game_data.get("developers", [])),
-            steam_tags=", ".join(
-                g.get("description", "") for g in game_data.get("genres", [])
-            ),
-            existing_categories="\n".join(f"- {c}" for c in categories),
-        )
+        """一次 AI 调用返回 {category, tags, seo}
+
+        with_category=False 时分类已在本地确定，prompt 不含分类任务，返回的 category 为 None。
+        """
+        fields = build_prompt_fields(game_data, existing_categories)
+        if with_category:
+            prompt = ANALYZER_PROMPT.format(**fields)
+        else:
+            fields.pop("existing_categories")
+            prompt = ANALYZER_PROMPT_NO_CATEGORY.format(**fields)
 
         raw = await self.client.chat(
             prompt=prompt,
@@ -45,13 +67,13 @@ class AIAnalyzer:
             result = json.loads(raw)
         except json.JSONDecodeError:
             logger.error(f"[AIAnalyzer] JSON 解析失败: {raw[:200]}")
-            return self._fallback(game_data)
+            result = self._fallback(game_data)
+        else:
+            result = parse_analysis(result)
 
-        return {
-            "category": result.get("category", "uncategorized"),
-            "tags": result.get("tags", []),
-            "seo": SEOData(**result.get("seo", {})),
-        }
+        if not with_category:
+            result["category"] = None
+        return result
 
     def _fallback(self, game_data: dict) -> dict:
         """AI 失败时的降级策略"""
@@ -0,0 +1,119 @@
+"""AI 后端列表与延迟统计
+
+主后端来自 ai_provider / ai_model / ai_api_key / ai_base_url，
+备用后端按顺序配置在 SC_AI_BACKENDS（JSON 数组），例如：
+[{"provider": "openai", "model": "gpt-4o-mini", "api_key": "sk-..."}]
+
+每个后端记录最近的请求耗时，hedge 模式用主后端的 p95 作为对冲等待时间。
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import Optional
+
+from pydantic import BaseModel, ValidationError
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 每个后端保留的延迟样本数
+_SAMPLE_SIZE = 200
+# 样本少于此数时 p95 不可信，使用 ai_hedge_delay
+_MIN_SAMPLES = 10
+# 对冲等待下限（秒），避免 p95 很低时几乎每次都双发
+_MIN_HEDGE_DELAY = 1.0
+
+
+class AIBackend(BaseModel):
+    """一个 LLM 后端"""
+    provider: str
+    model: str
+    api_key: str = ""
+    base_url: Optional[str] = None
+
+    @property
+    def model_id(self) -> str:
+        # litellm 格式: provider/model
+        return f"{self.provider}/{self.model}"
+
+
+class _LatencyStats:
+    """单个后端的耗时样本与成败计数"""
+
+    def __init__(self):
+        self.samples: deque[float] = deque(maxlen=_SAMPLE_SIZE)
+        self.successes = 0
+        self.failures = 0
+        self.hedges = 0      # 作为对冲请求被发起的次数
+        self.wins = 0        # 对冲竞争中胜出的次数
+
+    def percentile(self, q: float) -> float | None:
+        if len(self.samples) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def stats(self) -> dict:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "samples": len(self.samples),
+            "successes": self.successes,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+        }
+
+
+_latency: dict[str, _LatencyStats] = {}
+_invalid_warned: set[str] = set()
+
+
+def latency(model_id: str) -> _LatencyStats:
+    stats = _latency.get(model_id)
+    if stats is None:
+        stats = _latency[model_id] = _LatencyStats()
+    return stats
+
+
+def record_success(model_id: str, elapsed: float):
+    stats = latency(model_id)
+    stats.samples.append(elapsed)
+    stats.successes += 1
+
+
+def record_failure(model_id: str):
+    latency(model_id).failures += 1
+
+
+def hedge_delay(model_id: str) -> float:
+    """主后端超过此时间未返回时发起对冲请求"""
+    p95 = latency(model_id).percentile(0.95)
+    if p95 is None:
+        return settings.ai_hedge_delay
+    return max(p95, _MIN_HEDGE_DELAY)
+
+
+def configured_fallbacks() -> list[AIBackend]:
+    """解析 ai_backends 配置，无效条目跳过"""
+    backends = []
+    for raw in settings.ai_backends:
+        try:
+            backends.append(AIBackend(**raw))
+        except (TypeError, ValidationError):
+            if repr(raw) not in _invalid_warned:
+                _invalid_warned.add(repr(raw))
+                logger.warning(f"[AIBackends] 忽略无效后端配置（需 provider 和 model）: {raw}")
+    return backends
+
+
+def stats() -> dict:
+    return {
+        "mode": settings.ai_backend_mode,
+        "backends": {m: s.stats() for m, s in _latency.items()},
+    }
@@ -0,0 +1,221 @@
+"""AI Batch Analyzer - 多款游戏合并为一次分析请求
+
+队列 Worker 并发运行的多个任务在到达分析步骤时提交到这里，
+在 ai_batch_window 秒内（或凑满一批）打包成一次 LLM 请求，
+共用同一段系统提示和分类列表。返回结果按 app_id 分发回各任务。
+本地匹配器已确定分类的游戏（with_category=False）单独成组，prompt 不含分类任务。
+
+同时到达的游戏数不会超过 worker_concurrency，每批最多
+min(ai_batch_size, worker_concurrency) 款；只有一个 Worker 时不等待窗口，直接单款分析。
+结果解析失败或部分缺失时对剩余游戏对半拆分重试，单款时回退到 AIAnalyzer；
+请求本身失败（网络/接口错误）时整批报错，不拆分重试。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from app.ai import usage as ai_usage
+from app.ai.analyzer import AIAnalyzer, build_prompt_fields, parse_analysis
+from app.ai.client import AIClient
+from app.ai.prompts import (
+    ANALYZER_SYSTEM,
+    BATCH_ANALYZER_PROMPT,
+    BATCH_ANALYZER_PROMPT_NO_CATEGORY,
+    BATCH_GAME_ITEM,
+    BATCH_GAME_NAME_PLACEHOLDER,
+)
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (app_id, game_data, future, 提交时的调用记录上下文)
+_Item = tuple[int, dict, asyncio.Future, dict]
+# (是否包含分类任务, 分类列表)
+_GroupKey = tuple[bool, tuple[str, ...]]
+
+
+class BatchAnalyzer:
+    """按分类任务与分类列表分组，在时间窗口内收集待分析游戏"""
+
+    def __init__(self):
+        self._pending: dict[_GroupKey, list[_Item]] = {}
+        self._timers: dict[_GroupKey, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.games = 0
+        self.splits = 0
+
+    async def analyze(
+        self,
+        app_id: int,
+        game_data: dict,
+        existing_categories: list[str] | None = None,
+        with_category: bool = True,
+    ) -> dict:
+        """提交一款游戏，等待批量结果 {category, tags, seo}
+
+        with_category=False 时分类已在本地确定，返回的 category 为 None（同 AIAnalyzer）。
+        """
+        limit = self._batch_limit()
+        if limit <= 1:
+            # 不可能凑成批，不必等待窗口
+            return await AIAnalyzer().analyze(game_data, existing_categories or None, with_category)
+
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        # 不含分类任务时分类列表不进入 prompt，无需按列表分组
+        key: _GroupKey = (with_category, tuple(existing_categories or []) if with_category else ())
+
+        group = self._pending.setdefault(key, [])
+        group.append((app_id, game_data, fut, ai_usage.current_context()))
+        if len(group) >= limit:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(settings.ai_batch_window, self._flush, key)
+
+        return await fut
+
+    @staticmethod
+    def _batch_limit() -> int:
+        """每批上限：同时在分析步骤的游戏数不超过 Worker 并发数"""
+        return max(min(settings.ai_batch_size, settings.worker_concurrency), 1)
+
+    def _flush(self, key: _GroupKey):
+        """窗口到期或凑满一批：取出该组并后台执行"""
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        items = self._pending.pop(key, [])
+        if not items:
+            return
+
+        with_category, categories = key
+        task = asyncio.create_task(self._run(items, list(categories) or None, with_category))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, items: list[_Item], categories: Optional[list[str]], with_category: bool = True
+    ):
+        """执行一批；解析失败或缺失的结果对半拆分重试"""
+        items = [item for item in items if not item[2].done()]  # 等待者可能已被取消
+        if not items:
+            return
+
+        if len(items) == 1:
+            _, game_data, fut, call_ctx = items[0]
+            try:
+                with ai_usage.call_context(**call_ctx):
+                    result = await AIAnalyzer().analyze(game_data, categories, with_category)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+                return
+            if not fut.done():
+                fut.set_result(result)
+            return
+
+        try:
+            results = await self._analyze_batch(
+                [(a, g) for a, g, _, _ in items], categories, with_category
+            )
+        except Exception as e:
+            # 请求层面的错误拆分后大概率重复出现，直接整批报错
+            logger.error(f"[BatchAnalyzer] 批量请求失败 ({len(items)} 款): {e}")
+            for _, _, fut, _ in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        missing: list[_Item] = []
+        for item in items:
+            app_id, _, fut, _ = item
+            result = results.get(app_id)
+            if result is None:
+                missing.append(item)
+            elif not fut.done():
+                fut.set_result(result)
+
+        if missing:
+            self.splits += 1
+            mid = (len(missing) + 1) // 2
+            logger.warning(f"[BatchAnalyzer] {len(missing)}/{len(items)} 款无结果，拆分重试")
+            await asyncio.gather(
+                self._run(missing[:mid], categories, with_category),
+                self._run(missing[mid:], categories, with_category),
+            )
+
+    async def _analyze_batch(
+        self,
+        games: list[tuple[int, dict]],
+        categories: Optional[list[str]],
+        with_category: bool = True,
+    ) -> dict[int, dict]:
+        """一次 LLM 请求分析多款游戏，返回 {app_id: {category, tags, seo}}"""
+        game_blocks = []
+        for app_id, game_data in games:
+            fields = build_prompt_fields(game_data)
+            fields.pop("existing_categories")
+            game_blocks.append(BATCH_GAME_ITEM.format(app_id=app_id, **fields))
+
+        if with_category:
+            prompt = BATCH_ANALYZER_PROMPT.format(
+                game_name=BATCH_GAME_NAME_PLACEHOLDER,
+                games="\n\n".join(game_blocks),
+                existing_categories=build_prompt_fields({}, categories)["existing_categories"],
+            )
+        else:
+            prompt = BATCH_ANALYZER_PROMPT_NO_CATEGORY.format(
+                game_name=BATCH_GAME_NAME_PLACEHOLDER,
+                games="\n\n".join(game_blocks),
+            )
+
+        self.batches += 1
+        self.games += len(games)
+        logger.info(f"[BatchAnalyzer] 批量分析 {len(games)} 款游戏")
+        # 一次请求覆盖多条采集记录，不关联单个 record_id
+        with ai_usage.call_context(record_id=None, stage="analyze_batch"):
+            raw = await AIClient().chat(
+                prompt=prompt,
+                system=ANALYZER_SYSTEM,
+                json_mode=True,
+                temperature=0.3,
+            )
+
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.error(f"[BatchAnalyzer] JSON 解析失败: {raw[:200]}")
+            return {}
+
+        entries = data.get("results", []) if isinstance(data, dict) else data
+        if isinstance(entries, dict):
+            # 兼容 {"<app_id>": {...}} 形式
+            entries = [{"app_id": k, **v} for k, v in entries.items() if isinstance(v, dict)]
+
+        results: dict[int, dict] = {}
+        for entry in entries or []:
+            try:
+                result = parse_analysis(entry)
+                if not with_category:
+                    result["category"] = None
+                results[int(entry["app_id"])] = result
+            except (KeyError, TypeError, ValueError):
+                continue
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "games": self.games,
+            "splits": self.splits,
+            "pending": sum(len(g) for g in self._pending.values()),
+        }
+
+
+# 全局批量分析器（队列 Worker 的所有任务共享）
+batch_analyzer = BatchAnalyzer()
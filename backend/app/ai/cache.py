@@ -0,0 +1,55 @@
+"""LLM 响应缓存 - 内容寻址
+
+缓存键 = SHA-256(model, system, prompt, temperature, json_mode)，
+相同游戏数据的重试、预览后发布直接复用已付费的结果。
+需通过 SC_AI_CACHE_ENABLED 显式开启。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, system: str, prompt: str, temperature: float, json_mode: bool) -> str:
+    """计算请求内容哈希"""
+    raw = json.dumps(
+        [model, system, prompt, temperature, json_mode], ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def get_cached(key: str) -> str | None:
+    """读取缓存，未开启或读取失败时返回 None"""
+    if not settings.ai_cache_enabled:
+        return None
+
+    from app.db.engine import async_session
+    from app.db import crud
+
+    try:
+        async with async_session() as session:
+            return await crud.get_ai_cache(session, key)
+    except Exception as e:
+        logger.warning(f"[AICache] 读取失败: {e}")
+        return None
+
+
+async def store(key: str, model: str, response: str):
+    """写入缓存（空响应不缓存）"""
+    if not settings.ai_cache_enabled or not response:
+        return
+
+    from app.db.engine import async_session
+    from app.db import crud
+
+    try:
+        async with async_session() as session:
+            await crud.put_ai_cache(session, key, model, response, settings.ai_cache_max_entries)
+    except Exception as e:
+        logger.warning(f"[AICache] 写入失败: {e}")
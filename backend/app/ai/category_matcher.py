@@ -0,0 +1,195 @@
+"""本地分类匹配 - 分类确定时跳过 LLM 的分类任务
+
+从已完成的采集记录（category_id）和对应的 Steam appdetails 缓存中学习
+「Steam 类型 / 功能分类 / 开发商 → WordPress 分类」的映射表，
+新游戏按特征投票，置信度与样本数都达标时直接确定分类，
+分析 prompt 中不再附带分类列表和分类任务。
+
+学习只读取 steam_app_cache 表（采集记录本身不保存 Steam 类型等特征），
+SC_STEAM_CACHE_TTL=0 时 appdetails 不落库，映射表始终为空，所有游戏都交给 LLM 分类。
+
+NgramIndex 用于把 LLM 返回的分类名模糊匹配到 WordPress 已有分类。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 映射表重新加载间隔（秒）
+_REFRESH_INTERVAL = 600.0
+# 各类特征的投票权重：开发商通常固定在同一分类，功能分类（单人/成就…）区分度最低
+_FEATURE_WEIGHTS = {"genre": 1.0, "category": 0.3, "developer": 2.0}
+# 特征样本数达到此值时视为完全可信，少于此值按比例降低权重
+_FULL_SUPPORT = 10
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[\s\W_]+", "", name).lower()
+
+
+def _ngrams(text: str, n: int = 2) -> set[str]:
+    text = _normalize(text)
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex:
+    """分类名的字符 bigram 倒排索引，按 Dice 系数取最相似的名称"""
+
+    def __init__(self, names: dict[str, int]):
+        self._names = names
+        self._exact = {_normalize(n): n for n in names}
+        self._grams: dict[str, set[str]] = {n: _ngrams(n) for n in names}
+        self._index: dict[str, set[str]] = {}
+        for name, grams in self._grams.items():
+            for g in grams:
+                self._index.setdefault(g, set()).add(name)
+
+    def best(self, query: str, min_score: float = 0.5) -> tuple[str, int, float] | None:
+        """返回 (名称, ID, 相似度)，低于 min_score 返回 None"""
+        exact = self._exact.get(_normalize(query))
+        if exact is not None:
+            return exact, self._names[exact], 1.0
+
+        grams = _ngrams(query)
+        shared: Counter[str] = Counter()
+        for g in grams:
+            shared.update(self._index.get(g, ()))
+
+        best = None
+        for name, common in shared.items():
+            score = 2 * common / (len(grams) + len(self._grams[name]))
+            if score >= min_score and (best is None or score > best[2]):
+                best = (name, self._names[name], score)
+        return best
+
+
+def game_features(game_data: dict) -> list[str]:
+    """提取用于分类投票的特征"""
+    features = [f"genre:{g.get('description', '')}" for g in game_data.get("genres", [])]
+    features += [f"category:{c.get('description', '')}" for c in game_data.get("categories", [])]
+    features += [f"developer:{d}" for d in game_data.get("developers", [])]
+    return [f for f in features if not f.endswith(":")]
+
+
+class CategoryMatcher:
+    """基于历史记录的特征 → 分类映射"""
+
+    def __init__(self):
+        self._counts: dict[str, Counter[int]] = {}
+        self._samples = 0
+        self._loaded_at: float | None = None  # None = 尚未加载或已失效
+        self._lock: asyncio.Lock | None = None  # 惰性创建，绑定到运行中的事件循环
+        self.hits = 0
+        self.misses = 0
+
+    def learn(self, samples: list[tuple[int, dict]]):
+        """用 (category_id, appdetails) 样本重建映射表"""
+        counts: dict[str, Counter[int]] = {}
+        for category_id, game_data in samples:
+            for feature in set(game_features(game_data or {})):
+                counts.setdefault(feature, Counter())[category_id] += 1
+        self._counts = counts
+        self._samples = len(samples)
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < _REFRESH_INTERVAL
+
+    async def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._is_fresh():
+                return
+            if settings.steam_cache_ttl <= 0 and self._loaded_at is None:
+                logger.warning(
+                    "[CategoryMatcher] SC_STEAM_CACHE_TTL=0，appdetails 不写入缓存表，无法学习分类映射"
+                )
+
+            from app.db.engine import async_session
+            from app.db import crud
+
+            try:
+                async with async_session() as session:
+                    samples = await crud.list_category_samples(
+                        session, settings.steam_country_code, settings.steam_language
+                    )
+            except Exception as e:
+                logger.warning(f"[CategoryMatcher] 加载历史记录失败: {e}")
+                samples = []
+            self.learn(samples)
+            self._loaded_at = time.monotonic()
+            logger.info(f"[CategoryMatcher] 映射表已加载 | 样本={self._samples} 特征={len(self._counts)}")
+
+    def score(self, game_data: dict, valid_ids: set[int]) -> tuple[int, float, int] | None:
+        """返回 (分类 ID, 置信度, 支持样本数)；无可用特征时返回 None"""
+        scores: Counter[int] = Counter()
+        support: Counter[int] = Counter()
+        for feature in game_features(game_data):
+            counter = self._counts.get(feature)
+            if not counter:
+                continue
+            total = sum(counter.values())
+            weight = _FEATURE_WEIGHTS[feature.split(":", 1)[0]] * min(total, _FULL_SUPPORT) / _FULL_SUPPORT
+            for category_id, n in counter.items():
+                if category_id in valid_ids:
+                    scores[category_id] += weight * n / total
+                    support[category_id] += n
+
+        if not scores:
+            return None
+        category_id, top = scores.most_common(1)[0]
+        return category_id, top / sum(scores.values()), support[category_id]
+
+    async def match(self, game_data: dict, cat_name_to_id: dict[str, int]) -> tuple[str, int, float] | None:
+        """置信时返回 (分类名, 分类 ID, 置信度)，否则返回 None（交给 LLM）"""
+        if not settings.category_matcher_enabled:
+            return None
+        await self._ensure_loaded()
+
+        id_to_name = {i: n for n, i in cat_name_to_id.items()}
+        result = self.score(game_data, set(id_to_name))
+        if result is None:
+            self.misses += 1
+            return None
+
+        category_id, confidence, support = result
+        if confidence < settings.category_matcher_confidence or support < settings.category_matcher_min_samples:
+            self.misses += 1
+            logger.debug(
+                f"[CategoryMatcher] 不确定 → LLM | 候选 ID={category_id} "
+                f"置信度={confidence:.2f} 样本={support}"
+            )
+            return None
+
+        self.hits += 1
+        return id_to_name[category_id], category_id, confidence
+
+    def invalidate(self):
+        """下次匹配时重新加载映射表"""
+        self._loaded_at = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.category_matcher_enabled,
+            "learning": settings.steam_cache_ttl > 0,  # 学习依赖 appdetails 缓存表
+            "samples": self._samples,
+            "features": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 全局匹配器（映射表在进程内共享）
+category_matcher = CategoryMatcher()
@@ -1,25 +1,219 @@
 """AI Client - litellm 统一封装
 
 所有 AI 模块通过此 Client 调用 LLM，不直接使用 litellm。
+所有调用经过全局调度器 ai_scheduler：按 provider/model 限制并发、
+RPM / TPM 预算，按到达顺序排队，429 时抖动退避重试。
+多后端的切换 / 对冲见 AIClient 与 app/ai/backends.py。
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import time
+from collections import deque
+from typing import AsyncIterator
 
-import litellm
-from litellm import acompletion
-
+from app.ai import backends as ai_backends
+from app.ai import cache as ai_cache
+from app.ai import usage as ai_usage
+from app.ai.backends import AIBackend
+from app.ai.loader import ensure_litellm, is_loaded, load_litellm
+from app.ai.text import estimate_tokens
 from app.config import settings
+from app.core import cassette
 
 logger = logging.getLogger(__name__)
 
-# 关闭 litellm 自身日志（太啰嗦）
-litellm.suppress_debug_info = True
+# 预算窗口（秒）
+_WINDOW = 60.0
+# 提交前无法得知输出长度，先按此预留，完成后以实际用量修正
+_OUTPUT_TOKENS_RESERVE = 600
+
+
+class _Slot:
+    """一次已放行的调用：持有并发名额，记录计入 TPM 的 token 数"""
+
+    def __init__(self, budget: _ModelBudget, entry: list):
+        self._budget = budget
+        self._entry = entry  # [时间戳, token 数]，位于预算窗口中
+        self._released = False
+
+    def set_tokens(self, tokens: int):
+        """用实际用量修正预估值"""
+        if tokens > 0:
+            self._entry[1] = tokens
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._budget.release()
+
+
+class _ModelBudget:
+    """单个 provider/model 的并发与 RPM/TPM 滑动窗口"""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self._lock: asyncio.Lock | None = None  # 惰性创建，绑定到运行中的事件循环
+        self._window: deque[list] = deque()
+        self._blocked_until = 0.0
+        self._active = 0
+        self._released: asyncio.Event | None = None
+        self._waiting = 0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _prune(self, now: float):
+        while self._window and now - self._window[0][0] >= _WINDOW:
+            self._window.popleft()
+
+    def _next_wait(self, now: float, tokens: int) -> float | None:
+        """队首还需等待的秒数；None 表示需等待并发名额释放"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        limit = settings.ai_max_concurrency
+        if limit and self._active >= limit:
+            return None
+
+        rpm = settings.ai_rpm
+        if rpm and len(self._window) >= rpm:
+            return self._window[-rpm][0] + _WINDOW - now
+
+        tpm = settings.ai_tpm
+        if tpm and self._window:
+            used = sum(t for _, t in self._window)
+            # 单次请求超过整个 TPM 时，等窗口清空后放行，避免永久阻塞
+            excess = used + min(tokens, tpm) - tpm
+            if excess > 0:
+                for ts, t in self._window:
+                    excess -= t
+                    if excess <= 0:
+                        return ts + _WINDOW - now
+        return 0.0
+
+    async def acquire(self, tokens: int) -> _Slot:
+        """按到达顺序排队，直到并发、RPM、TPM 均有余量"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._released = asyncio.Event()
+
+        self._waiting += 1
+        start = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._prune(now)
+                    wait = self._next_wait(now, tokens)
+                    if wait is None:
+                        self._released.clear()
+                        await self._released.wait()
+                    elif wait > 0:
+                        await asyncio.sleep(wait)
+                    else:
+                        break
+                entry = [time.monotonic(), tokens]
+                self._window.append(entry)
+                self._active += 1
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - start
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if waited > 1:
+            logger.info(f"[AIScheduler] {self.model_id} 排队 {waited:.1f}s")
+        return _Slot(self, entry)
+
+    def release(self):
+        self._active -= 1
+        if self._released is not None:
+            self._released.set()
+
+    def penalize(self, delay: float):
+        """收到 429：暂停该模型的所有新请求"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self.throttled += 1
+        logger.warning(f"[AIScheduler] {self.model_id} 被限流，暂停 {delay:.1f}s（累计 {self.throttled} 次）")
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._prune(now)
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "requests_last_minute": len(self._window),
+            "tokens_last_minute": sum(t for _, t in self._window),
+            "blocked_for": round(max(self._blocked_until - now, 0.0), 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "avg_wait": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+
+class AIScheduler:
+    """全局 LLM 调度器，每个 provider/model 一份预算"""
+
+    def __init__(self):
+        self._budgets: dict[str, _ModelBudget] = {}
+
+    def _budget(self, model_id: str) -> _ModelBudget:
+        budget = self._budgets.get(model_id)
+        if budget is None:
+            budget = self._budgets[model_id] = _ModelBudget(model_id)
+        return budget
+
+    async def acquire(self, model_id: str, tokens: int) -> _Slot:
+        return await self._budget(model_id).acquire(tokens)
+
+    def backoff(self, model_id: str, error: Exception, attempt: int) -> bool:
+        """429 处理：暂停该模型并返回是否继续重试"""
+        if attempt >= settings.ai_max_retries:
+            return False
+        delay = _retry_after(error)
+        if delay is None:
+            # 指数退避 + 抖动，避免并发任务同时重试
+            delay = min(2.0 ** attempt * 2, 60.0) * random.uniform(0.5, 1.5)
+        self._budget(model_id).penalize(delay)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": settings.ai_max_concurrency,
+            "rpm": settings.ai_rpm,
+            "tpm": settings.ai_tpm,
+            "models": {m: b.stats() for m, b in self._budgets.items()},
+        }
+
+
+def _retry_after(error: Exception) -> float | None:
+    """从 429 响应读取 Retry-After（秒）"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+    return min(max(value, 0.5), 120.0)
+
+
+# 全局调度器（所有 AIClient 实例共享）
+ai_scheduler = AIScheduler()
 
 
 class AIClient:
-    """统一 AI 调用层"""
+    """统一 AI 调用层
+
+    除主后端外可配置有序的备用后端（SC_AI_BACKENDS），由 ai_backend_mode 决定：
+    - failover：主后端出错（含 429 重试耗尽）时依次切换到下一个
+    - hedge：主后端超过其 p95 耗时仍未返回时，并发请求下一个后端，取先完成者并取消其余
+    """
 
     def __init__(
         self,
@@ -27,43 +221,298 @@ class AIClient:
         model: str | None = None,
         api_key: str | None = None,
         base_url: str | None = None,
+        fallbacks: list[AIBackend] | None = None,
     ):
         self.provider = provider or settings.ai_provider
         self.model = model or settings.ai_model
         self.api_key = api_key or settings.ai_api_key
         self.base_url = base_url or settings.ai_base_url
 
-        # litellm 格式: provider/model
-        self._model_id = f"{self.provider}/{self.model}"
+        primary = AIBackend(
+            provider=self.provider, model=self.model, api_key=self.api_key, base_url=self.base_url
+        )
+        if fallbacks is None:
+            fallbacks = ai_backends.configured_fallbacks()
+        self.backends = [primary] + [b for b in fallbacks if b.model_id != primary.model_id]
 
-    async def chat(
-        self,
-        prompt: str,
-        system: str = "",
-        json_mode: bool = False,
-        temperature: float = 0.7,
-    ) -> str:
-        """发送聊天请求，返回文本"""
+        # litellm 格式: provider/model（缓存键始终用主后端，与实际应答的后端无关）
+        self._model_id = primary.model_id
+
+    @staticmethod
+    def _build_kwargs(
+        backend: AIBackend, prompt: str, system: str, json_mode: bool, temperature: float
+    ) -> dict:
+        """构造 litellm acompletion 参数"""
         messages = []
         if system:
             messages.append({"role": "system", "content": system})
         messages.append({"role": "user", "content": prompt})
 
         kwargs = {
-            "model": self._model_id,
+            "model": backend.model_id,
             "messages": messages,
             "temperature": temperature,
-            "api_key": self.api_key,
+            "api_key": backend.api_key,
         }
 
-        if self.base_url:
-            kwargs["api_base"] = self.base_url
+        if backend.base_url:
+            kwargs["api_base"] = backend.base_url
 
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    @staticmethod
+    async def _complete(backend: AIBackend, kwargs: dict, tokens: int) -> tuple:
+        """经调度器排队后调用 acompletion，429 时退避重试
+
+        返回 (response, slot)，调用方用完响应后需 slot.release()。
+        """
+        attempt = 0
+        while True:
+            slot = await ai_scheduler.acquire(backend.model_id, tokens)
+            try:
+                return await acompletion(**kwargs), slot
+            except BaseException as e:
+                slot.release()
+                if not _is_rate_limit(e) or not ai_scheduler.backoff(backend.model_id, e, attempt):
+                    raise
+                attempt += 1
+
+    async def _chat_backend(
+        self, backend: AIBackend, prompt: str, system: str, json_mode: bool, temperature: float
+    ) -> str:
+        """向单个后端发送请求并记录耗时"""
+        kwargs = self._build_kwargs(backend, prompt, system, json_mode, temperature)
+        start = time.monotonic()
+        try:
+            response, slot = await self._complete(backend, kwargs, _estimate_request(prompt, system))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ai_backends.record_failure(backend.model_id)
+            await ai_usage.record_call(
+                backend.model_id, status="error", latency=time.monotonic() - start, error=str(e)
+            )
+            raise
+        try:
+            content = response.choices[0].message.content
+            usage = getattr(response, "usage", None)
+            slot.set_tokens(getattr(usage, "total_tokens", 0) or 0)
+        finally:
+            slot.release()
+        elapsed = time.monotonic() - start
+        ai_backends.record_success(backend.model_id, elapsed)
+
+        # 响应未带 usage 时按字符估算
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or estimate_tokens(system) + estimate_tokens(prompt)
+        completion_tokens = getattr(usage, "completion_tokens", 0) or estimate_tokens(content or "")
+        logger.info(
+            f"[AIClient] {backend.model_id} 完成 | {elapsed:.2f}s | "
+            f"tokens={prompt_tokens}+{completion_tokens}"
+        )
+        await ai_usage.record_call(
+            backend.model_id,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency=elapsed,
+        )
+        return content
+
+    async def _race(self, prompt: str, system: str, json_mode: bool, temperature: float) -> str:
+        """按 ai_backend_mode 在多个后端间切换或对冲"""
+        hedge = settings.ai_backend_mode == "hedge"
+        pending: dict[asyncio.Task, AIBackend] = {}
+        next_index = 0
+        last_error: BaseException | None = None
+
+        def launch():
+            nonlocal next_index
+            backend = self.backends[next_index]
+            next_index += 1
+            if next_index > 1:
+                if pending:
+                    ai_backends.latency(backend.model_id).hedges += 1
+                    logger.info(f"[AIClient] 对冲请求 → {backend.model_id}")
+                else:
+                    logger.warning(f"[AIClient] 切换到备用后端 → {backend.model_id}")
+            task = asyncio.ensure_future(
+                self._chat_backend(backend, prompt, system, json_mode, temperature)
+            )
+            pending[task] = backend
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if hedge and next_index < len(self.backends):
+                    timeout = ai_backends.hedge_delay(self.backends[next_index - 1].model_id)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        if hedge and next_index > 1:
+                            ai_backends.latency(backend.model_id).wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"[AIClient] {backend.model_id} 请求失败: {last_error}")
+
+                # 对冲等待超时，或所有进行中的请求都失败：启用下一个后端
+                if next_index < len(self.backends) and (not done or not pending):
+                    launch()
+        finally:
+            # 取消落后者（其调度名额在 _complete 中释放）
+            for task in pending:
+                task.cancel()
+
+        assert last_error is not None
+        raise last_error
+
+    async def chat(
+        self,
+        prompt: str,
+        system: str = "",
+        json_mode: bool = False,
+        temperature: float = 0.7,
+        cache: bool = True,
+    ) -> str:
+        """发送聊天请求，返回文本
+
+        cache=False 时跳过响应缓存（既不读也不写）。
+        """
+        key = ai_cache.cache_key(self._model_id, system, prompt, temperature, json_mode)
+        if cache:
+            cached = await ai_cache.get_cached(key)
+            if cached is not None:
+                logger.info(f"[AIClient] 缓存命中 {self._model_id} | json={json_mode}")
+                await ai_usage.record_call(self._model_id, status="cached")
+                return cached
 
         logger.info(f"[AIClient] 调用 {self._model_id} | json={json_mode}")
-        response = await acompletion(**kwargs)
-        content = response.choices[0].message.content
+        if len(self.backends) == 1:
+            content = await self._chat_backend(self.backends[0], prompt, system, json_mode, temperature)
+        else:
+            content = await self._race(prompt, system, json_mode, temperature)
         logger.debug(f"[AIClient] 响应长度: {len(content)} 字符")
+
+        if cache:
+            await ai_cache.store(key, self._model_id, content)
         return content
+
+    async def _open_stream(self, prompt: str, system: str, temperature: float, tokens: int) -> tuple:
+        """打开流式响应；建立连接前出错时依次切换后端（流式不做对冲）"""
+        last_error: Exception | None = None
+        for i, backend in enumerate(self.backends):
+            if i:
+                logger.warning(f"[AIClient] 切换到备用后端 → {backend.model_id}")
+            kwargs = self._build_kwargs(backend, prompt, system, False, temperature)
+            kwargs["stream"] = True
+            start = time.monotonic()
+            try:
+                response, slot = await self._complete(backend, kwargs, tokens)
+                return backend, response, slot
+            except Exception as e:
+                ai_backends.record_failure(backend.model_id)
+                await ai_usage.record_call(
+                    backend.model_id, status="error", latency=time.monotonic() - start, error=str(e)
+                )
+                logger.warning(f"[AIClient] {backend.model_id} 请求失败: {e}")
+                last_error = e
+        assert last_error is not None
+        raise last_error
+
+    async def chat_stream(
+        self,
+        prompt: str,
+        system: str = "",
+        temperature: float = 0.7,
+        cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """流式聊天请求，逐段产出文本增量
+
+        调用方可随时停止迭代以提前终止生成；
+        只有完整读完的响应才会写入缓存，缓存命中时一次性产出全文。
+        """
+        key = ai_cache.cache_key(self._model_id, system, prompt, temperature, False)
+        if cache:
+            cached = await ai_cache.get_cached(key)
+            if cached is not None:
+                logger.info(f"[AIClient] 缓存命中 {self._model_id} | stream")
+                await ai_usage.record_call(self._model_id, status="cached")
+                yield cached
+                return
+
+        logger.info(f"[AIClient] 流式调用 {self._model_id}")
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+        start = time.monotonic()
+        backend, response, slot = await self._open_stream(
+            prompt, system, temperature, prompt_tokens + _OUTPUT_TOKENS_RESERVE
+        )
+        parts: list[str] = []
+        ttft: float | None = None
+        completed = False
+        error: str | None = None
+        try:
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                    parts.append(delta)
+                    yield delta
+            completed = True
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            if not completed and error is None:
+                # 调用方提前终止：关闭底层连接，停止生成
+                aclose = getattr(response, "aclose", None)
+                if aclose is not None:
+                    try:
+                        await aclose()
+                    except Exception:
+                        pass
+                logger.info(f"[AIClient] 流式响应提前终止 | 已接收 {sum(map(len, parts))} 字符")
+            # 流式响应不带 usage，按字符估算
+            completion_tokens = estimate_tokens("".join(parts))
+            slot.set_tokens(prompt_tokens + completion_tokens)
+            slot.release()
+            await ai_usage.record_call(
+                backend.model_id,
+                status="error" if error else "ok",
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency=time.monotonic() - start,
+                ttft=ttft,
+                error=error,
+            )
+
+        content = "".join(parts)
+        logger.debug(f"[AIClient] 响应长度: {len(content)} 字符")
+        if cache:
+            await ai_cache.store(key, self._model_id, content)
+
+
+async def acompletion(**kwargs):
+    """litellm.acompletion（首次调用时加载 litellm；录制/回放模式下经过 cassette）"""
+    if cassette.is_recording() or cassette.is_replaying():
+        return await cassette.llm_completion(kwargs, _litellm_acompletion)
+    return await _litellm_acompletion(kwargs)
+
+
+async def _litellm_acompletion(kwargs: dict):
+    litellm = await ensure_litellm()
+    return await litellm.acompletion(**kwargs)
+
+
+def _is_rate_limit(error: BaseException) -> bool:
+    return is_loaded() and isinstance(error, load_litellm().RateLimitError)
+
+
+def _estimate_request(prompt: str, system: str) -> int:
+    """预估一次请求的 token 数（输入 + 输出预留）"""
+    return estimate_tokens(system) + estimate_tokens(prompt) + _OUTPUT_TOKENS_RESERVE
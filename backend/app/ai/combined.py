@@ -0,0 +1,56 @@
+"""AI Combined - 一次调用完成分类+标签+SEO+改写
+
+合并分析器与改写器的两次请求，返回结构化 JSON。
+解析失败时返回 None，由调用方回退到两次调用的流程。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+
+from app.ai.analyzer import build_prompt_fields, parse_analysis
+from app.ai.client import AIClient
+from app.ai.prompts import COMBINED_SYSTEM, COMBINED_PROMPT
+from app.ai.rewriter import build_rewrite_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class AICombined:
+    def __init__(self, ai_client: AIClient | None = None):
+        self.client = ai_client or AIClient()
+
+    async def analyze_and_rewrite(
+        self,
+        game_data: dict,
+        existing_categories: list[str] | None = None,
+        style: str = "resource_site",
+    ) -> dict | None:
+        """返回 {category, tags, seo, content}，失败返回 None"""
+        prompt = COMBINED_PROMPT.format(
+            **build_prompt_fields(game_data, existing_categories),
+            rewrite_prompt=build_rewrite_prompt(game_data, style),
+        )
+
+        raw = await self.client.chat(
+            prompt=prompt,
+            system=COMBINED_SYSTEM,
+            json_mode=True,
+            temperature=0.7,
+        )
+
+        try:
+            result = json.loads(raw)
+            content = str(result.get("content") or "").strip()
+            parsed = parse_analysis(result)
+        except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+            logger.error(f"[AICombined] JSON 解析失败: {raw[:200]}")
+            return None
+
+        if not content:
+            logger.error("[AICombined] 响应缺少改写内容")
+            return None
+
+        parsed["content"] = content
+        return parsed
@@ -0,0 +1,51 @@
+"""litellm 延迟加载
+
+litellm 导入耗时数秒且常驻内存较大，AI 层不在模块导入时加载它，
+而是在第一次调用时（或启动后的后台预热中）才导入。
+异步路径统一通过 ensure_litellm() 在线程中导入，避免阻塞事件循环。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+_litellm: ModuleType | None = None
+
+
+def load_litellm() -> ModuleType:
+    """同步导入 litellm（已加载时直接返回）"""
+    global _litellm
+    if _litellm is None:
+        start = time.monotonic()
+        import litellm
+
+        # 关闭 litellm 自身日志（太啰嗦）
+        litellm.suppress_debug_info = True
+        _litellm = litellm
+        logger.info(f"[AILoader] litellm 已加载 ({time.monotonic() - start:.2f}s)")
+    return _litellm
+
+
+def is_loaded() -> bool:
+    return _litellm is not None
+
+
+async def ensure_litellm() -> ModuleType:
+    """在线程中导入 litellm，并发调用会等待同一次导入完成"""
+    if _litellm is not None:
+        return _litellm
+    return await asyncio.to_thread(load_litellm)
+
+
+async def preload():
+    """后台预热：服务开始接收请求后加载 litellm"""
+    await asyncio.sleep(0)  # 让出事件循环，等 lifespan 启动阶段完成
+    try:
+        await ensure_litellm()
+    except Exception as e:
+        logger.warning(f"[AILoader] litellm 预加载失败: {e}")
@@ -2,26 +2,34 @@
 
 ANALYZER_SYSTEM = "你是一位专业的游戏资源站编辑，精通游戏分类、SEO优化和标签提取。"
 
-ANALYZER_PROMPT = """请根据以下游戏信息，完成三项任务，以JSON格式返回结果。
-
-## 任务1：分类匹配
+# 分析任务规则（单个、合并、批量模式共用）
+_CATEGORY_RULES = """分类匹配
 从【给定分类列表】中选择最适合的一个分类。
-规则：只能从列表中选择，不能创建新分类。无法匹配时返回"uncategorized"。
+规则：只能从列表中选择，不能创建新分类。无法匹配时返回"uncategorized"。"""
 
-## 任务2：标签提取
+_TAG_RULES = """标签提取
 提取5-8个最相关的关键词作为文章标签。
 规则：
 - 标签简洁，2-6个字
 - 包含资源相关标签（如"PC游戏下载"、"全DLC"、"免安装"、"中文版"）
 - 包含游戏类型和玩法标签
-- 不包含过于宽泛的词（如"游戏"、"好玩"）
+- 不包含过于宽泛的词（如"游戏"、"好玩"）"""
 
-## 任务3：SEO生成
+_SEO_RULES = """SEO生成
 生成适合资源下载站的SEO元数据。
 规则：
 - SEO标题(≤60字)：格式"{game_name}下载|全DLC+中文版|免安装绿色版"
 - Meta描述(≤160字)：包含"下载"、"破解"、"绿色版"等资源站关键词，突出游戏特色
-- Focus关键词(3-5个,逗号分隔)：包含"{game_name}下载"、"{game_name}破解版"等长尾词
+- Focus关键词(3-5个,逗号分隔)：包含"{game_name}下载"、"{game_name}破解版"等长尾词"""
+
+_ANALYZER_RULES = (
+    "## 任务1：" + _CATEGORY_RULES
+    + "\n\n## 任务2：" + _TAG_RULES
+    + "\n\n## 任务3：" + _SEO_RULES
+)
+
+# 分析任务正文（分析器与合并模式共用）
+_ANALYZER_TASKS = _ANALYZER_RULES + """
 
 ## 游戏信息
 游戏名称：{game_name}
@@ -30,10 +38,75 @@ ANALYZER_PROMPT = """请根据以下游戏信息，完成三项任务，以JSON
 Steam标签：{steam_tags}
 
 ## 给定分类列表
-{existing_categories}
+{existing_categories}"""
+
+ANALYZER_PROMPT = (
+    "请根据以下游戏信息，完成三项任务，以JSON格式返回结果。\n\n"
+    + _ANALYZER_TASKS
+    + """
 
 ## 返回格式（严格JSON，不要任何多余文字）
 {{"category": "分类名称", "tags": ["标签1", "标签2"], "seo": {{"title": "SEO标题", "description": "Meta描述", "keywords": "关键词1,关键词2,关键词3"}}}}"""
+)
+
+
+# 分类已由本地匹配器确定时使用：省去分类列表与分类任务
+ANALYZER_PROMPT_NO_CATEGORY = (
+    "请根据以下游戏信息，完成两项任务，以JSON格式返回结果。\n\n"
+    + "## 任务1：" + _TAG_RULES
+    + "\n\n## 任务2：" + _SEO_RULES
+    + """
+
+## 游戏信息
+游戏名称：{game_name}
+游戏描述：{game_description}
+开发商：{developer}
+Steam标签：{steam_tags}
+
+## 返回格式（严格JSON，不要任何多余文字）
+{{"tags": ["标签1", "标签2"], "seo": {{"title": "SEO标题", "description": "Meta描述", "keywords": "关键词1,关键词2,关键词3"}}}}"""
+)
+
+
+# ---- 批量模式：一次请求分析多款游戏 ----
+
+# 规则中的 {game_name} 以占位文字代替，由模型按每款游戏替换
+BATCH_GAME_NAME_PLACEHOLDER = "<游戏名称>"
+
+BATCH_ANALYZER_PROMPT = (
+    "请为下面【游戏列表】中的每一款游戏分别完成三项任务，以JSON格式返回结果。\n\n"
+    + _ANALYZER_RULES
+    + """
+
+## 游戏列表
+{games}
+
+## 给定分类列表
+{existing_categories}
+
+## 返回格式（严格JSON，不要任何多余文字；results 中每款游戏一项，app_id 与游戏列表一致）
+{{"results": [{{"app_id": 123, "category": "分类名称", "tags": ["标签1", "标签2"], "seo": {{"title": "SEO标题", "description": "Meta描述", "keywords": "关键词1,关键词2,关键词3"}}}}]}}"""
+)
+
+# 批量模式下分类已由本地匹配器确定
+BATCH_ANALYZER_PROMPT_NO_CATEGORY = (
+    "请为下面【游戏列表】中的每一款游戏分别完成两项任务，以JSON格式返回结果。\n\n"
+    + "## 任务1：" + _TAG_RULES
+    + "\n\n## 任务2：" + _SEO_RULES
+    + """
+
+## 游戏列表
+{games}
+
+## 返回格式（严格JSON，不要任何多余文字；results 中每款游戏一项，app_id 与游戏列表一致）
+{{"results": [{{"app_id": 123, "tags": ["标签1", "标签2"], "seo": {{"title": "SEO标题", "description": "Meta描述", "keywords": "关键词1,关键词2,关键词3"}}}}]}}"""
+)
+
+BATCH_GAME_ITEM = """### app_id={app_id}
+游戏名称：{game_name}
+游戏描述：{game_description}
+开发商：{developer}
+Steam标签：{steam_tags}"""
 
 
 REWRITER_SYSTEM = "你是一位专业的游戏资源站编辑。"
@@ -96,3 +169,23 @@ REWRITE_TEMPLATES = {
 
 请输出概述：""",
 }
+
+
+# ---- 合并模式：一次调用完成分析 + 改写 ----
+
+COMBINED_SYSTEM = "你是一位专业的游戏资源站编辑，精通游戏分类、SEO优化、标签提取和文案改写。"
+
+COMBINED_PROMPT = (
+    "请根据以下游戏信息，完成四项任务，以JSON格式返回结果。\n\n"
+    + _ANALYZER_TASKS
+    + """
+
+## 任务4：内容改写
+按照下面的改写要求完成改写，改写结果放入 "content" 字段（纯文本，段落之间用空行分隔）：
+---
+{rewrite_prompt}
+---
+
+## 返回格式（严格JSON，不要任何多余文字）
+{{"category": "分类名称", "tags": ["标签1", "标签2"], "seo": {{"title": "SEO标题", "description": "Meta描述", "keywords": "关键词1,关键词2,关键词3"}}, "content": "改写后的正文"}}"""
+)
@@ -3,13 +3,30 @@
 from __future__ import annotations
 
 import logging
-import re
+from typing import Callable
 
 from app.ai.client import AIClient
 from app.ai.prompts import REWRITER_SYSTEM, REWRITE_TEMPLATES
+from app.ai.text import compact_description
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+ProgressCallback = Callable[[int], None]
+
+
+def build_rewrite_prompt(game_data: dict, style: str = "resource_site") -> str:
+    """渲染改写模板（改写器与合并模式共用）"""
+    template = REWRITE_TEMPLATES.get(style, REWRITE_TEMPLATES["resource_site"])
+    original = game_data.get("detailed_description", "")
+    # 解析 HTML、去噪并按句子边界截断到 token 预算
+    original_clean = compact_description(original, settings.ai_rewrite_input_tokens)
+
+    return template.format(
+        game_name=game_data.get("name", ""),
+        original_description=original_clean,
+    )
+
 
 class AIRewriter:
     def __init__(self, ai_client: AIClient | None = None):
@@ -17,15 +34,7 @@ class AIRewriter:
 
     async def rewrite(self, game_data: dict, style: str = "resource_site") -> str:
         """改写游戏描述"""
-        template = REWRITE_TEMPLATES.get(style, REWRITE_TEMPLATES["resource_site"])
-        original = game_data.get("detailed_description", "")
-        # 去除 HTML 标签
-        original_clean = re.sub(r"<[^>]+>", "", original)
-
-        prompt = template.format(
-            game_name=game_data.get("name", ""),
-            original_description=original_clean[:3000],  # 限制输入长度
-        )
+        prompt = build_rewrite_prompt(game_data, style)
 
         content = await self.client.chat(
             prompt=prompt,
@@ -33,3 +42,41 @@ class AIRewriter:
             temperature=0.8,
         )
         return content.strip()
+
+    async def rewrite_stream(
+        self,
+        game_data: dict,
+        style: str = "resource_site",
+        on_progress: ProgressCallback | None = None,
+        max_chars: int = 0,
+    ) -> str:
+        """流式改写：每收到增量回调 on_progress(已生成字数)，超过 max_chars 提前终止"""
+        prompt = build_rewrite_prompt(game_data, style)
+
+        parts: list[str] = []
+        length = 0
+        truncated = False
+        stream = self.client.chat_stream(prompt=prompt, system=REWRITER_SYSTEM, temperature=0.8)
+        try:
+            async for delta in stream:
+                parts.append(delta)
+                length += len(delta)
+                if on_progress:
+                    on_progress(length)
+                if max_chars and length >= max_chars:
+                    truncated = True
+                    break
+        finally:
+            await stream.aclose()
+
+        content = "".join(parts).strip()
+        if truncated:
+            logger.warning(f"[AIRewriter] 生成超过 {max_chars} 字，已提前终止")
+            content = _trim_to_boundary(content[:max_chars])
+        return content
+
+
+def _trim_to_boundary(text: str) -> str:
+    """截断后的文本回退到最后一个完整句子"""
+    cut = max(text.rfind(p) for p in ("。", "！", "？", "\n", ".", "!", "?"))
+    return text[:cut + 1].strip() if cut > 0 else text
@@ -0,0 +1,179 @@
+"""Prompt 文本预处理 - 清洗 Steam 描述并按 token 预算截断
+
+detailed_description 是 Steam 商店页的 HTML，直接按字符截断会浪费 token
+（空白、实体、图片容器、宣传语），还可能截在半句话中间。
+这里解析 HTML → 解码实体 → 压缩空白 → 去重/去噪 → 按句子边界截断到 token 预算。
+"""
+
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+
+# 块级标签：前后换行
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "tr", "table", "blockquote", "section",
+}
+# 无结束标签的元素（HTML void elements）
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+# 整段丢弃的标签（脚本、样式、图片说明、视频）
+_SKIP_TAGS = {"script", "style", "figcaption", "video", "iframe", "noscript"}
+# class 中包含这些关键字的元素视为图片说明
+_CAPTION_CLASSES = ("caption", "bb_img_ctn")
+
+# 宣传/引导类噪声行（含商店页固定标题）；只判定短行，正文段落提到 YouTube 等不受影响
+_NOISE_MAX_TOKENS = 24
+_NOISE_RE = re.compile(
+    r"^(关于这款游戏|about this game)$|愿望单|加入.{0,6}(社区|群)|关注我们|discord|twitter|facebook|youtube|weibo|微博|"
+    r"wishlist|follow us|join our|https?://|www\.",
+    re.IGNORECASE,
+)
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE)
+
+_CJK_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+# 句末标点（中英文），保留标点本身
+_SENTENCE_RE = re.compile(r"[^。！？!?.；;\n]+[。！？!?.；;]*")
+
+
+class _TextExtractor(HTMLParser):
+    """提取可见文本，块级标签转为换行"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)  # 自动解码 &amp; &nbsp; 等实体
+        self.parts: list[str] = []
+        # 正在跳过的元素：只统计同名标签的嵌套层数，
+        # 内部的 <source> 等无结束标签的元素不影响跳过范围
+        self._skip_tag: str | None = None
+        self._skip_depth = 0
+
+    def _is_skipped(self, tag: str, attrs: list[tuple[str, str | None]]) -> bool:
+        if tag in _SKIP_TAGS:
+            return True
+        css = dict(attrs).get("class") or ""
+        return any(c in css for c in _CAPTION_CLASSES)
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in _VOID_TAGS:
+            if tag in _BLOCK_TAGS:
+                self.parts.append("\n")
+            return
+        if self._is_skipped(tag, attrs):
+            self._skip_tag = tag
+            self._skip_depth = 1
+            return
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag in _BLOCK_TAGS and tag not in _VOID_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_tag is None:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """HTML → 纯文本（保留段落换行）"""
+    parser = _TextExtractor()
+    parser.feed(html or "")
+    parser.close()
+    return "".join(parser.parts)
+
+
+def _is_noise(line: str) -> bool:
+    return estimate_tokens(line) <= _NOISE_MAX_TOKENS and _NOISE_RE.search(line) is not None
+
+
+def clean_lines(text: str) -> list[str]:
+    """压缩空白、去除噪声行和重复行"""
+    lines: list[str] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if len(line) < 2 or _is_noise(line):
+            continue
+        # 正文中的链接对改写无用
+        line = re.sub(r"\s+", " ", _URL_RE.sub("", line)).strip()
+        if len(line) < 2:
+            continue
+        key = re.sub(r"\W+", "", line).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数
+
+    主流中文模型（DeepSeek / GPT-4o 等）约 1 个汉字 ≈ 1 token 以内，
+    拉丁文约 4 个字符 ≈ 1 token；按偏保守的比例估算。
+    """
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """按句子边界截断到 token 预算内"""
+    if estimate_tokens(text) <= budget:
+        return text
+
+    kept: list[str] = []
+    used = 0
+    for line in text.split("\n"):
+        sentences = _SENTENCE_RE.findall(line)
+        line_out = ""
+        for sentence in sentences:
+            cost = estimate_tokens(sentence)
+            if used + cost > budget:
+                break
+            line_out += sentence
+            used += cost
+        else:
+            kept.append(line_out)
+            continue
+        if line_out:
+            kept.append(line_out)
+        break
+
+    if not kept:
+        # 第一句就超出预算：只能按字符硬截断（按同样的估算累计）
+        return _cut_to_tokens(text, budget)
+    return "\n".join(kept).strip()
+
+
+def _cut_to_tokens(text: str, budget: int) -> str:
+    """取不超过预算的最长前缀"""
+    cjk = other = 0
+    for i, ch in enumerate(text):
+        if _CJK_RE.match(ch):
+            cjk += 1
+        else:
+            other += 1
+        if cjk + (other + 3) // 4 > budget:
+            return text[:i]
+    return text
+
+
+def compact_description(html: str, token_budget: int) -> str:
+    """Steam 详细描述 → 适合放进 prompt 的精简文本"""
+    text = "\n".join(clean_lines(html_to_text(html)))
+    return truncate_to_tokens(text, token_budget)
@@ -0,0 +1,82 @@
+"""LLM 调用记录 - 耗时、token、费用
+
+每次 AIClient 请求写入 ai_call_logs 表，关联到当前采集记录。
+调用方（Processor）通过 call_context() 声明 record_id / 阶段 / 改写风格，
+AIClient 无需额外参数即可取到（基于 contextvars，随 asyncio 任务传递）。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+from app.ai.loader import is_loaded, load_litellm
+
+logger = logging.getLogger(__name__)
+
+_call_context: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("ai_call_context", default=None)
+
+
+@contextmanager
+def call_context(**fields):
+    """在当前上下文中设置 record_id / stage / style，退出时恢复"""
+    token = _call_context.set({**current_context(), **fields})
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_context() -> dict:
+    return dict(_call_context.get() or {})
+
+
+def estimate_cost(model_id: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """按 litellm 价格表估算费用（USD），未知模型返回 None"""
+    try:
+        prompt_cost, completion_cost = load_litellm().cost_per_token(
+            model=model_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    except Exception:
+        return None
+    return prompt_cost + completion_cost
+
+
+async def record_call(
+    model_id: str,
+    status: str = "ok",
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    latency: float = 0.0,
+    ttft: Optional[float] = None,
+    error: Optional[str] = None,
+):
+    """写入一条调用记录（失败只记日志，不影响调用方）"""
+    from app.db.engine import async_session
+    from app.db import crud
+
+    ctx = current_context()
+    cost = None
+    if status != "cached" and is_loaded():
+        cost = estimate_cost(model_id, prompt_tokens, completion_tokens)
+
+    try:
+        async with async_session() as session:
+            await crud.add_ai_call(
+                session,
+                record_id=ctx.get("record_id"),
+                stage=ctx.get("stage", ""),
+                style=ctx.get("style"),
+                model=model_id,
+                status=status,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency=round(latency, 3),
+                ttft=round(ttft, 3) if ttft is not None else None,
+                cost=cost,
+                error=error[:500] if error else None,
+            )
+    except Exception as e:
+        logger.warning(f"[AIUsage] 写入调用记录失败: {e}")
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.api.auth import get_current_user
+from app.config import settings
 from app.core import GameContext, Pipeline
 from app.steam.api import get_app_details
 from app.db.engine import async_session
@@ -20,8 +21,10 @@ class CollectRequest(BaseModel):
     app_id: int
     enable_rewrite: bool = True
     enable_analyze: bool = True
+    combined_ai: bool = False  # 分析+改写合并为一次 AI 调用（失败自动回退）
     rewrite_style: str = "resource_site"
     post_status: str = "draft"
+    image_mode: Optional[str] = None  # all / featured（只在发布前上传头图），默认取配置
 
 
 class CollectResponse(BaseModel):
@@ -37,6 +40,7 @@ def _build_pipeline(req: CollectRequest) -> Pipeline:
     from app.processors.steam_fetch import SteamFetchProcessor
     from app.processors.duplicate_check import DuplicateCheckProcessor
     from app.processors.ai_analyze import AIAnalyzeProcessor
+    from app.processors.ai_combined import AICombinedProcessor
     from app.processors.ai_rewrite import AIRewriteProcessor
     from app.processors.image_download import ImageDownloadProcessor
     from app.processors.content_build import ContentBuildProcessor
@@ -46,12 +50,16 @@ def _build_pipeline(req: CollectRequest) -> Pipeline:
     pipeline.pipe(SteamFetchProcessor())
     pipeline.pipe(DuplicateCheckProcessor())
 
+    # 合并模式成功后，下面的分析/改写步骤会自动跳过
+    if req.combined_ai and req.enable_analyze and req.enable_rewrite:
+        pipeline.pipe(AICombinedProcessor(style=req.rewrite_style))
     if req.enable_analyze:
         pipeline.pipe(AIAnalyzeProcessor())
     if req.enable_rewrite:
         pipeline.pipe(AIRewriteProcessor(style=req.rewrite_style))
 
-    pipeline.pipe(ImageDownloadProcessor())
+    image_mode = req.image_mode or settings.image_publish_mode
+    pipeline.pipe(ImageDownloadProcessor(featured_only=image_mode == "featured"))
     pipeline.pipe(ContentBuildProcessor())
     pipeline.pipe(PostPublishProcessor(status=req.post_status))
 
@@ -76,7 +84,7 @@ async def collect_game(req: CollectRequest, _user: str = Depends(get_current_use
         await crud.update_record_status(session, record_id, status="running")
 
     try:
-        ctx = GameContext(app_id=req.app_id)
+        ctx = GameContext(app_id=req.app_id, record_id=record_id)
         pipeline = _build_pipeline(req)
         ctx = await pipeline.run(ctx)
 
@@ -127,6 +135,12 @@ async def preview_game(req: CollectRequest, _user: str = Depends(get_current_use
     ctx = GameContext(app_id=req.app_id, steam_data=steam_data)
 
     # 只运行分析和改写
+    if req.combined_ai and req.enable_analyze and req.enable_rewrite:
+        from app.processors.ai_combined import AICombinedProcessor
+        processor = AICombinedProcessor(style=req.rewrite_style)
+        if processor.supports(ctx):
+            ctx = await processor.process(ctx)
+
     if req.enable_analyze:
         from app.processors.ai_analyze import AIAnalyzeProcessor
         processor = AIAnalyzeProcessor()
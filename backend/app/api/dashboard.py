@@ -19,6 +19,18 @@ async def dashboard_trend(days: int = 7, session: AsyncSession = Depends(get_ses
     return {"items": rows}
 
 
+@router.get("/ai-usage")
+async def dashboard_ai_usage(
+    days: int = 7,
+    group_by: str = "model",
+    session: AsyncSession = Depends(get_session),
+    _user: str = Depends(get_current_user),
+):
+    """近 N 天每日 LLM 调用统计（group_by=model 按模型；style 按模型+阶段+改写风格）"""
+    rows = await crud.ai_usage_stats(session, days=days, group_by=group_by)
+    return {"items": rows}
+
+
 @router.get("/activity")
 async def dashboard_activity(limit: int = 10, session: AsyncSession = Depends(get_session), _user: str = Depends(get_current_user)):
     """最近活动记录"""
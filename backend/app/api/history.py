@@ -87,6 +87,22 @@ async def get_record(record_id: int, session: AsyncSession = Depends(get_session
         "category_id": record.category_id,
         "created_at": record.created_at.isoformat() if record.created_at else None,
         "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+        "ai_calls": [
+            {
+                "stage": c.stage,
+                "style": c.style,
+                "model": c.model,
+                "status": c.status,
+                "prompt_tokens": c.prompt_tokens,
+                "completion_tokens": c.completion_tokens,
+                "latency": c.latency,
+                "ttft": c.ttft,
+                "cost": c.cost,
+                "error": c.error,
+                "created_at": c.created_at.isoformat() if c.created_at else None,
+            }
+            for c in await crud.list_ai_calls(session, record_id)
+        ],
     }
 
 
@@ -102,3 +102,53 @@ async def retry_all_tasks(_user: str = Depends(get_current_user)):
     async with async_session() as session:
         count = await crud.retry_all_failed(session)
     return {"message": "ok", "retried": count}
+
+
+@router.get("/batch/stats")
+async def batch_stats(_user: str = Depends(get_current_user)):
+    """批量 AI 分析统计"""
+    from app.ai.batch import batch_analyzer
+
+    return batch_analyzer.stats()
+
+
+@router.post("/discounts/refresh")
+async def refresh_discounts(_user: str = Depends(get_current_user)):
+    """刷新已发布游戏的折扣，对变化的限免/大折扣触发 B2 公告"""
+    from app.extensions.b2.integration import get_integration
+
+    integration = get_integration()
+    if integration is None:
+        raise HTTPException(status_code=400, detail="B2 集成未启用（SC_B2_ENABLED）")
+    return await integration.refresh_discounts()
+
+
+@router.get("/images/stats")
+async def image_scheduler_stats(_user: str = Depends(get_current_user)):
+    """图片传输调度器统计（下载 / 上传并发、按优先级的排队与等待时间）与后台镜像任务"""
+    from app.images.mirror import image_mirror
+    from app.images.scheduler import image_scheduler
+
+    return {**image_scheduler.stats(), "mirror": image_mirror.stats()}
+
+
+@router.get("/cassette/stats")
+async def cassette_stats(_user: str = Depends(get_current_user)):
+    """录制 / 回放状态：各上游的录制、回放、未命中与注入错误次数"""
+    from app.core import cassette
+
+    return cassette.stats()
+
+
+@router.get("/ai/stats")
+async def ai_scheduler_stats(_user: str = Depends(get_current_user)):
+    """LLM 调度器统计（并发、RPM/TPM 用量、排队等待）与各后端延迟"""
+    from app.ai import backends
+    from app.ai.category_matcher import category_matcher
+    from app.ai.client import ai_scheduler
+
+    return {
+        **ai_scheduler.stats(),
+        **backends.stats(),
+        "category_matcher": category_matcher.stats(),
+    }
@@ -31,6 +31,7 @@ class SettingsResponse(BaseModel):
     ai_model: str
     ai_api_key: str = ""
     ai_base_url: str = ""
+    ai_cache_enabled: bool = False
     wp_url: str
     wp_username: str
     wp_app_password: str = ""
@@ -47,9 +48,11 @@ class UpdateSettingsRequest(BaseModel):
     ai_model: Optional[str] = None
     ai_api_key: Optional[str] = None
     ai_base_url: Optional[str] = None
+    ai_cache_enabled: Optional[bool] = None
     wp_url: Optional[str] = None
     wp_username: Optional[str] = None
     wp_app_password: Optional[str] = None
+    steam_request_delay: Optional[float] = None
     default_post_status: Optional[str] = None
     enable_ai_rewrite: Optional[bool] = None
     enable_ai_analyze: Optional[bool] = None
@@ -59,8 +62,9 @@ class UpdateSettingsRequest(BaseModel):
 
 # 允许通过 API 修改的字段白名单
 _ALLOWED_FIELDS = {
-    "ai_provider", "ai_model", "ai_api_key", "ai_base_url",
+    "ai_provider", "ai_model", "ai_api_key", "ai_base_url", "ai_cache_enabled",
     "wp_url", "wp_username", "wp_app_password",
+    "steam_request_delay",
     "default_post_status", "enable_ai_rewrite", "enable_ai_analyze", "rewrite_style",
     "worker_concurrency",
 }
@@ -118,6 +122,7 @@ async def get_settings(_user: str = Depends(get_current_user)):
         ai_model=settings.ai_model,
         ai_api_key=_mask_key(settings.ai_api_key),
         ai_base_url=settings.ai_base_url or "",
+        ai_cache_enabled=settings.ai_cache_enabled,
         wp_url=settings.wp_url,
         wp_username=settings.wp_username,
         wp_app_password=_mask_key(settings.wp_app_password),
@@ -174,6 +179,59 @@ async def test_wordpress(_user: str = Depends(get_current_user)):
         return {"ok": False, "error": str(e)}
 
 
+@router.delete("/ai-cache")
+async def clear_ai_cache(_user: str = Depends(get_current_user)):
+    """清空 LLM 响应缓存"""
+    from app.db.engine import async_session
+    from app.db import crud
+
+    async with async_session() as session:
+        deleted = await crud.clear_ai_cache(session)
+    return {"ok": True, "deleted": deleted}
+
+
+@router.get("/wp-cache")
+async def wp_cache_stats(_user: str = Depends(get_current_user)):
+    """WordPress 分类/标签缓存与媒体索引统计"""
+    from app.wordpress.media import media_index
+    from app.wordpress.taxonomy import category_cache, tag_cache
+
+    return {
+        "categories": category_cache.stats(),
+        "tags": tag_cache.stats(),
+        "media": await media_index.stats(),
+    }
+
+
+@router.delete("/wp-cache")
+async def clear_wp_cache(
+    tags: bool = False, media: bool = False, _user: str = Depends(get_current_user)
+):
+    """使 WordPress 分类缓存失效（tags / media=true 时同时清空标签缓存 / 媒体索引）"""
+    from app.wordpress.media import media_index
+    from app.wordpress.taxonomy import category_cache, tag_cache
+
+    category_cache.invalidate()
+    deleted_tags = await tag_cache.invalidate() if tags else 0
+    deleted_media = await media_index.clear() if media else 0
+    return {"ok": True, "deleted_tags": deleted_tags, "deleted_media": deleted_media}
+
+
+@router.post("/wp-cache/media/backfill")
+async def backfill_media_index(_user: str = Depends(get_current_user)):
+    """从 WordPress 媒体库全量回填图片去重索引"""
+    from app.wordpress.client import WordPressClient
+    from app.wordpress.media import media_index
+
+    if not settings.wp_url:
+        return {"ok": False, "error": "WordPress 地址未配置"}
+    try:
+        result = await media_index.backfill(WordPressClient())
+        return {"ok": True, **result}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
 @router.post("/test-ai")
 async def test_ai(_user: str = Depends(get_current_user)):
     """测试 AI 连接"""
@@ -181,8 +239,8 @@ async def test_ai(_user: str = Depends(get_current_user)):
         return {"ok": False, "error": "AI API Key 未配置"}
     try:
         from app.ai.client import AIClient
-        client = AIClient()
-        result = await client.chat("回复OK", system="只回复OK两个字母")
+        client = AIClient(fallbacks=[])  # 只测试主后端
+        result = await client.chat("回复OK", system="只回复OK两个字母", cache=False)
         return {"ok": True, "response": result[:50]}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -1,6 +1,6 @@
 """应用配置管理"""
 
-from typing import Optional
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -26,16 +26,60 @@ class Settings(BaseSettings):
     ai_model: str = "deepseek-chat"
     ai_api_key: str = ""
     ai_base_url: Optional[str] = None
+    ai_cache_enabled: bool = False         # LLM 响应缓存（相同请求直接复用结果）
+    ai_cache_max_entries: int = 2000       # 缓存条目上限，超出按最久未使用淘汰
+    ai_batch_analyze: bool = False         # 队列任务的 AI 分析合并为批量请求
+    ai_batch_window: float = 2.0           # 批量收集时间窗口（秒）
+    ai_batch_size: int = 8                 # 每批最多游戏数
+    ai_rewrite_input_tokens: int = 1200    # 改写时原始介绍的 token 预算
+    ai_stream_rewrite: bool = False        # 流式改写并通过 SSE 推送进度
+    ai_rewrite_max_chars: int = 0          # 流式改写的输出长度上限，超出提前终止（0 = 不限）
+    ai_max_concurrency: int = 0            # 每个模型同时进行的 LLM 请求数（0 = 不限）
+    ai_rpm: int = 0                        # 每个模型每分钟请求数上限（0 = 不限）
+    ai_tpm: int = 0                        # 每个模型每分钟 token 上限（0 = 不限）
+    ai_max_retries: int = 3                # 429 时的最大重试次数
+    ai_backends: List[dict] = []           # 备用后端（JSON 数组：provider/model/api_key/base_url）
+    ai_backend_mode: str = "failover"      # failover = 出错时切换；hedge = 超过主后端 p95 未返回时并发请求备用
+    ai_hedge_delay: float = 20.0           # 延迟样本不足时的对冲等待（秒）
+    ai_preload: bool = True                # 启动后在后台预加载 litellm（否则首次调用时加载）
+    category_matcher_enabled: bool = True  # 根据历史记录本地确定分类，置信时跳过 LLM 分类任务（需 steam_cache_ttl > 0）
+    category_matcher_confidence: float = 0.8  # 本地分类的最低置信度（得分占比）
+    category_matcher_min_samples: int = 5  # 本地分类所需的最少历史样本数
 
     # --- WordPress ---
     wp_url: str = ""
     wp_username: str = ""
     wp_app_password: str = ""
+    wp_tag_prefetch_ttl: int = 86400       # 标签全量预取间隔（秒），期间新标签按需解析并写入缓存
+    wp_category_cache_ttl: int = 600       # 分类列表缓存有效期（秒）
+    wp_media_verify: bool = False          # 媒体去重一致性校验：索引命中时确认媒体仍存在，未命中时再搜索媒体库
+
+    # --- B2 主题 ---
+    b2_enabled: bool = False               # 启用 B2 主题集成（专题归类、限免/大折扣公告）
+    b2_discount_refresh_interval: int = 0  # 已发布游戏的折扣刷新间隔（秒），0 = 不自动刷新
 
     # --- Steam ---
-    steam_request_delay: float = 3.0
+    steam_request_delay: float = 3.0       # 全局限速：两次 Steam 请求的最小间隔（秒）
+    steam_rate_burst: int = 1              # 令牌桶容量（允许的瞬时突发请求数）
+    steam_max_retries: int = 3             # 429 时的最大重试次数
     steam_country_code: str = "CN"
     steam_language: str = "schinese"
+    steam_cache_ttl: int = 21600           # appdetails 缓存有效期（秒），0 = 不缓存
+    steam_cache_memory_size: int = 256     # 内存 LRU 条目数
+    steam_catalog_search: bool = True      # 搜索优先使用本地应用目录（需先导入）
+
+    # --- HTTP 连接池 ---
+    http2_enabled: bool = False            # 需安装 h2（httpx[http2]）
+    http_max_connections: int = 20         # 每个上游的最大连接数
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0    # 空闲连接保活时间（秒）
+
+    # --- 录制/回放（离线基准测试） ---
+    cassette_mode: str = ""                # record = 录制真实请求；replay = 从录制文件回放，不访问网络
+    cassette_dir: str = "data/cassettes"
+    cassette_latency_scale: float = 1.0    # 回放延迟 = 录制时的耗时 × 比例（0 = 无延迟）
+    cassette_latency: Optional[float] = None  # 固定回放延迟（秒），设置后忽略录制耗时
+    cassette_error_rate: float = 0.0       # 回放时随机注入错误的比例（0~1）
 
     # --- Database ---
     database_url: str = "sqlite+aiosqlite:///./data/collector.db"
@@ -45,8 +89,19 @@ class Settings(BaseSettings):
     enable_ai_rewrite: bool = True
     enable_ai_analyze: bool = True
     rewrite_style: str = "resource_site"
-    max_image_concurrency: int = 5
+    image_download_concurrency: int = 8    # 全局图片下载并发（所有游戏共享）
+    image_upload_concurrency: int = 3      # 全局 WordPress 媒体上传并发（所有游戏共享）
     image_download_timeout: int = 30
+    image_chunk_size: int = 65536           # 图片流式转发的分块大小（字节）
+    image_max_bytes: int = 20 * 1024 * 1024  # 单张图片大小上限（字节），超出时中止传输
+    image_publish_mode: str = "all"         # all = 发布前上传全部图片；featured = 只上传头图，截图发布后后台镜像
+    image_mirror_rewrite: bool = True       # 后台镜像完成后把文章画廊中的 CDN 地址替换为媒体库地址
+    image_optimize: bool = False            # 上传前缩放并重新编码图片（需 pip install .[images]）
+    image_format: str = "webp"              # 优化输出格式：webp / avif / jpeg
+    image_quality: int = 82                 # 编码质量（1-100）
+    image_max_width: int = 1920             # 超出时等比缩小
+    image_max_height: int = 1080
+    image_optimize_workers: int = 2         # 图片编码进程数
     default_category_id: int = 1
     worker_concurrency: int = 2  # 队列并发采集数
 
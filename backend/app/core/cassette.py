@@ -0,0 +1,336 @@
+"""请求录制 / 回放 - 离线、可复现地运行完整 Pipeline
+
+SC_CASSETTE_MODE=record：正常访问 Steam / WordPress / 图片 CDN / LLM，
+同时把每个请求与响应（含耗时）追加到 {cassette_dir}/{上游}.jsonl。
+SC_CASSETTE_MODE=replay：不访问网络，按请求内容从录制文件回放，
+可按比例或固定值模拟延迟，并按比例随机注入错误，用于基准测试和回归测试。
+
+HTTP 上游在共享客户端的 transport 层接入（见 app/core/http.py），
+LLM 在 AIClient 的 acompletion 入口接入。
+相同请求被录制多次时按录制顺序依次回放，超出后重复最后一条。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 回放响应保留的响应头（其余如 content-encoding 在录制时已解码，不能原样回放）
+_KEEP_HEADERS = ("content-type", "retry-after", "location", "x-wp-total", "x-wp-totalpages")
+# 回放流式 LLM 响应时每段的字符数
+_STREAM_CHUNK_CHARS = 20
+
+
+class CassetteMiss(Exception):
+    """回放模式下请求未被录制"""
+
+
+def is_recording() -> bool:
+    return settings.cassette_mode == "record"
+
+
+def is_replaying() -> bool:
+    return settings.cassette_mode == "replay"
+
+
+def _hash(*parts: Any) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class Cassette:
+    """一个上游的录制文件"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = Path(settings.cassette_dir) / f"{name}.jsonl"
+        self._entries: dict[str, list[dict]] | None = None
+        self._cursor: dict[str, int] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.injected = 0
+
+    def _load(self) -> dict[str, list[dict]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                with self.path.open(encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries.setdefault(entry["key"], []).append(entry)
+            logger.info(f"[Cassette] {self.name}: 已加载 {sum(map(len, self._entries.values()))} 条录制")
+        return self._entries
+
+    def lookup(self, key: str) -> dict | None:
+        entries = self._load().get(key)
+        if not entries:
+            self.misses += 1
+            return None
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        self.replayed += 1
+        return entries[min(index, len(entries) - 1)]
+
+    def append(self, key: str, entry: dict):
+        entry = {"key": key, **entry}
+        self._load().setdefault(key, []).append(entry)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+    async def delay(self, entry: dict, fraction: float = 1.0):
+        """按配置模拟回放延迟"""
+        if settings.cassette_latency is not None:
+            seconds = settings.cassette_latency
+        else:
+            seconds = entry.get("elapsed", 0.0) * settings.cassette_latency_scale
+        if seconds > 0:
+            await asyncio.sleep(seconds * fraction)
+
+    def inject_error(self) -> bool:
+        if settings.cassette_error_rate > 0 and random.random() < settings.cassette_error_rate:
+            self.injected += 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+            "injected": self.injected,
+        }
+
+
+_cassettes: dict[str, Cassette] = {}
+
+
+def get_cassette(name: str) -> Cassette:
+    cassette = _cassettes.get(name)
+    if cassette is None:
+        cassette = _cassettes[name] = Cassette(name)
+    return cassette
+
+
+def stats() -> dict:
+    return {
+        "mode": settings.cassette_mode or None,
+        "dir": settings.cassette_dir,
+        "cassettes": {n: c.stats() for n, c in _cassettes.items()},
+    }
+
+
+# ---- HTTP ----
+
+def _request_key(request: httpx.Request) -> str:
+    """方法 + URL + 请求体哈希（multipart 的随机 boundary 会被归一化）"""
+    body = request.content
+    content_type = request.headers.get("content-type", "")
+    if "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";", 1)[0].strip('"')
+        body = body.replace(boundary.encode(), b"BOUNDARY")
+    return _hash(request.method, str(request.url), hashlib.sha256(body).hexdigest())
+
+
+def _encode_body(body: bytes) -> dict:
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode()}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return entry.get("text", "").encode("utf-8")
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """录制 / 回放共享客户端的请求"""
+
+    def __init__(self, name: str, inner: httpx.AsyncBaseTransport):
+        self.cassette = get_cassette(name)
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = _request_key(request)
+
+        if is_replaying():
+            entry = self.cassette.lookup(key)
+            if entry is None:
+                raise httpx.ConnectError(
+                    f"[Cassette] 未录制的请求: {request.method} {request.url}", request=request
+                )
+            await self.cassette.delay(entry)
+            if self.cassette.inject_error():
+                return httpx.Response(503, request=request)
+            return httpx.Response(
+                entry["status"], headers=entry["headers"], content=_decode_body(entry), request=request
+            )
+
+        start = time.monotonic()
+        response = await self._inner.handle_async_request(request)
+        body = await response.aread()
+        elapsed = time.monotonic() - start
+        await response.aclose()
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() in _KEEP_HEADERS}
+        self.cassette.append(key, {
+            "method": request.method,
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": headers,
+            "elapsed": round(elapsed, 3),
+            **_encode_body(body),
+        })
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+# ---- LLM ----
+
+def _llm_key(kwargs: dict) -> str:
+    """模型 + 消息 + 生成参数（不含 api_key / stream）"""
+    return _hash(
+        kwargs.get("model"),
+        kwargs.get("messages"),
+        kwargs.get("temperature"),
+        kwargs.get("response_format"),
+    )
+
+
+def _completion(content: str, usage: dict | None) -> SimpleNamespace:
+    """构造与 litellm 响应结构一致的对象"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(**usage) if usage else None,
+    )
+
+
+class _ReplayStream:
+    """按录制的首 token 耗时与总耗时分段产出内容"""
+
+    def __init__(self, cassette: Cassette, entry: dict):
+        self._cassette = cassette
+        self._entry = entry
+        content = entry["content"]
+        self._chunks = [
+            content[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(content), _STREAM_CHUNK_CHARS)
+        ]
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._index >= len(self._chunks):
+            raise StopAsyncIteration
+        elapsed = self._entry.get("elapsed", 0.0) or 1.0
+        if self._index == 0:
+            first = min(self._entry.get("ttft") or 0.0, elapsed) / elapsed
+            await self._cassette.delay(self._entry, first)
+        else:
+            rest = 1 - min(self._entry.get("ttft") or 0.0, elapsed) / elapsed
+            await self._cassette.delay(self._entry, rest / max(len(self._chunks) - 1, 1))
+        chunk = self._chunks[self._index]
+        self._index += 1
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+    async def aclose(self):
+        self._index = len(self._chunks)
+
+
+class _RecordingStream:
+    """透传真实的流式响应，完整读完后写入录制"""
+
+    def __init__(self, inner, on_done: Callable[[str, float], None]):
+        self._inner = inner
+        self._on_done = on_done
+        self._parts: list[str] = []
+        self._start = time.monotonic()
+        self._ttft: float | None = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self._inner.__anext__()
+        except StopAsyncIteration:
+            self._on_done("".join(self._parts), self._ttft)
+            raise
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            if self._ttft is None:
+                self._ttft = time.monotonic() - self._start
+            self._parts.append(delta)
+        return chunk
+
+    async def aclose(self):
+        aclose = getattr(self._inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def llm_completion(kwargs: dict, call: Callable[[dict], Awaitable[Any]]):
+    """录制 / 回放一次 acompletion 调用"""
+    cassette = get_cassette("llm")
+    key = _llm_key(kwargs)
+    stream = bool(kwargs.get("stream"))
+
+    if is_replaying():
+        entry = cassette.lookup(key)
+        if entry is None:
+            raise CassetteMiss(f"[Cassette] 未录制的 LLM 请求: {kwargs.get('model')}")
+        if cassette.inject_error():
+            await cassette.delay(entry, 0.5)
+            raise RuntimeError("[Cassette] 注入的 LLM 错误")
+        if stream:
+            return _ReplayStream(cassette, entry)
+        await cassette.delay(entry)
+        return _completion(entry["content"], entry.get("usage"))
+
+    start = time.monotonic()
+    response = await call(kwargs)
+    meta = {"model": kwargs.get("model")}
+
+    if stream:
+        def on_done(content: str, ttft: float | None):
+            cassette.append(key, {
+                **meta, "content": content, "elapsed": round(time.monotonic() - start, 3),
+                "ttft": round(ttft, 3) if ttft is not None else None,
+            })
+        return _RecordingStream(response, on_done)
+
+    usage = getattr(response, "usage", None)
+    cassette.append(key, {
+        **meta,
+        "content": response.choices[0].message.content,
+        "elapsed": round(time.monotonic() - start, 3),
+        "usage": {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        } if usage else None,
+    })
+    return response
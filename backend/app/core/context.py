@@ -21,6 +21,7 @@ class GameContext(BaseModel):
 
     # ---- 输入 ----
     app_id: int
+    record_id: Optional[int] = None  # 对应的 CollectRecord（用于关联 AI 调用记录）
     steam_data: dict = Field(default_factory=dict)
 
     # ---- 各 Processor 产出 ----
@@ -29,6 +30,7 @@ class GameContext(BaseModel):
     tags: Optional[List[str]] = None
     seo: Optional[SEOData] = None
     image_ids: Optional[List[int]] = None
+    deferred_images: Optional[List[str]] = None  # 发布后再后台镜像的截图 URL（头图优先模式）
     block_content: Optional[str] = None
 
     # ---- 最终结果 ----
@@ -0,0 +1,108 @@
+"""共享 HTTP 客户端注册表
+
+每个上游（Steam / WordPress / 图片 CDN）持有一个长连接 httpx.AsyncClient，
+复用 TCP+TLS 连接，避免每次请求重新握手。
+由 FastAPI lifespan 负责启动时预热、关闭时释放。
+"""
+
+from __future__ import annotations
+
+import logging
+
+import httpx
+
+from app.config import settings
+from app.core import cassette
+
+logger = logging.getLogger(__name__)
+
+# 上游名称 → 默认超时（秒）
+UPSTREAMS: dict[str, float] = {
+    "steam": 15.0,
+    "wordpress": 30.0,
+    "images": float(settings.image_download_timeout),
+}
+
+# 预热时探测的地址（HEAD 请求，仅用于提前建立连接）
+_WARMUP_URLS = {
+    "steam": "https://store.steampowered.com/",
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 需要可选依赖 h2"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    """按配置创建一个上游客户端"""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    http2 = settings.http2_enabled and _http2_available()
+    if settings.http2_enabled and not http2:
+        logger.warning("[HTTP] 未安装 h2，HTTP/2 已禁用（pip install httpx[http2]）")
+
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+    if cassette.is_recording() or cassette.is_replaying():
+        transport = cassette.CassetteTransport(name, transport)
+
+    return httpx.AsyncClient(
+        timeout=UPSTREAMS.get(name, 30.0),
+        transport=transport,
+        follow_redirects=True,
+    )
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """获取指定上游的共享客户端（未初始化时惰性创建）
+
+    返回的客户端由注册表管理，调用方不要关闭它。
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _build_client(name)
+        _clients[name] = client
+    return client
+
+
+async def init_clients():
+    """创建所有上游客户端并预热连接（在 FastAPI lifespan 中调用）"""
+    for name in UPSTREAMS:
+        get_client(name)
+
+    if cassette.is_replaying():
+        logger.info(f"[HTTP] 回放模式（{settings.cassette_dir}），跳过连接预热")
+        return
+
+    wp_url = settings.wp_url.rstrip("/")
+    warmup = dict(_WARMUP_URLS)
+    if wp_url:
+        warmup["wordpress"] = f"{wp_url}/wp-json/"
+
+    for name, url in warmup.items():
+        try:
+            await get_client(name).head(url, timeout=5.0)
+        except httpx.HTTPError as e:
+            logger.warning(f"[HTTP] 预热 {name} 失败: {e}")
+
+    logger.info(f"[HTTP] 共享客户端已就绪: {', '.join(_clients)}")
+
+
+async def close_clients():
+    """关闭所有上游客户端（在 FastAPI lifespan 结束时调用）"""
+    for name, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"[HTTP] 关闭 {name} 客户端失败: {e}")
+    _clients.clear()
+    logger.info("[HTTP] 共享客户端已关闭")
@@ -0,0 +1,76 @@
+"""SingleFlight - 合并并发的相同请求
+
+同一 key 的调用在第一个请求完成前到达时，不再发起新请求，
+而是等待并共享第一个请求的结果（或异常）。
+请求完成后立即移除 key，之后的调用会重新发起请求（不做缓存）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """一次进行中的调用及其等待者数量"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按 key 合并进行中的异步调用"""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._inflight: dict[Hashable, _Flight] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """执行 fn()；若相同 key 已在进行中则等待其结果
+
+        fn 在独立的任务中运行，所有调用方（包括发起者）通过 shield 等待：
+        某个调用方被取消不会取消共享的请求；只有全部调用方都取消时才取消请求。
+        """
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _t: self._done(key, flight))
+        else:
+            self.shared += 1
+            logger.debug(f"[SingleFlight:{self.name}] 合并请求 key={key}")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()  # 已无人等待
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _done(self, key: Hashable, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        # 所有等待者都已取消时，避免 "exception was never retrieved" 警告
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "inflight": len(self._inflight),
+        }
@@ -1,4 +1,17 @@
 from app.db.engine import Base, engine, async_session, init_db, get_session
-from app.db.models import CollectRecord
+from app.db.models import CollectRecord, SteamAppCache, SteamPriceState, AIResponseCache, AICallLog, WPTermCache, WPMediaIndex
 
-__all__ = ["Base", "engine", "async_session", "init_db", "get_session", "CollectRecord"]
+__all__ = [
+    "Base",
+    "engine",
+    "async_session",
+    "init_db",
+    "get_session",
+    "CollectRecord",
+    "SteamAppCache",
+    "SteamPriceState",
+    "AIResponseCache",
+    "AICallLog",
+    "WPTermCache",
+    "WPMediaIndex",
+]
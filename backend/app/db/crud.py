@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
+import datetime
 from typing import Optional, List
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import case, delete, func, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import CollectRecord
+from app.db.models import CollectRecord, SteamAppCache, SteamPriceState, AIResponseCache, AICallLog, WPTermCache, WPMediaIndex
 
 
 async def create_record(
@@ -80,7 +81,6 @@ async def retry_all_failed(session: AsyncSession) -> int:
 
 async def has_active_record(session: AsyncSession, app_id: int) -> bool:
     """检查某 app_id 是否已有进行中的任务（waiting/pending/running）"""
-    from sqlalchemy import func
     stmt = (
         select(func.count(CollectRecord.id))
         .where(
@@ -161,7 +161,6 @@ async def list_records(
 
 async def count_records(session: AsyncSession, status: Optional[str] = None) -> int:
     """统计记录数"""
-    from sqlalchemy import func
     stmt = select(func.count(CollectRecord.id))
     if status:
         stmt = stmt.where(CollectRecord.status == status)
@@ -220,9 +219,6 @@ async def update_record_game_name(
 
 async def daily_stats(session: AsyncSession, days: int = 7) -> list[dict]:
     """近 N 天每日采集统计（按日期 + 状态分组）"""
-    import datetime
-    from sqlalchemy import func
-
     since = datetime.datetime.now() - datetime.timedelta(days=days)
     stmt = (
         select(
@@ -247,3 +243,369 @@ async def recent_activity(session: AsyncSession, limit: int = 10) -> list[Collec
     stmt = select(CollectRecord).order_by(CollectRecord.updated_at.desc()).limit(limit)
     result = await session.execute(stmt)
     return list(result.scalars().all())
+
+
+async def list_published_games(session: AsyncSession) -> dict[int, CollectRecord]:
+    """每个 app_id 最近一条已发布（有 post_id）的完成记录"""
+    stmt = (
+        select(CollectRecord)
+        .where(CollectRecord.status == "completed", CollectRecord.post_id.isnot(None))
+        .order_by(CollectRecord.updated_at.asc())
+    )
+    result = await session.execute(stmt)
+    # 按时间升序遍历，后出现的覆盖先出现的
+    return {r.app_id: r for r in result.scalars().all()}
+
+
+# ---- Steam appdetails 缓存 ----
+
+async def get_steam_cache(
+    session: AsyncSession, app_id: int, cc: str, language: str
+) -> Optional[SteamAppCache]:
+    """读取 appdetails 缓存条目"""
+    return await session.get(SteamAppCache, (app_id, cc, language))
+
+
+async def upsert_steam_cache(
+    session: AsyncSession, app_id: int, cc: str, language: str, data: dict
+) -> None:
+    """写入/覆盖 appdetails 缓存条目"""
+    await session.merge(SteamAppCache(
+        app_id=app_id,
+        cc=cc,
+        language=language,
+        data=data,
+        fetched_at=datetime.datetime.now(),
+    ))
+    await session.commit()
+
+
+async def delete_steam_cache(session: AsyncSession, app_id: Optional[int] = None) -> int:
+    """清除 appdetails 缓存（不指定 app_id 时清空全部）"""
+    stmt = delete(SteamAppCache)
+    if app_id is not None:
+        stmt = stmt.where(SteamAppCache.app_id == app_id)
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount
+
+
+# ---- 批量 upsert ----
+
+# 每条语句的行数，避免超出 SQLite 单条语句的参数上限
+_UPSERT_CHUNK = 100
+
+
+async def _upsert_rows(
+    session: AsyncSession,
+    model,
+    rows: list[dict],
+    update_cols: tuple[str, ...],
+    keep: tuple[str, ...] = (),
+) -> None:
+    """按主键批量插入或更新（不提交）
+
+    update_cols 中的列冲突时直接覆盖；keep 中的列只在新值非空时覆盖。
+    SQLite / PostgreSQL 使用 ON CONFLICT，MySQL 使用 ON DUPLICATE KEY，
+    其他数据库逐行 merge。
+    """
+    if not rows:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        table = model.__table__
+        keys = [c.name for c in table.primary_key.columns]
+        for i in range(0, len(rows), _UPSERT_CHUNK):
+            stmt = insert(model).values(rows[i:i + _UPSERT_CHUNK])
+            set_ = {col: stmt.excluded[col] for col in update_cols}
+            set_.update({col: func.coalesce(stmt.excluded[col], table.c[col]) for col in keep})
+            await session.execute(stmt.on_conflict_do_update(index_elements=keys, set_=set_))
+        return
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        table = model.__table__
+        for i in range(0, len(rows), _UPSERT_CHUNK):
+            stmt = insert(model).values(rows[i:i + _UPSERT_CHUNK])
+            set_ = {col: stmt.inserted[col] for col in update_cols}
+            set_.update({col: func.coalesce(stmt.inserted[col], table.c[col]) for col in keep})
+            await session.execute(stmt.on_duplicate_key_update(set_))
+        return
+
+    keys = [c.key for c in inspect(model).primary_key]
+    for row in rows:
+        existing = await session.get(model, tuple(row[k] for k in keys))
+        if existing is None:
+            session.add(model(**row))
+            continue
+        for col in update_cols:
+            setattr(existing, col, row[col])
+        for col in keep:
+            if row.get(col) is not None:
+                setattr(existing, col, row[col])
+    await session.flush()
+
+
+# ---- Steam 折扣状态 ----
+
+async def get_price_states(session: AsyncSession, cc: str, app_ids: list[int]) -> dict[int, int]:
+    """读取最近一次观测到的折扣 {app_id: discount_percent}，从未观测过的不出现"""
+    if not app_ids:
+        return {}
+    stmt = select(SteamPriceState.app_id, SteamPriceState.discount_percent).where(
+        SteamPriceState.cc == cc, SteamPriceState.app_id.in_(app_ids)
+    )
+    result = await session.execute(stmt)
+    return {row.app_id: row.discount_percent for row in result.all()}
+
+
+async def upsert_price_states(session: AsyncSession, cc: str, discounts: dict[int, int]) -> None:
+    """批量写入观测到的折扣"""
+    await _upsert_rows(
+        session,
+        SteamPriceState,
+        [{"app_id": app_id, "cc": cc, "discount_percent": d} for app_id, d in discounts.items()],
+        update_cols=("discount_percent",),
+    )
+    await session.commit()
+
+
+# ---- WordPress 词条缓存 ----
+
+async def get_wp_terms(session: AsyncSession, site: str, taxonomy: str) -> dict[str, int]:
+    """读取某站点某分类法的全部缓存词条 {归一化名称: term ID}"""
+    stmt = select(WPTermCache.name_key, WPTermCache.term_id).where(
+        WPTermCache.site == site, WPTermCache.taxonomy == taxonomy
+    )
+    result = await session.execute(stmt)
+    return {row.name_key: row.term_id for row in result.all()}
+
+
+async def upsert_wp_terms(
+    session: AsyncSession, site: str, taxonomy: str, terms: list[tuple[str, str, int]]
+) -> None:
+    """批量写入词条 [(归一化名称, 原始名称, term ID)]"""
+    await _upsert_rows(
+        session,
+        WPTermCache,
+        [
+            {"site": site, "taxonomy": taxonomy, "name_key": key, "name": name, "term_id": term_id}
+            for key, name, term_id in terms
+        ],
+        update_cols=("name", "term_id"),
+    )
+    await session.commit()
+
+
+async def delete_wp_terms(session: AsyncSession, site: str, taxonomy: Optional[str] = None) -> int:
+    """清除某站点的词条缓存（不指定 taxonomy 时清空全部）"""
+    stmt = delete(WPTermCache).where(WPTermCache.site == site)
+    if taxonomy is not None:
+        stmt = stmt.where(WPTermCache.taxonomy == taxonomy)
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount
+
+
+# ---- WordPress 媒体去重索引 ----
+
+async def get_wp_media(
+    session: AsyncSession, site: str, keys: list[tuple[int, str]]
+) -> dict[tuple[int, str], int]:
+    """批量查询已上传的图片 {(app_id, url_hash): media ID}"""
+    if not keys:
+        return {}
+    app_ids = {app_id for app_id, _ in keys}
+    stmt = select(WPMediaIndex.app_id, WPMediaIndex.url_hash, WPMediaIndex.media_id).where(
+        WPMediaIndex.site == site,
+        WPMediaIndex.app_id.in_(app_ids),
+        WPMediaIndex.url_hash.in_({url_hash for _, url_hash in keys}),
+    )
+    result = await session.execute(stmt)
+    wanted = set(keys)
+    return {
+        (row.app_id, row.url_hash): row.media_id
+        for row in result.all()
+        if (row.app_id, row.url_hash) in wanted
+    }
+
+
+async def upsert_wp_media(session: AsyncSession, site: str, items: list[dict]) -> None:
+    """批量写入媒体索引，items 含 app_id / url_hash / media_id / filename，可选 source_url / etag
+
+    从媒体库回填的条目不带 source_url / etag，不会覆盖上传时记录的值。
+    """
+    await _upsert_rows(
+        session,
+        WPMediaIndex,
+        [
+            {
+                "site": site,
+                "app_id": item["app_id"],
+                "url_hash": item["url_hash"],
+                "media_id": item["media_id"],
+                "filename": item.get("filename", ""),
+                "source_url": item.get("source_url"),
+                "etag": item.get("etag"),
+            }
+            for item in items
+        ],
+        update_cols=("media_id", "filename"),
+        keep=("source_url", "etag"),
+    )
+    await session.commit()
+
+
+async def delete_wp_media(
+    session: AsyncSession, site: str, media_id: Optional[int] = None
+) -> int:
+    """删除某站点的媒体索引（指定 media_id 时只删除该媒体）"""
+    stmt = delete(WPMediaIndex).where(WPMediaIndex.site == site)
+    if media_id is not None:
+        stmt = stmt.where(WPMediaIndex.media_id == media_id)
+    result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount
+
+
+async def count_wp_media(session: AsyncSession) -> dict[str, int]:
+    """各站点的媒体索引条目数"""
+    stmt = select(WPMediaIndex.site, func.count()).group_by(WPMediaIndex.site)
+    result = await session.execute(stmt)
+    return {site: n for site, n in result.all()}
+
+
+# ---- LLM 响应缓存 ----
+
+async def get_ai_cache(session: AsyncSession, key: str) -> Optional[str]:
+    """读取 LLM 响应缓存，命中时更新使用时间"""
+    entry = await session.get(AIResponseCache, key)
+    if entry is None:
+        return None
+    entry.hits += 1
+    entry.last_used_at = datetime.datetime.now()
+    await session.commit()
+    return entry.response
+
+
+async def put_ai_cache(
+    session: AsyncSession, key: str, model: str, response: str, max_entries: int
+) -> None:
+    """写入 LLM 响应缓存，超过上限时淘汰最久未使用的条目"""
+    now = datetime.datetime.now()
+    await session.merge(AIResponseCache(
+        key=key, model=model, response=response, hits=0, created_at=now, last_used_at=now,
+    ))
+    await session.flush()
+
+    total = (await session.execute(select(func.count(AIResponseCache.key)))).scalar() or 0
+    overflow = total - max_entries
+    if overflow > 0:
+        oldest = (
+            select(AIResponseCache.key)
+            .order_by(AIResponseCache.last_used_at.asc())
+            .limit(overflow)
+        )
+        await session.execute(delete(AIResponseCache).where(AIResponseCache.key.in_(oldest)))
+    await session.commit()
+
+
+async def clear_ai_cache(session: AsyncSession) -> int:
+    """清空 LLM 响应缓存"""
+    result = await session.execute(delete(AIResponseCache))
+    await session.commit()
+    return result.rowcount
+
+
+# ---- LLM 调用记录 ----
+
+async def add_ai_call(session: AsyncSession, **fields) -> None:
+    """写入一条 LLM 调用记录"""
+    session.add(AICallLog(**fields))
+    await session.commit()
+
+
+async def list_ai_calls(session: AsyncSession, record_id: int) -> list[AICallLog]:
+    """某条采集记录的全部 LLM 调用"""
+    stmt = select(AICallLog).where(AICallLog.record_id == record_id).order_by(AICallLog.id)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def ai_usage_stats(session: AsyncSession, days: int = 7, group_by: str = "model") -> list[dict]:
+    """近 N 天 LLM 调用统计，按日期 + 模型（或 阶段/风格）分组"""
+    since = datetime.datetime.now() - datetime.timedelta(days=days)
+    if group_by == "style":
+        keys = [AICallLog.model, AICallLog.stage, AICallLog.style]
+    else:
+        keys = [AICallLog.model]
+    stmt = (
+        select(
+            func.date(AICallLog.created_at).label("date"),
+            *keys,
+            func.count(AICallLog.id).label("calls"),
+            func.sum(case((AICallLog.status == "error", 1), else_=0)).label("errors"),
+            func.sum(case((AICallLog.status == "cached", 1), else_=0)).label("cached"),
+            func.sum(AICallLog.prompt_tokens).label("prompt_tokens"),
+            func.sum(AICallLog.completion_tokens).label("completion_tokens"),
+            func.sum(AICallLog.cost).label("cost"),
+            func.avg(case((AICallLog.status == "ok", AICallLog.latency))).label("avg_latency"),
+            func.max(AICallLog.latency).label("max_latency"),
+            func.avg(AICallLog.ttft).label("avg_ttft"),
+        )
+        .where(AICallLog.created_at >= since)
+        .group_by("date", *keys)
+        .order_by("date")
+    )
+    result = await session.execute(stmt)
+    rows = []
+    for row in result.all():
+        item = {
+            "date": str(row.date),
+            "model": row.model,
+            "calls": row.calls,
+            "errors": row.errors or 0,
+            "cached": row.cached or 0,
+            "prompt_tokens": row.prompt_tokens or 0,
+            "completion_tokens": row.completion_tokens or 0,
+            "cost": round(row.cost or 0.0, 6),
+            "avg_latency": round(row.avg_latency, 3) if row.avg_latency is not None else None,
+            "max_latency": round(row.max_latency or 0.0, 3),
+            "avg_ttft": round(row.avg_ttft, 3) if row.avg_ttft is not None else None,
+        }
+        if group_by == "style":
+            item["stage"] = row.stage
+            item["style"] = row.style
+        rows.append(item)
+    return rows
+
+
+# ---- 分类匹配训练数据 ----
+
+async def list_category_samples(
+    session: AsyncSession, cc: str, language: str, limit: int = 5000
+) -> list[tuple[int, dict]]:
+    """已完成记录的 (category_id, Steam appdetails) 样本，每个游戏取最新一条"""
+    latest = (
+        select(func.max(CollectRecord.id))
+        .where(CollectRecord.status == "completed")
+        .where(CollectRecord.category_id.isnot(None))
+        .group_by(CollectRecord.app_id)
+    )
+    stmt = (
+        select(CollectRecord.category_id, SteamAppCache.data)
+        .join(SteamAppCache, SteamAppCache.app_id == CollectRecord.app_id)
+        .where(CollectRecord.id.in_(latest))
+        .where(SteamAppCache.cc == cc, SteamAppCache.language == language)
+        .order_by(CollectRecord.id.desc())
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [(row.category_id, row.data) for row in result.all()]
@@ -5,7 +5,7 @@ from __future__ import annotations
 import datetime
 from typing import Optional
 
-from sqlalchemy import String, Integer, Text, DateTime, JSON, func
+from sqlalchemy import String, Integer, Float, Text, DateTime, JSON, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.engine import Base
@@ -49,3 +49,121 @@ class CollectRecord(Base):
 
     def __repr__(self) -> str:
         return f"<CollectRecord id={self.id} app_id={self.app_id} status={self.status}>"
+
+
+class SteamAppCache(Base):
+    """Steam appdetails 响应缓存 - 按 (app_id, cc, language) 存储"""
+
+    __tablename__ = "steam_app_cache"
+
+    app_id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="Steam App ID")
+    cc: Mapped[str] = mapped_column(String(8), primary_key=True, comment="国家/地区代码")
+    language: Mapped[str] = mapped_column(String(32), primary_key=True, comment="语言")
+    data: Mapped[dict] = mapped_column(JSON, comment="appdetails data 字段")
+    fetched_at: Mapped[datetime.datetime] = mapped_column(DateTime, comment="拉取时间")
+
+    def __repr__(self) -> str:
+        return f"<SteamAppCache app_id={self.app_id} cc={self.cc} l={self.language}>"
+
+
+class SteamPriceState(Base):
+    """已发布游戏最近一次观测到的折扣 - 折扣刷新只对变化触发公告"""
+
+    __tablename__ = "steam_price_state"
+
+    app_id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="Steam App ID")
+    cc: Mapped[str] = mapped_column(String(8), primary_key=True, comment="国家/地区代码")
+    discount_percent: Mapped[int] = mapped_column(Integer, default=0, comment="折扣百分比")
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间"
+    )
+
+    def __repr__(self) -> str:
+        return f"<SteamPriceState app_id={self.app_id} cc={self.cc} -{self.discount_percent}%>"
+
+
+class AIResponseCache(Base):
+    """LLM 响应缓存 - 按请求内容哈希存储"""
+
+    __tablename__ = "ai_response_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True, comment="请求内容 SHA-256")
+    model: Mapped[str] = mapped_column(String(200), comment="provider/model")
+    response: Mapped[str] = mapped_column(Text, comment="响应文本")
+    hits: Mapped[int] = mapped_column(Integer, default=0, comment="命中次数")
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), comment="创建时间"
+    )
+    last_used_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), index=True, comment="最近使用时间（淘汰依据）"
+    )
+
+    def __repr__(self) -> str:
+        return f"<AIResponseCache key={self.key[:12]} model={self.model}>"
+
+
+class AICallLog(Base):
+    """LLM 调用记录 - 每次请求（含缓存命中、失败）一条"""
+
+    __tablename__ = "ai_call_logs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    record_id: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, index=True, comment="CollectRecord ID（批量请求为空）"
+    )
+    stage: Mapped[str] = mapped_column(String(30), default="", comment="analyze/rewrite/combined/...")
+    style: Mapped[Optional[str]] = mapped_column(String(30), nullable=True, comment="改写风格")
+    model: Mapped[str] = mapped_column(String(200), comment="provider/model")
+    status: Mapped[str] = mapped_column(String(20), default="ok", comment="ok/error/cached")
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0, comment="输入 token 数")
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0, comment="输出 token 数")
+    latency: Mapped[float] = mapped_column(Float, default=0.0, comment="总耗时（秒）")
+    ttft: Mapped[Optional[float]] = mapped_column(Float, nullable=True, comment="首 token 耗时（秒，仅流式）")
+    cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True, comment="估算费用（USD）")
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True, comment="错误信息")
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), index=True, comment="创建时间"
+    )
+
+    def __repr__(self) -> str:
+        return f"<AICallLog id={self.id} record_id={self.record_id} model={self.model} status={self.status}>"
+
+
+class WPTermCache(Base):
+    """WordPress 分类法词条缓存（标签等）- 名称 → term ID"""
+
+    __tablename__ = "wp_term_cache"
+
+    site: Mapped[str] = mapped_column(String(500), primary_key=True, comment="WordPress 站点地址")
+    taxonomy: Mapped[str] = mapped_column(String(32), primary_key=True, comment="tags/categories")
+    name_key: Mapped[str] = mapped_column(String(200), primary_key=True, comment="归一化名称")
+    name: Mapped[str] = mapped_column(String(200), comment="原始名称")
+    term_id: Mapped[int] = mapped_column(Integer, comment="WordPress term ID")
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间"
+    )
+
+    def __repr__(self) -> str:
+        return f"<WPTermCache {self.taxonomy} {self.name}={self.term_id}>"
+
+
+class WPMediaIndex(Base):
+    """WordPress 媒体去重索引 - 图片来源 URL → media ID"""
+
+    __tablename__ = "wp_media_index"
+
+    site: Mapped[str] = mapped_column(String(500), primary_key=True, comment="WordPress 站点地址")
+    app_id: Mapped[int] = mapped_column(Integer, primary_key=True, comment="Steam App ID")
+    url_hash: Mapped[str] = mapped_column(String(32), primary_key=True, comment="来源 URL 哈希（与文件名一致）")
+    media_id: Mapped[int] = mapped_column(Integer, comment="WordPress media ID")
+    source_url: Mapped[Optional[str]] = mapped_column(
+        String(1000), nullable=True, comment="图片来源 URL（从媒体库回填的条目为空）"
+    )
+    etag: Mapped[Optional[str]] = mapped_column(String(200), nullable=True, comment="下载时的 ETag")
+    filename: Mapped[str] = mapped_column(String(200), default="", comment="上传文件名")
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), comment="更新时间"
+    )
+
+    def __repr__(self) -> str:
+        return f"<WPMediaIndex {self.app_id}/{self.url_hash}={self.media_id}>"
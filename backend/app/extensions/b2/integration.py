@@ -4,12 +4,21 @@
 1. 专题归类 (collection taxonomy)
 2. 评分同步
 3. 限免/大折扣公告
+
+SC_B2_ENABLED=true 时由应用启动时创建（get_integration）。
+折扣刷新（refresh_discounts）可手动触发（POST /api/queue/discounts/refresh），
+或按 SC_B2_DISCOUNT_REFRESH_INTERVAL 周期运行（discount_refresh_loop）。
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
 
+from app.config import settings
 from app.core.context import GameContext
 from app.core.events import event_bus
+from app.steam.store import get_price_overviews
 from app.wordpress.client import WordPressClient
 
 logger = logging.getLogger(__name__)
@@ -31,6 +40,67 @@ class B2Integration:
         await self._assign_collection(post_id, context)
         await self._check_announcement(post_id, context)
 
+        # 记录发布时的折扣，之后的刷新只对变化触发公告
+        price = context.steam_data.get("price_overview")
+        if isinstance(price, dict):
+            await self._save_discounts({context.app_id: price.get("discount_percent", 0)})
+
+    async def refresh_discounts(self) -> dict:
+        """批量刷新已发布游戏的价格，只对折扣发生变化的游戏触发公告检测
+
+        通过 price_overview 批量接口一次查询数百个 app_id，
+        代替逐个拉取完整 appdetails。每个游戏最近一次观测到的折扣记录在
+        steam_price_state 表中：折扣与上次相同时不重复公告；
+        从未观测过的游戏（本功能启用前发布的）只记录为基线，不触发公告。
+        """
+        from app.db.engine import async_session
+        from app.db import crud
+
+        cc = settings.steam_country_code
+        async with async_session() as session:
+            published = await crud.list_published_games(session)
+        if not published:
+            return {"checked": 0, "changed": 0, "announced": 0}
+
+        prices = await get_price_overviews(list(published))
+        async with async_session() as session:
+            previous = await crud.get_price_states(session, cc, list(prices))
+
+        discounts: dict[int, int] = {}
+        changed = announced = 0
+        for app_id, price in prices.items():
+            discount = price.get("discount_percent", 0)
+            discounts[app_id] = discount
+            if app_id not in previous or previous[app_id] == discount:
+                continue
+            changed += 1
+            record = published[app_id]
+            ctx = GameContext(
+                app_id=app_id,
+                steam_data={"name": record.game_name, "price_overview": price},
+            )
+            if await self._check_announcement(record.post_id, ctx):
+                announced += 1
+
+        await self._save_discounts(discounts)
+        logger.info(
+            f"[B2] 折扣刷新完成 | {len(prices)}/{len(published)} 个游戏 | "
+            f"变化 {changed} | 公告 {announced}"
+        )
+        return {"checked": len(prices), "changed": changed, "announced": announced}
+
+    async def _save_discounts(self, discounts: dict[int, int]):
+        from app.db.engine import async_session
+        from app.db import crud
+
+        if not discounts:
+            return
+        try:
+            async with async_session() as session:
+                await crud.upsert_price_states(session, settings.steam_country_code, discounts)
+        except Exception as e:
+            logger.warning(f"[B2] 写入折扣状态失败: {e}")
+
     async def _assign_collection(self, post_id: int, ctx: GameContext):
         """将游戏归类到 B2 专题 (collection taxonomy)
 
@@ -44,8 +114,8 @@ class B2Integration:
         #     await self.wp.update_post(post_id, collection=matched)
         logger.debug(f"[B2] 专题归类 post_id={post_id} (待实现)")
 
-    async def _check_announcement(self, post_id: int, ctx: GameContext):
-        """检测限免/大折扣 → 创建 B2 公告
+    async def _check_announcement(self, post_id: int, ctx: GameContext) -> bool:
+        """检测限免/大折扣 → 创建 B2 公告，返回是否触发
 
         B2 公告 meta:
         - b2_gg_show: 0=所有人
@@ -58,7 +128,7 @@ class B2Integration:
         is_free = steam.get("is_free", False)
 
         if not (is_free or discount >= 50):
-            return
+            return False
 
         name = steam.get("name", "")
         if is_free:
@@ -79,3 +149,30 @@ class B2Integration:
         #     },
         # )
         logger.info(f"[B2] 公告触发 | {title}")
+        return True
+
+
+_integration: B2Integration | None = None
+
+
+def get_integration() -> B2Integration | None:
+    """全局集成实例（首次调用时创建并注册事件处理器），未启用时返回 None"""
+    global _integration
+    if not settings.b2_enabled:
+        return None
+    if _integration is None:
+        _integration = B2Integration(WordPressClient())
+    return _integration
+
+
+async def discount_refresh_loop():
+    """按 b2_discount_refresh_interval 周期刷新折扣（间隔每轮重新读取，设为 0 时退出）"""
+    while settings.b2_discount_refresh_interval > 0:
+        await asyncio.sleep(settings.b2_discount_refresh_interval)
+        integration = get_integration()
+        if integration is None:
+            return
+        try:
+            await integration.refresh_discounts()
+        except Exception as e:
+            logger.error(f"[B2] 折扣刷新失败: {e}")
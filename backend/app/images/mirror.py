@@ -0,0 +1,164 @@
+"""截图后台镜像 - 头图优先发布模式（SC_IMAGE_PUBLISH_MODE=featured）
+
+发布前只上传头图（featured_media），文章画廊直接引用 Steam CDN 地址；
+文章创建后，截图在后台以最低优先级上传到媒体库，
+image_mirror_rewrite=true 时再把画廊中的 CDN 地址替换为媒体库地址。
+
+镜像任务只在进程内存中排队，服务重启时未完成的任务会丢失（文章保持 CDN 地址，不影响展示）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import json
+import logging
+import re
+
+from app.config import settings
+from app.images.scheduler import PRIORITY_BACKGROUND, image_scheduler
+from app.processors.image_download import ImageDownloadProcessor
+from app.wordpress.client import WordPressClient
+
+logger = logging.getLogger(__name__)
+
+# ContentBuildProcessor 生成的图片块：<!-- wp:image {...} -->\n<figure ...><img src="..." alt="..."/>
+_IMAGE_BLOCK = re.compile(
+    r'<!-- wp:image (\{[^}]*\}) -->(\s*<figure[^>]*>)<img src="([^"]+)"( alt="[^"]*")?'
+)
+
+
+def rewrite_gallery(content: str, images: dict[str, tuple[int, str]]) -> tuple[str, int]:
+    """把图片块中的来源地址替换为媒体库图片 {来源 URL: (media ID, 媒体库 URL)}
+
+    同时写入块属性 id 与 wp-image-{id} class，使其成为普通的媒体库图片块。
+    返回 (新内容, 替换数)。
+    """
+    # 保存时 & 可能被转义为 &amp; / &#038;
+    lookup: dict[str, tuple[int, str]] = {}
+    for url, image in images.items():
+        for variant in (url, html.escape(url, quote=False), url.replace("&", "&#038;")):
+            lookup[variant] = image
+
+    count = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal count
+        attrs_json, figure, src, alt = match.groups()
+        image = lookup.get(src)
+        if image is None:
+            return match.group(0)
+        media_id, local_url = image
+        try:
+            attrs = json.loads(attrs_json)
+        except ValueError:
+            return match.group(0)
+        count += 1
+        attrs = {"id": media_id, **{k: v for k, v in attrs.items() if k != "id"}}
+        return (
+            f"<!-- wp:image {json.dumps(attrs, ensure_ascii=False, separators=(',', ':'))} -->"
+            f'{figure}<img src="{local_url}"{alt or ""} class="wp-image-{media_id}"'
+        )
+
+    return _IMAGE_BLOCK.sub(replace, content), count
+
+
+class ImageMirror:
+    """发布后的截图镜像任务"""
+
+    def __init__(self):
+        self._tasks: dict[int, asyncio.Task] = {}  # post_id → 任务
+        self.completed = 0
+        self.failed = 0
+        self.uploaded = 0
+        self.rewritten = 0
+
+    def schedule(self, post_id: int, app_id: int, urls: list[str], start: int = 1) -> bool:
+        """提交后台镜像任务（同一文章已有任务进行中时忽略）"""
+        if not urls or post_id in self._tasks:
+            return False
+        task = asyncio.create_task(self._run(post_id, app_id, urls, start))
+        self._tasks[post_id] = task
+        task.add_done_callback(lambda _t: self._tasks.pop(post_id, None))
+        logger.info(f"[ImageMirror] 已提交 post_id={post_id} | {len(urls)} 张截图")
+        return True
+
+    async def _run(self, post_id: int, app_id: int, urls: list[str], start: int):
+        try:
+            result = await self.mirror(WordPressClient(), post_id, app_id, urls, start)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"[ImageMirror] 镜像失败 post_id={post_id}: {e}")
+            return
+
+        self.completed += 1
+        from app.api.events import publish
+        publish({"type": "images_mirrored", "app_id": app_id, **result})
+
+    async def mirror(
+        self, wp: WordPressClient, post_id: int, app_id: int, urls: list[str], start: int = 1
+    ) -> dict:
+        """上传截图并（按配置）改写文章画廊，返回结果统计"""
+        results = await ImageDownloadProcessor().upload_images(
+            wp, app_id, urls, start=start, priority=PRIORITY_BACKGROUND
+        )
+        uploaded = {url: r for url, r in zip(urls, results) if isinstance(r, int) and r > 0}
+        self.uploaded += len(uploaded)
+
+        rewritten = 0
+        if settings.image_mirror_rewrite and uploaded:
+            rewritten = await self._rewrite_post(wp, post_id, uploaded)
+            self.rewritten += rewritten
+
+        logger.info(
+            f"[ImageMirror] 完成 post_id={post_id} | 上传 {len(uploaded)}/{len(urls)} | 改写 {rewritten}"
+        )
+        return {
+            "post_id": post_id,
+            "uploaded": len(uploaded),
+            "failed": len(urls) - len(uploaded),
+            "rewritten": rewritten,
+        }
+
+    async def _rewrite_post(self, wp: WordPressClient, post_id: int, uploaded: dict[str, int]) -> int:
+        ids = sorted(set(uploaded.values()))
+        async with image_scheduler.upload(PRIORITY_BACKGROUND):
+            media = await wp.list_media(fields="id,source_url", include=",".join(map(str, ids)))
+        local_urls = {m["id"]: m["source_url"] for m in media if m.get("source_url")}
+
+        images = {
+            url: (media_id, local_urls[media_id])
+            for url, media_id in uploaded.items()
+            if media_id in local_urls
+        }
+        post = await wp.get_post(post_id, context="edit", fields="content")
+        content, count = rewrite_gallery(post["content"]["raw"], images)
+        if count:
+            await wp.update_post(post_id, content=content)
+        return count
+
+    async def shutdown(self):
+        """取消未完成的任务"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"[ImageMirror] 已取消 {len(tasks)} 个未完成的镜像任务")
+
+    def stats(self) -> dict:
+        return {
+            "mode": settings.image_publish_mode,
+            "rewrite": settings.image_mirror_rewrite,
+            "running": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+            "uploaded": self.uploaded,
+            "rewritten": self.rewritten,
+        }
+
+
+# 全局镜像任务管理
+image_mirror = ImageMirror()
@@ -0,0 +1,162 @@
+"""图片优化 - 缩放、重新编码、去除元数据
+
+可选功能（SC_IMAGE_OPTIMIZE=true），需要 Pillow：pip install .[images]
+在下载与上传之间执行：按 image_max_width / image_max_height 等比缩小，
+重新编码为 WebP / AVIF / JPEG（image_format，质量 image_quality），
+不保留 EXIF / ICC 等元数据，并返回对应的 MIME 类型与扩展名。
+
+编码是 CPU 密集操作，在独立的进程池（image_optimize_workers 个进程）中执行，不阻塞事件循环。
+优化后体积没有变小且无需缩放时保留原图。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 输出格式 → (Pillow 格式名, MIME 类型, 扩展名)
+_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "avif": ("AVIF", "image/avif", "avif"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+_pool: ProcessPoolExecutor | None = None
+_unavailable_warned = False
+
+
+@dataclass
+class OptimizedImage:
+    data: bytes
+    mime_type: str
+    ext: str
+    width: int
+    height: int
+    original_size: int
+
+
+def optimizer_available() -> bool:
+    """图片优化需要可选依赖 Pillow"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def is_enabled() -> bool:
+    global _unavailable_warned
+    if not settings.image_optimize:
+        return False
+    if not optimizer_available():
+        if not _unavailable_warned:
+            logger.warning("[ImageOptimizer] 已启用图片优化，但未安装 Pillow（pip install .[images]），跳过优化")
+            _unavailable_warned = True
+        return False
+    return True
+
+
+def _output_format(name: str) -> tuple[str, str, str]:
+    from PIL import features
+
+    fmt = _FORMATS.get(name.lower(), _FORMATS["webp"])
+    if fmt[0] == "AVIF" and not features.check("avif"):
+        fmt = _FORMATS["webp"]
+    if fmt[0] == "WEBP" and not features.check("webp"):
+        fmt = _FORMATS["jpeg"]
+    return fmt
+
+
+def optimize_bytes(
+    data: bytes, fmt: str, quality: int, max_width: int, max_height: int
+) -> tuple[bytes, str, str, int, int] | None:
+    """在工作进程中执行：返回 (数据, MIME, 扩展名, 宽, 高)；无需处理时返回 None"""
+    from PIL import Image, ImageOps
+
+    pil_format, mime_type, ext = _output_format(fmt)
+    with Image.open(io.BytesIO(data)) as src:
+        image = ImageOps.exif_transpose(src)
+        resized = False
+        if max_width > 0 and max_height > 0 and (
+            image.width > max_width or image.height > max_height
+        ):
+            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+            resized = True
+
+        if pil_format == "JPEG":
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            transparent = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if transparent else "RGB")
+
+        out = io.BytesIO()
+        options = {"quality": quality}
+        if pil_format == "JPEG":
+            options.update(optimize=True, progressive=True)
+        elif pil_format == "WEBP":
+            options.update(method=4)
+        # 不传 exif / icc_profile，元数据不会写入输出
+        image.save(out, pil_format, **options)
+
+    result = out.getvalue()
+    if not resized and len(result) >= len(data):
+        return None
+    return result, mime_type, ext, image.width, image.height
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn：不 fork 带事件循环和线程的主进程
+        _pool = ProcessPoolExecutor(
+            max_workers=max(settings.image_optimize_workers, 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def optimize(data: bytes) -> OptimizedImage | None:
+    """在进程池中优化图片；未启用、无需处理或失败时返回 None（上传原图）"""
+    if not is_enabled():
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(
+            _get_pool(),
+            optimize_bytes,
+            data,
+            settings.image_format,
+            settings.image_quality,
+            settings.image_max_width,
+            settings.image_max_height,
+        )
+    except BrokenProcessPool as e:
+        # 工作进程异常退出（如内存不足被杀）后进程池不可再用，下次重建
+        logger.warning(f"[ImageOptimizer] 进程池已损坏，重建后继续: {e}")
+        shutdown()
+        return None
+    except Exception as e:
+        logger.warning(f"[ImageOptimizer] 优化失败，上传原图: {e}")
+        return None
+    if result is None:
+        return None
+    optimized, mime_type, ext, width, height = result
+    return OptimizedImage(optimized, mime_type, ext, width, height, len(data))
+
+
+def shutdown():
+    """关闭进程池"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
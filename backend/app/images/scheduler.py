@@ -0,0 +1,141 @@
+"""图片传输调度器 - 进程内所有游戏共享的下载 / 上传并发名额
+
+下载（图片 CDN）与上传（WordPress 媒体接口）各有一个全局上限：
+image_download_concurrency / image_upload_concurrency，与同时处理的游戏数无关。
+
+名额按优先级分配，同优先级先到先得：头图（作为 featured_media，发布前必须就绪）优先于截图，
+发布后的后台截图镜像（app/images/mirror.py）优先级最低。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 优先级：数值越小越先获得名额
+PRIORITY_FEATURED = 0
+PRIORITY_GALLERY = 1
+PRIORITY_BACKGROUND = 2
+
+_PRIORITY_NAMES = {
+    PRIORITY_FEATURED: "featured",
+    PRIORITY_GALLERY: "gallery",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class _PriorityLimiter:
+    """带优先级的并发上限（上限每次从配置读取，修改后即时生效）"""
+
+    def __init__(self, name: str, limit: Callable[[], int]):
+        self.name = name
+        self._limit = limit
+        self._active = 0
+        self._heap: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._waiting: dict[int, int] = {}
+        self.acquired: dict[int, int] = {}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue = 0
+
+    def _has_capacity(self) -> bool:
+        limit = self._limit()
+        return limit <= 0 or self._active < limit
+
+    async def acquire(self, priority: int):
+        start = time.monotonic()
+        while self._heap and self._heap[0][2].cancelled():
+            heapq.heappop(self._heap)
+        if not self._heap and self._has_capacity():
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._heap, (priority, next(self._seq), future))
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+            self.max_queue = max(self.max_queue, sum(self._waiting.values()))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # 已分配名额后才被取消：归还名额
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+            finally:
+                self._waiting[priority] -= 1
+
+        waited = time.monotonic() - start
+        self.acquired[priority] = self.acquired.get(priority, 0) + 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self):
+        self._active -= 1
+        while self._heap and self._has_capacity():
+            _, _, future = heapq.heappop(self._heap)
+            if future.cancelled():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        total = sum(self.acquired.values())
+        return {
+            "limit": self._limit(),
+            "active": self._active,
+            "waiting": {_PRIORITY_NAMES.get(p, str(p)): n for p, n in self._waiting.items() if n},
+            "acquired": {_PRIORITY_NAMES.get(p, str(p)): n for p, n in self.acquired.items()},
+            "avg_wait": round(self.total_wait / total, 3) if total else 0.0,
+            "max_wait": round(self.max_wait, 3),
+            "max_queue": self.max_queue,
+        }
+
+
+class ImageScheduler:
+    """全局图片传输调度器
+
+    同时持有两种名额时一律先取上传、再取下载（流式转发期间 CDN 连接与上传请求同时打开），
+    避免互相等待。
+    """
+
+    def __init__(self):
+        self._download = _PriorityLimiter("download", lambda: settings.image_download_concurrency)
+        self._upload = _PriorityLimiter("upload", lambda: settings.image_upload_concurrency)
+
+    def download(self, priority: int = PRIORITY_GALLERY):
+        """图片 CDN 下载名额"""
+        return self._download.slot(priority)
+
+    def upload(self, priority: int = PRIORITY_GALLERY):
+        """WordPress 媒体接口名额（上传及媒体库查询）"""
+        return self._upload.slot(priority)
+
+    @asynccontextmanager
+    async def transfer(self, priority: int = PRIORITY_GALLERY) -> AsyncIterator[None]:
+        """流式转发：同时持有上传与下载名额"""
+        async with self.upload(priority), self.download(priority):
+            yield
+
+    def stats(self) -> dict:
+        return {"download": self._download.stats(), "upload": self._upload.stats()}
+
+
+# 全局调度器（所有游戏共享）
+image_scheduler = ImageScheduler()
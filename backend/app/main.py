@@ -1,6 +1,12 @@
-"""Steam Collector - FastAPI 入口"""
+"""Steam Collector - FastAPI 入口
 
+启动各阶段耗时在 lifespan 中记录到日志；模块导入耗时可用
+python -X importtime -c "import app.main" 单独测量。
+"""
+
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
@@ -16,26 +22,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class _StartupTimer:
+    """记录启动各阶段耗时"""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self._last = time.monotonic()
+
+    def mark(self, phase: str):
+        now = time.monotonic()
+        self.phases[phase] = round(now - self._last, 3)
+        self._last = now
+
+    def summary(self) -> str:
+        parts = " | ".join(f"{k} {v:.2f}s" for k, v in self.phases.items())
+        return f"{parts} | 总计 {sum(self.phases.values()):.2f}s"
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期：启动时初始化数据库和认证，启动后台 Worker"""
+    timer = _StartupTimer()
+
     # 校验必填安全配置
     from app.api.auth import init_auth
     init_auth()
+    timer.mark("init_auth")
 
     from app.db import init_db
     await init_db()
     logger.info("数据库表已初始化")
+    timer.mark("init_db")
+
+    from app.steam.catalog import init_catalog
+    await init_catalog()
+    timer.mark("init_catalog")
+
+    # 预热共享 HTTP 连接池
+    from app.core.http import init_clients, close_clients
+    await init_clients()
+    timer.mark("init_clients")
 
     # 启动后台队列 Worker
     from app.queue.manager import start_worker, stop_worker
     start_worker()
+    timer.mark("worker")
+
+    # B2 主题集成（注册 post_published 处理器，按配置启动折扣刷新）
+    discount_task = None
+    from app.extensions.b2.integration import discount_refresh_loop, get_integration
+    if get_integration() is not None and settings.b2_discount_refresh_interval > 0:
+        discount_task = asyncio.create_task(discount_refresh_loop())
+
+    logger.info(f"[Startup] {timer.summary()}")
+
+    # 服务开始接收请求后在后台线程加载 litellm，首个 AI 请求无需等待导入
+    preload_task = None
+    if settings.ai_preload:
+        from app.ai.loader import preload
+        preload_task = asyncio.create_task(preload())
 
     yield
 
+    if preload_task and not preload_task.done():
+        preload_task.cancel()
+    if discount_task:
+        discount_task.cancel()
+
     # 关闭 Worker
     stop_worker()
 
+    # 取消未完成的截图镜像任务
+    from app.images.mirror import image_mirror
+    await image_mirror.shutdown()
+
+    # 释放 HTTP 连接池
+    await close_clients()
+
+    # 关闭图片编码进程池
+    from app.images.optimizer import shutdown as shutdown_optimizer
+    shutdown_optimizer()
+
 
 app = FastAPI(title=settings.app_title, debug=settings.debug, lifespan=lifespan)
 
@@ -1,54 +1,78 @@
 """AIAnalyze Processor - 调用 AI Analyzer 完成分类+标签+SEO"""
 
+from __future__ import annotations
+
 import logging
 
+from app.ai import usage as ai_usage
 from app.ai.analyzer import AIAnalyzer
+from app.ai.batch import batch_analyzer
+from app.ai.category_matcher import NgramIndex, category_matcher
 from app.core.context import GameContext
 from app.wordpress.client import WordPressClient
+from app.wordpress.taxonomy import CategoryIndex
 
 logger = logging.getLogger(__name__)
 
 
+def match_category(category_name: str, categories: CategoryIndex) -> int | None:
+    """匹配 WordPress 已有分类（名称索引 → n-gram 模糊匹配 → 第一个可用分类）"""
+    exact = categories.lookup(category_name)
+    if exact is not None:
+        return exact
+
+    cat_name_to_id = categories.by_name
+    matched = NgramIndex(cat_name_to_id).best(category_name)
+    if matched:
+        wp_name, wp_id, score = matched
+        logger.info(f"[AIAnalyze] 模糊匹配分类: '{category_name}' → '{wp_name}'(ID={wp_id}) 相似度={score:.2f}")
+        return wp_id
+
+    # 选第一个非"未分类"的分类
+    fallback = next(
+        ((n, i) for n, i in cat_name_to_id.items() if n != "未分类" and n.lower() != "uncategorized"),
+        None,
+    )
+    if fallback:
+        logger.warning(f"[AIAnalyze] 分类 '{category_name}' 无匹配，使用 '{fallback[0]}'")
+        return fallback[1]
+
+    logger.warning(f"[AIAnalyze] 分类 '{category_name}' 无匹配，无可用分类")
+    return None
+
+
 class AIAnalyzeProcessor:
-    def __init__(self):
+    def __init__(self, batch: bool = False):
         self.analyzer = AIAnalyzer()
+        self.batch = batch  # 通过全局批量分析器与其他任务合并请求
 
     async def process(self, ctx: GameContext) -> GameContext:
         wp = WordPressClient()
 
-        # 从 WordPress 获取已有分类列表
-        wp_categories = await wp.get_categories()
-        cat_name_to_id = {c["name"]: c["id"] for c in wp_categories}
+        # WordPress 已有分类（跨任务缓存）
+        categories = await wp.get_category_index()
+        cat_name_to_id = categories.by_name
         existing_categories = list(cat_name_to_id.keys())
 
-        result = await self.analyzer.analyze(ctx.steam_data, existing_categories)
-        category_name = result["category"]
+        # 本地匹配器确定分类时，LLM 只需生成标签和 SEO
+        local = await category_matcher.match(ctx.steam_data, cat_name_to_id)
 
-        # 匹配 WordPress 已有分类（精确匹配 → 模糊匹配）
-        if category_name in cat_name_to_id:
-            ctx.category_id = cat_name_to_id[category_name]
-        else:
-            # 模糊匹配：子串包含关系
-            matched = None
-            for wp_name, wp_id in cat_name_to_id.items():
-                if wp_name in category_name or category_name in wp_name:
-                    matched = (wp_name, wp_id)
-                    break
-            if matched:
-                ctx.category_id = matched[1]
-                logger.info(f"[AIAnalyze] 模糊匹配分类: '{category_name}' → '{matched[0]}'(ID={matched[1]})")
+        with ai_usage.call_context(record_id=ctx.record_id, stage="analyze"):
+            if self.batch:
+                result = await batch_analyzer.analyze(
+                    ctx.app_id, ctx.steam_data, existing_categories, with_category=local is None
+                )
             else:
-                # 选第一个非"未分类"的分类
-                fallback = next(
-                    ((n, i) for n, i in cat_name_to_id.items() if n != "未分类" and n.lower() != "uncategorized"),
-                    None,
+                result = await self.analyzer.analyze(
+                    ctx.steam_data, existing_categories, with_category=local is None
                 )
-                if fallback:
-                    ctx.category_id = fallback[1]
-                    logger.warning(f"[AIAnalyze] 分类 '{category_name}' 无匹配，使用 '{fallback[0]}'")
-                else:
-                    ctx.category_id = None
-                    logger.warning(f"[AIAnalyze] 分类 '{category_name}' 无匹配，无可用分类")
+
+        if local:
+            category_name, ctx.category_id, confidence = local
+            logger.info(f"[AIAnalyze] 本地匹配分类: {category_name} 置信度={confidence:.2f}")
+        else:
+            category_name = result["category"]
+            ctx.category_id = match_category(category_name, categories)
 
         ctx.tags = result["tags"]
         ctx.seo = result["seo"]
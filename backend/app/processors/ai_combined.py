@@ -0,0 +1,61 @@
+"""AICombined Processor - 一次 AI 调用完成分析+改写
+
+成功时同时填充 category/tags/seo/rewritten_content，
+后续的 AIAnalyze / AIRewrite 因 supports() 返回 False 自动跳过；
+解析失败时不修改上下文，由它们按两次调用的流程兜底。
+"""
+
+import logging
+
+from app.ai import usage as ai_usage
+from app.ai.category_matcher import category_matcher
+from app.ai.combined import AICombined
+from app.core.context import GameContext
+from app.processors.ai_analyze import match_category
+from app.wordpress.client import WordPressClient
+
+logger = logging.getLogger(__name__)
+
+
+class AICombinedProcessor:
+    def __init__(self, style: str = "resource_site"):
+        self.style = style
+        self.combined = AICombined()
+
+    async def process(self, ctx: GameContext) -> GameContext:
+        wp = WordPressClient()
+
+        categories = await wp.get_category_index()
+        cat_name_to_id = categories.by_name
+
+        try:
+            with ai_usage.call_context(record_id=ctx.record_id, stage="combined", style=self.style):
+                result = await self.combined.analyze_and_rewrite(
+                    ctx.steam_data, list(cat_name_to_id.keys()), self.style
+                )
+        except Exception as e:
+            logger.error(f"[AICombined] 调用失败: {e}")
+            result = None
+
+        if result is None:
+            logger.warning("[AICombined] 合并调用失败，回退到分析+改写两次调用")
+            return ctx
+
+        # 本地匹配器置信时以其结果为准，保证同类游戏分类稳定
+        local = await category_matcher.match(ctx.steam_data, cat_name_to_id)
+        if local:
+            result["category"], ctx.category_id, _ = local
+        else:
+            ctx.category_id = match_category(result["category"], categories)
+        ctx.tags = result["tags"]
+        ctx.seo = result["seo"]
+        ctx.rewritten_content = result["content"]
+
+        logger.info(
+            f"[AICombined] 分类={result['category']}(ID={ctx.category_id}) "
+            f"标签={ctx.tags} | 风格={self.style} | 字数={len(ctx.rewritten_content)}"
+        )
+        return ctx
+
+    def supports(self, ctx: GameContext) -> bool:
+        return bool(ctx.steam_data) and ctx.seo is None and ctx.rewritten_content is None
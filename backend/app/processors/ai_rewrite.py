@@ -1,12 +1,18 @@
 """AIRewrite Processor - 调用 AI 改写游戏描述"""
 
 import logging
+import time
 
+from app.ai import usage as ai_usage
 from app.ai.rewriter import AIRewriter
+from app.config import settings
 from app.core.context import GameContext
 
 logger = logging.getLogger(__name__)
 
+# 进度事件最小推送间隔（秒）
+_PROGRESS_INTERVAL = 0.5
+
 
 class AIRewriteProcessor:
     def __init__(self, style: str = "resource_site"):
@@ -14,9 +20,52 @@ class AIRewriteProcessor:
         self.rewriter = AIRewriter()
 
     async def process(self, ctx: GameContext) -> GameContext:
-        ctx.rewritten_content = await self.rewriter.rewrite(ctx.steam_data, self.style)
+        with ai_usage.call_context(record_id=ctx.record_id, stage="rewrite", style=self.style):
+            if settings.ai_stream_rewrite:
+                ctx.rewritten_content = await self._rewrite_streaming(ctx)
+            else:
+                ctx.rewritten_content = await self.rewriter.rewrite(ctx.steam_data, self.style)
         logger.info(f"[AIRewrite] 改写完成 | 风格={self.style} | 字数={len(ctx.rewritten_content)}")
         return ctx
 
+    async def _rewrite_streaming(self, ctx: GameContext) -> str:
+        """流式改写，并通过 SSE 推送生成进度"""
+        from app.api.events import publish
+
+        started = time.monotonic()
+        last_sent = 0.0
+
+        def on_progress(chars: int):
+            nonlocal last_sent
+            now = time.monotonic()
+            if now - last_sent < _PROGRESS_INTERVAL:
+                return
+            if not last_sent:
+                logger.info(f"[AIRewrite] 首个 token 用时 {now - started:.2f}s | app_id={ctx.app_id}")
+            last_sent = now
+            publish({
+                "type": "ai_progress",
+                "app_id": ctx.app_id,
+                "stage": "rewrite",
+                "chars": chars,
+                "elapsed": round(now - started, 2),
+            })
+
+        content = await self.rewriter.rewrite_stream(
+            ctx.steam_data,
+            self.style,
+            on_progress=on_progress,
+            max_chars=settings.ai_rewrite_max_chars,
+        )
+        publish({
+            "type": "ai_progress",
+            "app_id": ctx.app_id,
+            "stage": "rewrite",
+            "chars": len(content),
+            "elapsed": round(time.monotonic() - started, 2),
+            "done": True,
+        })
+        return content
+
     def supports(self, ctx: GameContext) -> bool:
         return bool(ctx.steam_data) and ctx.rewritten_content is None
@@ -1,31 +1,44 @@
-"""ImageDownload Processor - 并发下载图片到 WordPress 媒体库"""
+"""ImageDownload Processor - 并发下载图片到 WordPress 媒体库
+
+上传前按本地媒体索引（app/wordpress/media.py）去重，已上传过的图片不产生网络请求。
+下载 / 上传并发由全局图片调度器（app/images/scheduler.py）控制，所有游戏共享。
+featured_only=True（头图优先模式）时只上传头图，截图记入 ctx.deferred_images，
+由 PostPublishProcessor 在发布后交给后台镜像任务（app/images/mirror.py）。
+"""
 
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import logging
-
-import httpx
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from app.core.context import GameContext
+from app.core.http import get_client
 from app.config import settings
+from app.images import optimizer
+from app.images.scheduler import PRIORITY_FEATURED, PRIORITY_GALLERY, image_scheduler
 from app.wordpress.client import WordPressClient
+from app.wordpress.media import media_filename, media_index
 
 logger = logging.getLogger(__name__)
 
 
 class ImageDownloadProcessor:
+    def __init__(self, featured_only: bool = False):
+        self.featured_only = featured_only
+
     async def process(self, ctx: GameContext) -> GameContext:
         urls = self._collect_image_urls(ctx.steam_data)
         if not urls:
             ctx.image_ids = []
             return ctx
 
-        wp = WordPressClient()
-        sem = asyncio.Semaphore(settings.max_image_concurrency)
-        tasks = [self._download_and_upload(url, ctx.app_id, i, sem, wp) for i, url in enumerate(urls)]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if self.featured_only:
+            ctx.deferred_images = urls[1:]
+            urls = urls[:1]
+
+        results = await self.upload_images(WordPressClient(), ctx.app_id, urls)
 
         ctx.image_ids = [r for r in results if isinstance(r, int) and r > 0]
         failed = sum(1 for r in results if isinstance(r, Exception))
@@ -34,6 +47,31 @@ class ImageDownloadProcessor:
 
         return ctx
 
+    async def upload_images(
+        self,
+        wp: WordPressClient,
+        app_id: int,
+        urls: list[str],
+        start: int = 0,
+        priority: int | None = None,
+    ) -> list:
+        """并发上传一组图片，返回 media ID 或异常（与 urls 一一对应）
+
+        start 为第一张图片在该游戏图片列表中的序号（决定文件名）；
+        未指定 priority 时序号 0（头图，用作 featured_media）优先获得全局传输名额。
+        """
+        known = await media_index.lookup(wp, app_id, urls)
+        tasks = []
+        for i, url in enumerate(urls, start):
+            if priority is None:
+                slot_priority = PRIORITY_FEATURED if i == 0 else PRIORITY_GALLERY
+            else:
+                slot_priority = priority
+            tasks.append(
+                self._download_and_upload(url, app_id, i, wp, known.get(url), priority=slot_priority)
+            )
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
     def supports(self, ctx: GameContext) -> bool:
         return bool(ctx.steam_data) and ctx.image_ids is None
 
@@ -50,27 +88,103 @@ class ImageDownloadProcessor:
         return urls[:11]  # 头图 + 最多10张截图
 
     async def _download_and_upload(
-        self, url: str, app_id: int, index: int, sem: asyncio.Semaphore, wp: WordPressClient
+        self,
+        url: str,
+        app_id: int,
+        index: int,
+        wp: WordPressClient,
+        known_id: int | None = None,
+        priority: int = PRIORITY_GALLERY,
     ) -> int:
-        """下载单张图片并上传到 WP 媒体库"""
-        async with sem:
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-            filename = f"steam_{app_id}_{index}_{url_hash}.jpg"
-
-            # 查重：搜索同名媒体
-            existing = await wp.search_media(filename)
+        """下载单张图片并上传到 WP 媒体库（已在索引中的直接复用）"""
+        filename = media_filename(app_id, index, url)
+
+        if known_id and not settings.wp_media_verify:
+            logger.debug(f"[ImageDownload] 索引命中 {filename} → media_id={known_id}")
+            return known_id
+
+        if known_id:
+            # 一致性校验：媒体可能已在后台被删除
+            async with image_scheduler.upload(priority):
+                exists = await wp.get_media(known_id)
+            if exists:
+                return known_id
+            logger.info(f"[ImageDownload] 索引中的媒体已不存在 media_id={known_id}，重新上传")
+            await media_index.forget(wp, known_id)
+        elif settings.wp_media_verify:
+            # 一致性校验：搜索索引之外上传的同名媒体（扩展名随优化格式变化，只按主名搜索）
+            async with image_scheduler.upload(priority):
+                existing = await wp.search_media(filename.rsplit(".", 1)[0])
             if existing:
                 media_id = existing.get("id", 0)
                 logger.info(f"[ImageDownload] 已存在 {filename} → media_id={media_id}")
+                await media_index.remember(wp, app_id, url, media_id, filename)
                 return media_id
 
-            # 下载
-            async with httpx.AsyncClient(timeout=settings.image_download_timeout) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-
-            # 上传到 WP
-            result = await wp.upload_media(resp.content, filename)
-            media_id = result.get("id", 0)
-            logger.info(f"[ImageDownload] 上传完成 {filename} → media_id={media_id}")
-            return media_id
+        media_id, filename, etag = await self._transfer(url, filename, wp, priority)
+        logger.info(f"[ImageDownload] 上传完成 {filename} → media_id={media_id}")
+        if media_id:
+            await media_index.remember(wp, app_id, url, media_id, filename, etag=etag)
+        return media_id
+
+    async def _transfer(
+        self, url: str, filename: str, wp: WordPressClient, priority: int
+    ) -> tuple[int, str, str | None]:
+        """从图片 CDN 转发到 WP 媒体库，返回 (media ID, 实际文件名, ETag)
+
+        默认流式转发：同时持有上传与下载名额，下载分块直接写入上传请求体。
+        启用图片优化时需要完整图片：先在下载名额内读入内存，
+        在进程池中优化后再取上传名额上传。
+        """
+        if not optimizer.is_enabled():
+            async with image_scheduler.transfer(priority), self._open(url) as (body, length, etag):
+                result = await wp.upload_media(body, filename, content_length=length)
+            return result.get("id", 0), filename, etag
+
+        async with image_scheduler.download(priority), self._open(url) as (body, _, etag):
+            data = b"".join([chunk async for chunk in body])
+
+        optimized = await optimizer.optimize(data)
+        if optimized is None:
+            async with image_scheduler.upload(priority):
+                result = await wp.upload_media(data, filename)
+            return result.get("id", 0), filename, etag
+
+        filename = f"{filename.rsplit('.', 1)[0]}.{optimized.ext}"
+        logger.debug(
+            f"[ImageDownload] 优化 {filename} {optimized.original_size // 1024}KB → "
+            f"{len(optimized.data) // 1024}KB ({optimized.width}x{optimized.height})"
+        )
+        async with image_scheduler.upload(priority):
+            result = await wp.upload_media(optimized.data, filename, mime_type=optimized.mime_type)
+        return result.get("id", 0), filename, etag
+
+    @asynccontextmanager
+    async def _open(self, url: str) -> AsyncIterator[tuple[AsyncIterator[bytes], int | None, str | None]]:
+        """打开图片下载流，产出 (分块迭代器, 长度, ETag)
+
+        按 image_chunk_size 分块读取，每个传输同时只持有一个分块；超过 image_max_bytes 时中止。
+        """
+        limit = settings.image_max_bytes
+        async with get_client("images").stream("GET", url) as resp:
+            resp.raise_for_status()
+
+            # 压缩传输时 Content-Length 是压缩后的长度，不能作为上传长度
+            length = None
+            if "content-encoding" not in resp.headers:
+                try:
+                    length = int(resp.headers["content-length"])
+                except (KeyError, ValueError):
+                    length = None
+            if length is not None and length > limit:
+                raise ValueError(f"图片过大 ({length} 字节 > {limit}): {url}")
+
+            async def body():
+                received = 0
+                async for chunk in resp.aiter_bytes(settings.image_chunk_size):
+                    received += len(chunk)
+                    if received > limit:
+                        raise ValueError(f"图片过大 (> {limit} 字节): {url}")
+                    yield chunk
+
+            yield body(), length, resp.headers.get("etag")
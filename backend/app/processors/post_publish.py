@@ -7,7 +7,7 @@ import logging
 from app.core.context import GameContext
 from app.core.events import event_bus
 from app.wordpress.client import WordPressClient
-from app.wordpress.seo import write_b2_seo
+from app.wordpress.seo import create_post_with_b2_seo
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +19,10 @@ class PostPublishProcessor:
     async def process(self, ctx: GameContext) -> GameContext:
         wp = WordPressClient()
 
-        # 1. 创建文章
-        post = await wp.create_post(
+        # 1. 创建文章，B2 SEO Meta 随同一请求写入（站点不支持时回退为两步）
+        post = await create_post_with_b2_seo(
+            wp,
+            ctx.seo,
             title=ctx.steam_data.get("name", ""),
             content=ctx.block_content or "",
             status=self.status,
@@ -30,22 +32,23 @@ class PostPublishProcessor:
         )
         ctx.post_id = post["id"]
 
-        # 2. 写入 B2 SEO Meta
-        if ctx.seo:
-            await write_b2_seo(wp, ctx.post_id, ctx.seo)
-
         logger.info(
             f"[PostPublish] 文章发布完成 | app_id={ctx.app_id} | "
             f"status={self.status} | post_id={ctx.post_id}"
         )
 
-        # 3. 触发事件（B2 扩展监听）
+        # 2. 触发事件（B2 扩展监听）
         await event_bus.emit(
             "post_published",
             post_id=ctx.post_id,
             context=ctx,
         )
 
+        # 3. 头图优先模式：截图交给后台镜像
+        if ctx.deferred_images:
+            from app.images.mirror import image_mirror
+            image_mirror.schedule(ctx.post_id, ctx.app_id, ctx.deferred_images)
+
         return ctx
 
     def supports(self, ctx: GameContext) -> bool:
@@ -33,7 +33,7 @@ async def collect_game_task(app_id: int, options: Optional[dict] = None, record_
         await crud.update_record_status(session, record_id, status="running")
 
     try:
-        game_ctx = GameContext(app_id=app_id)
+        game_ctx = GameContext(app_id=app_id, record_id=record_id)
         pipeline = _build_pipeline_from_options(options or {})
         game_ctx = await pipeline.run(game_ctx)
 
@@ -86,10 +86,12 @@ async def collect_game_task(app_id: int, options: Optional[dict] = None, record_
 
 def _build_pipeline_from_options(options: dict):
     """根据选项构建 Pipeline"""
+    from app.config import settings
     from app.core import Pipeline
     from app.processors.steam_fetch import SteamFetchProcessor
     from app.processors.duplicate_check import DuplicateCheckProcessor
     from app.processors.ai_analyze import AIAnalyzeProcessor
+    from app.processors.ai_combined import AICombinedProcessor
     from app.processors.ai_rewrite import AIRewriteProcessor
     from app.processors.image_download import ImageDownloadProcessor
     from app.processors.content_build import ContentBuildProcessor
@@ -99,12 +101,23 @@ def _build_pipeline_from_options(options: dict):
     pipeline.pipe(SteamFetchProcessor())
     pipeline.pipe(DuplicateCheckProcessor())
 
-    if options.get("enable_analyze", True):
-        pipeline.pipe(AIAnalyzeProcessor())
-    if options.get("enable_rewrite", True):
-        pipeline.pipe(AIRewriteProcessor(style=options.get("rewrite_style", "resource_site")))
-
-    pipeline.pipe(ImageDownloadProcessor())
+    enable_analyze = options.get("enable_analyze", True)
+    enable_rewrite = options.get("enable_rewrite", True)
+    style = options.get("rewrite_style", "resource_site")
+
+    # 合并模式成功后，下面的分析/改写步骤会自动跳过
+    if options.get("combined_ai", False) and enable_analyze and enable_rewrite:
+        pipeline.pipe(AICombinedProcessor(style=style))
+    if enable_analyze:
+        # 批量模式：并发任务的分析请求在时间窗口内合并
+        batch = options.get("batch_analyze", settings.ai_batch_analyze)
+        pipeline.pipe(AIAnalyzeProcessor(batch=batch))
+    if enable_rewrite:
+        pipeline.pipe(AIRewriteProcessor(style=style))
+
+    # 头图优先：发布前只上传头图，截图发布后后台镜像
+    image_mode = options.get("image_mode") or settings.image_publish_mode
+    pipeline.pipe(ImageDownloadProcessor(featured_only=image_mode == "featured"))
     pipeline.pipe(ContentBuildProcessor())
     pipeline.pipe(PostPublishProcessor(status=options.get("post_status", "draft")))
 
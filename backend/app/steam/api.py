@@ -1,59 +1,87 @@
-"""Steam API 封装 - 搜索和获取游戏详情"""
+"""Steam API 路由 - 搜索和获取游戏详情"""
 
 from __future__ import annotations
 
 import logging
+from typing import List, Optional
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from pydantic import BaseModel
 
 from app.api.auth import get_current_user
 from app.config import settings
+from app.core.singleflight import SingleFlight
+from app.steam import catalog
+from app.steam.cache import app_details_cache
+from app.steam.ratelimit import steam_limiter
+from app.steam.store import APP_DETAILS_URL, STORE_SEARCH_URL, get_price_overviews, steam_get
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-STORE_SEARCH_URL = "https://store.steampowered.com/api/storesearch/"
-APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails"
+# 合并并发的相同 Steam 请求
+_search_flight = SingleFlight("steam_search")
+_details_flight = SingleFlight("steam_details")
 
 
 async def search_games(query: str, page_size: int = 10) -> list[dict]:
-    """搜索 Steam 游戏"""
+    """搜索 Steam 游戏（优先本地目录，无结果时回退远程 storesearch）"""
+    if settings.steam_catalog_search and catalog.is_available():
+        items = await catalog.search(query, limit=page_size)
+        if items:
+            return items
+
     params = {
         "term": query,
         "cc": settings.steam_country_code,
         "l": settings.steam_language,
         "pagesize": page_size,
     }
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(STORE_SEARCH_URL, params=params)
-        resp.raise_for_status()
-        data = resp.json()
-    return data.get("items", [])
+
+    async def fetch() -> list[dict]:
+        resp = await steam_get(STORE_SEARCH_URL, params)
+        return resp.json().get("items", [])
+
+    key = (query.strip().lower(), page_size, params["cc"], params["l"])
+    return await _search_flight.do(key, fetch)
 
 
 async def get_app_details(app_id: int) -> dict | None:
-    """获取 Steam 游戏详情"""
-    params = {
-        "appids": str(app_id),
-        "cc": settings.steam_country_code,
-        "l": settings.steam_language,
-    }
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(APP_DETAILS_URL, params=params)
-        resp.raise_for_status()
+    """获取 Steam 游戏详情（优先读取 appdetails 缓存，需要最新数据时先 DELETE /api/steam/cache）"""
+    cc = settings.steam_country_code
+    language = settings.steam_language
+
+    cached = await app_details_cache.get(app_id, cc, language)
+    if cached is not None:
+        logger.debug(f"[Steam] appdetails 缓存命中 app_id={app_id}")
+        return cached
+
+    async def fetch() -> dict | None:
+        params = {
+            "appids": str(app_id),
+            "cc": cc,
+            "l": language,
+        }
+        resp = await steam_get(APP_DETAILS_URL, params)
         data = resp.json()
 
-    app_data = data.get(str(app_id), {})
-    if not app_data.get("success"):
-        return None
-    return app_data.get("data")
+        app_data = data.get(str(app_id), {})
+        if not app_data.get("success"):
+            return None
+
+        details = app_data.get("data")
+        if details:
+            await app_details_cache.set(app_id, cc, language, details)
+        return details
+
+    return await _details_flight.do((app_id, cc, language), fetch)
 
 
 # ---- 路由 ----
 
 @router.get("/search")
-async def api_search(q: str = Query(..., min_length=1), limit: int = Query(10, le=25), _user: str = Depends(get_current_user)):
+async def api_search(q: str = Query(..., min_length=1), limit: int = Query(10, le=100), _user: str = Depends(get_current_user)):
     """搜索 Steam 游戏"""
     try:
         items = await search_games(q, page_size=limit)
@@ -72,3 +100,64 @@ async def api_app_details(app_id: int, _user: str = Depends(get_current_user)):
     if data is None:
         raise HTTPException(404, f"未找到游戏 app_id={app_id}")
     return data
+
+
+class PriceRequest(BaseModel):
+    app_ids: List[int]
+
+
+@router.post("/prices")
+async def api_prices(req: PriceRequest, _user: str = Depends(get_current_user)):
+    """批量获取价格/折扣"""
+    prices = await get_price_overviews(req.app_ids)
+    return {"items": {str(k): v for k, v in prices.items()}, "total": len(prices)}
+
+
+@router.get("/catalog/stats")
+async def api_catalog_stats(_user: str = Depends(get_current_user)):
+    """本地应用目录状态"""
+    return {
+        "available": catalog.is_available(),
+        "enabled": settings.steam_catalog_search,
+        "total": await catalog.count_apps(),
+    }
+
+
+@router.post("/catalog/import")
+async def api_catalog_import(file: UploadFile = File(...), _user: str = Depends(get_current_user)):
+    """导入 Steam 应用列表导出文件（GetAppList JSON 或 appid,name CSV），全量替换"""
+    if not catalog.is_available():
+        raise HTTPException(400, "本地目录不可用（需要 SQLite FTS5）")
+    try:
+        apps = catalog.parse_app_list(await file.read())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(400, f"文件解析失败: {e}")
+    if not apps:
+        raise HTTPException(400, "文件中没有有效的应用记录")
+    count = await catalog.import_apps(apps)
+    return {"ok": True, "imported": count}
+
+
+@router.get("/cache/stats")
+async def api_cache_stats(_user: str = Depends(get_current_user)):
+    """appdetails 缓存命中统计 + 请求合并统计"""
+    return {
+        **app_details_cache.stats(),
+        "singleflight": {
+            "search": _search_flight.stats(),
+            "details": _details_flight.stats(),
+        },
+    }
+
+
+@router.get("/ratelimit")
+async def api_ratelimit_stats(_user: str = Depends(get_current_user)):
+    """全局限速器状态：当前等待时间、限流次数"""
+    return steam_limiter.stats()
+
+
+@router.delete("/cache")
+async def api_cache_clear(app_id: Optional[int] = None, _user: str = Depends(get_current_user)):
+    """清除 appdetails 缓存（可指定 app_id）"""
+    deleted = await app_details_cache.invalidate(app_id)
+    return {"ok": True, "deleted": deleted}
@@ -0,0 +1,111 @@
+"""Steam appdetails 缓存 - 内存 LRU + SQLite 持久化
+
+按 (app_id, cc, language) 缓存 appdetails 的 data 字段，
+预览 → 发布、失败重试等流程不再重复下载同一份数据。
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from collections import OrderedDict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[int, str, str]
+
+
+class AppDetailsCache:
+    """两级缓存：内存 LRU 在前，数据库表 steam_app_cache 在后"""
+
+    def __init__(self):
+        self._memory: OrderedDict[CacheKey, tuple[datetime.datetime, dict]] = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _is_fresh(fetched_at: datetime.datetime) -> bool:
+        age = (datetime.datetime.now() - fetched_at).total_seconds()
+        return age < settings.steam_cache_ttl
+
+    def _remember(self, key: CacheKey, fetched_at: datetime.datetime, data: dict):
+        self._memory[key] = (fetched_at, data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > max(settings.steam_cache_memory_size, 0):
+            self._memory.popitem(last=False)
+
+    async def get(self, app_id: int, cc: str, language: str) -> dict | None:
+        """读取缓存，过期或不存在返回 None"""
+        if settings.steam_cache_ttl <= 0:
+            return None
+
+        key = (app_id, cc, language)
+        entry = self._memory.get(key)
+        if entry and self._is_fresh(entry[0]):
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[1]
+        self._memory.pop(key, None)
+
+        from app.db.engine import async_session
+        from app.db import crud
+
+        async with async_session() as session:
+            row = await crud.get_steam_cache(session, app_id, cc, language)
+        if row and self._is_fresh(row.fetched_at):
+            self._remember(key, row.fetched_at, row.data)
+            self.db_hits += 1
+            return row.data
+
+        self.misses += 1
+        return None
+
+    async def set(self, app_id: int, cc: str, language: str, data: dict):
+        """写入缓存（内存 + 数据库）"""
+        if settings.steam_cache_ttl <= 0:
+            return
+
+        from app.db.engine import async_session
+        from app.db import crud
+
+        self._remember((app_id, cc, language), datetime.datetime.now(), data)
+        try:
+            async with async_session() as session:
+                await crud.upsert_steam_cache(session, app_id, cc, language, data)
+        except Exception as e:
+            logger.warning(f"[SteamCache] 持久化失败 app_id={app_id}: {e}")
+
+    async def invalidate(self, app_id: int | None = None) -> int:
+        """清除缓存（不指定 app_id 时清空全部），返回删除的数据库条目数"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        if app_id is None:
+            self._memory.clear()
+        else:
+            for key in [k for k in self._memory if k[0] == app_id]:
+                del self._memory[key]
+
+        async with async_session() as session:
+            return await crud.delete_steam_cache(session, app_id)
+
+    def stats(self) -> dict:
+        """命中/未命中计数"""
+        hits = self.memory_hits + self.db_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "memory_size": len(self._memory),
+            "ttl": settings.steam_cache_ttl,
+        }
+
+
+# 全局缓存实例
+app_details_cache = AppDetailsCache()
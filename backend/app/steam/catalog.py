@@ -0,0 +1,201 @@
+"""本地 Steam 应用目录 - SQLite FTS5 全文索引
+
+从 Steam 应用列表导出文件（GetAppList JSON / CSV）导入 appid + 名称，
+本地完成前缀与中日韩文字匹配，搜索无需访问 storesearch。
+仅在 SQLite 且支持 FTS5 时启用，否则 search_games 回退到远程搜索。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import re
+
+from sqlalchemy import text
+
+from app.db.engine import engine
+
+logger = logging.getLogger(__name__)
+
+TABLE = "steam_app_catalog"
+CAPSULE_URL = "https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/capsule_231x87.jpg"
+
+# 中日韩文字（汉字、假名、谚文）逐字切分，使 unicode61 分词器按单字建索引
+_CJK_RE = re.compile(
+    "([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff])"
+)
+_TOKEN_RE = re.compile(r"\w+")
+
+# 排序前的候选集上限
+_CANDIDATES = 500
+
+_available = False
+
+
+def _segment(value: str) -> str:
+    """小写化，并在每个 CJK 字符两侧插入空格"""
+    return _CJK_RE.sub(r" \1 ", value.lower())
+
+
+def _is_cjk(token: str) -> bool:
+    return len(token) == 1 and bool(_CJK_RE.match(token))
+
+
+def build_match_query(query: str) -> str:
+    """把用户输入转为 FTS5 MATCH 表达式
+
+    - 拉丁词：前缀匹配 "elden"*
+    - 连续 CJK 字符：短语匹配 "艾 尔 登"（保持字序）
+    """
+    terms: list[str] = []
+    cjk_run: list[str] = []
+
+    def flush_cjk():
+        if cjk_run:
+            terms.append('"' + " ".join(cjk_run) + '"')
+            cjk_run.clear()
+
+    # 先按用户输入的空白分词，CJK 短语不跨越原有的空格
+    for word in query.split():
+        for token in _TOKEN_RE.findall(_segment(word)):
+            if _is_cjk(token):
+                cjk_run.append(token)
+                continue
+            flush_cjk()
+            terms.append(f'"{token}"*')
+        flush_cjk()
+    return " ".join(terms)
+
+
+def is_available() -> bool:
+    return _available
+
+
+async def init_catalog():
+    """创建 FTS5 虚拟表（在 FastAPI lifespan 中调用）"""
+    global _available
+    if engine.dialect.name != "sqlite":
+        logger.info("[Catalog] 非 SQLite 数据库，本地目录已禁用")
+        return
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                "appid UNINDEXED, name UNINDEXED, tokens, "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+        _available = True
+    except Exception as e:
+        logger.warning(f"[Catalog] FTS5 不可用，本地目录已禁用: {e}")
+
+
+def parse_app_list(raw: bytes) -> list[tuple[int, str]]:
+    """解析应用列表导出文件
+
+    支持：
+    - ISteamApps/GetAppList: {"applist": {"apps": [{"appid", "name"}]}}
+    - IStoreService/GetAppList: {"response": {"apps": [...]}}
+    - 直接的 JSON 数组 [{"appid", "name"}]
+    - CSV: appid,name
+    """
+    content = raw.decode("utf-8-sig")
+    stripped = content.lstrip()
+
+    if stripped.startswith(("{", "[")):
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = (data.get("applist") or data.get("response") or {}).get("apps", [])
+        rows = ((a.get("appid"), a.get("name")) for a in data if isinstance(a, dict))
+    else:
+        rows = (
+            (r[0], r[1]) for r in csv.reader(io.StringIO(content)) if len(r) >= 2
+        )
+
+    apps: dict[int, str] = {}
+    for app_id, name in rows:
+        try:
+            app_id = int(app_id)
+        except (TypeError, ValueError):
+            continue  # 表头或脏数据
+        name = (name or "").strip()
+        if name:
+            apps[app_id] = name
+    return list(apps.items())
+
+
+async def import_apps(apps: list[tuple[int, str]]) -> int:
+    """全量替换目录内容，返回导入条数"""
+    if not _available:
+        raise RuntimeError("本地目录不可用（需要 SQLite FTS5）")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM {TABLE}"))
+        batch_size = 5000
+        for i in range(0, len(apps), batch_size):
+            await conn.execute(
+                text(
+                    f"INSERT INTO {TABLE} (rowid, appid, name, tokens) "
+                    "VALUES (:appid, :appid, :name, :tokens)"
+                ),
+                [
+                    {"appid": app_id, "name": name, "tokens": _segment(name)}
+                    for app_id, name in apps[i:i + batch_size]
+                ],
+            )
+    logger.info(f"[Catalog] 已导入 {len(apps)} 个应用")
+    return len(apps)
+
+
+async def count_apps() -> int:
+    if not _available:
+        return 0
+    async with engine.connect() as conn:
+        result = await conn.execute(text(f"SELECT count(*) FROM {TABLE}"))
+        return result.scalar() or 0
+
+
+def _to_item(app_id: int, name: str) -> dict:
+    """转换为与 storesearch items 相同的结构"""
+    return {
+        "type": "app",
+        "id": int(app_id),
+        "name": name,
+        "tiny_image": CAPSULE_URL.format(app_id=app_id),
+        "price": None,  # 本地目录无价格信息
+        "source": "local",
+    }
+
+
+async def search(query: str, limit: int = 10) -> list[dict]:
+    """本地搜索：纯数字按 appid 精确匹配，其余走 FTS5"""
+    if not _available:
+        return []
+
+    query = query.strip()
+    async with engine.connect() as conn:
+        if query.isdigit():
+            result = await conn.execute(
+                text(f"SELECT appid, name FROM {TABLE} WHERE rowid = :appid"),
+                {"appid": int(query)},
+            )
+            rows = result.all()
+            if rows:
+                return [_to_item(r.appid, r.name) for r in rows]
+
+        match = build_match_query(query)
+        if not match:
+            return []
+        # 候选集按 FTS5 rank（bm25）取相关度最高的前 N 条，
+        # 再以名称长度作为同分时的次序（完整名称命中优先于续作/DLC）
+        result = await conn.execute(
+            text(
+                "SELECT appid, name FROM ("
+                f"SELECT appid, name, rank AS score FROM {TABLE} "
+                f"WHERE {TABLE} MATCH :match ORDER BY rank LIMIT :candidates"
+                ") ORDER BY score, length(name) LIMIT :limit"
+            ),
+            {"match": match, "candidates": _CANDIDATES, "limit": limit},
+        )
+        return [_to_item(r.appid, r.name) for r in result.all()]
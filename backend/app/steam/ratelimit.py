@@ -0,0 +1,113 @@
+"""Steam 全局限速器 - 异步令牌桶
+
+所有 Steam 请求共享同一个令牌桶：
+- 速率 = 1 / steam_request_delay（每次取令牌时读取，设置修改后立即生效）
+- 容量 = steam_rate_burst（允许的瞬时突发数）
+- 收到 429 时按 Retry-After 暂停整个桶，避免并发任务继续撞限流
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """FIFO 公平的异步令牌桶"""
+
+    def __init__(self):
+        self._lock: asyncio.Lock | None = None  # 惰性创建，绑定到运行中的事件循环
+        self._tokens = float(max(settings.steam_rate_burst, 1))
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    @property
+    def rate(self) -> float:
+        """每秒令牌数，0 表示不限速"""
+        delay = settings.steam_request_delay
+        return 1.0 / delay if delay > 0 else 0.0
+
+    @property
+    def capacity(self) -> float:
+        return float(max(settings.steam_rate_burst, 1))
+
+    def _refill(self, now: float):
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = self.capacity
+        self._updated = now
+
+    def _next_wait(self, now: float) -> float:
+        """当前队首还需等待的秒数"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1 or not self.rate:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        """取一个令牌，不足时按到达顺序排队等待"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        self._waiting += 1
+        start = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._next_wait(now)
+                    if wait <= 0:
+                        self._tokens -= 1
+                        break
+                    await asyncio.sleep(wait)
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        if waited > 0.5:
+            logger.debug(f"[SteamLimiter] 等待 {waited:.2f}s")
+
+    def penalize(self, retry_after: float):
+        """收到 429：清空令牌并暂停 retry_after 秒"""
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        self._tokens = 0.0
+        self._updated = now
+        self.throttled += 1
+        logger.warning(f"[SteamLimiter] Steam 限流，暂停 {retry_after:.1f}s（累计 {self.throttled} 次）")
+
+    def stats(self) -> dict:
+        """当前等待时间与限流统计"""
+        now = time.monotonic()
+        self._refill(now)
+        interval = 1 / self.rate if self.rate else 0.0
+        # 新请求的预计等待 = 队首等待 + 前面排队者各占一个间隔
+        current_wait = self._next_wait(now) + self._waiting * interval
+        return {
+            "request_delay": settings.steam_request_delay,
+            "burst": int(self.capacity),
+            "waiting": self._waiting,
+            "current_wait": round(current_wait, 3),
+            "blocked_for": round(max(self._blocked_until - now, 0.0), 3),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+        }
+
+
+# 全局限速器实例（所有 Steam 调用共享）
+steam_limiter = TokenBucketLimiter()
@@ -0,0 +1,85 @@
+"""Steam 商店接口请求 - 全局限速、429 重试与批量价格查询
+
+路由（app/steam/api.py）和后台任务（B2 折扣刷新等）共用，本模块不依赖 FastAPI。
+"""
+
+from __future__ import annotations
+
+import logging
+
+import httpx
+
+from app.config import settings
+from app.core.http import get_client
+from app.steam.ratelimit import steam_limiter
+
+logger = logging.getLogger(__name__)
+
+STORE_SEARCH_URL = "https://store.steampowered.com/api/storesearch/"
+APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails"
+
+# filters=price_overview 时 appdetails 支持多个 appid（逗号分隔）
+PRICE_BATCH_SIZE = 200
+
+
+def _retry_after(resp: httpx.Response, attempt: int) -> float:
+    """解析 Retry-After 头，缺失时指数退避"""
+    value = resp.headers.get("Retry-After", "")
+    try:
+        return max(float(value), 1.0)
+    except ValueError:
+        base = max(settings.steam_request_delay, 5.0)
+        return min(base * (2 ** attempt), 120.0)
+
+
+async def steam_get(url: str, params: dict) -> httpx.Response:
+    """经全局限速器发送 Steam 请求，429 时暂停并重试"""
+    max_retries = settings.steam_max_retries
+    for attempt in range(max_retries + 1):
+        await steam_limiter.acquire()
+        resp = await get_client("steam").get(url, params=params)
+        if resp.status_code != 429 or attempt == max_retries:
+            break
+        steam_limiter.penalize(_retry_after(resp, attempt))
+
+    resp.raise_for_status()
+    return resp
+
+
+async def get_price_overviews(
+    app_ids: list[int], chunk_size: int = PRICE_BATCH_SIZE
+) -> dict[int, dict]:
+    """批量获取价格/折扣信息
+
+    使用 filters=price_overview 一次请求多个 appid，按 chunk_size 分块，
+    每块都经过全局限速器。返回 {app_id: price_overview}，
+    免费或无价格的游戏为 {}，请求失败的 app_id 不出现在结果中。
+    """
+    result: dict[int, dict] = {}
+    unique_ids = list(dict.fromkeys(app_ids))
+
+    for i in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[i:i + chunk_size]
+        params = {
+            "appids": ",".join(str(a) for a in chunk),
+            "filters": "price_overview",
+            "cc": settings.steam_country_code,
+            "l": settings.steam_language,
+        }
+        try:
+            resp = await steam_get(APP_DETAILS_URL, params)
+            data = resp.json()
+        except httpx.HTTPError as e:
+            logger.warning(f"[Steam] 价格批量请求失败 ({len(chunk)} 个 appid): {e}")
+            continue
+
+        for app_id in chunk:
+            app_data = data.get(str(app_id), {})
+            if not app_data.get("success"):
+                continue
+            # 无价格时 Steam 返回空列表而不是对象
+            payload = app_data.get("data") or {}
+            result[app_id] = payload.get("price_overview", {}) if isinstance(payload, dict) else {}
+
+    logger.info(f"[Steam] 价格批量刷新 {len(result)}/{len(unique_ids)} 个")
+    return result
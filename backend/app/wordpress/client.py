@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+import html
 import logging
+from typing import AsyncIterable
 
 import httpx
 
 from app.config import settings
+from app.core.http import get_client
+from app.wordpress.taxonomy import CategoryIndex, category_cache, tag_cache
 
 logger = logging.getLogger(__name__)
 
+# 分页拉取集合（分类法 / 媒体库）时的每页条数（WP REST API 上限）与并发页数
+_PER_PAGE = 100
+_PAGE_CONCURRENCY = 4
+
 
 class WordPressClient:
     """WordPress REST API 封装"""
@@ -26,8 +35,11 @@ class WordPressClient:
             app_password or settings.wp_app_password,
         )
 
-    def _client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(auth=self._auth, timeout=30.0)
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """通过共享连接池发送请求（认证信息按请求携带）"""
+        return await get_client("wordpress").request(
+            method, f"{self.base_url}{path}", auth=self._auth, **kwargs
+        )
 
     async def create_post(
         self,
@@ -55,114 +67,167 @@ class WordPressClient:
         if featured_media:
             data["featured_media"] = featured_media
 
-        async with self._client() as client:
-            resp = await client.post(
-                f"{self.base_url}/wp-json/wp/v2/posts", json=data
-            )
-            resp.raise_for_status()
-            result = resp.json()
+        resp = await self._request("POST", "/wp-json/wp/v2/posts", json=data)
+        resp.raise_for_status()
+        result = resp.json()
 
         logger.info(f"[WP] 文章创建 id={result.get('id')} title={title[:30]}")
         return result
 
     async def update_post(self, post_id: int, **kwargs) -> dict:
         """更新文章"""
-        async with self._client() as client:
-            resp = await client.post(
-                f"{self.base_url}/wp-json/wp/v2/posts/{post_id}", json=kwargs
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await self._request("POST", f"/wp-json/wp/v2/posts/{post_id}", json=kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_post(self, post_id: int, context: str = "view", fields: str | None = None) -> dict:
+        """获取文章（context=edit 时返回 content.raw 等原始内容）"""
+        params = {"context": context}
+        if fields:
+            params["_fields"] = fields
+        resp = await self._request("GET", f"/wp-json/wp/v2/posts/{post_id}", params=params)
+        resp.raise_for_status()
+        return resp.json()
 
     async def set_post_meta(self, post_id: int, meta: dict) -> dict:
         """写入文章 meta 字段"""
         return await self.update_post(post_id, meta=meta)
 
     async def upload_media(
-        self, image_bytes: bytes, filename: str, mime_type: str = "image/jpeg"
+        self,
+        image: bytes | AsyncIterable[bytes],
+        filename: str,
+        mime_type: str = "image/jpeg",
+        content_length: int | None = None,
     ) -> dict:
-        """上传图片到媒体库"""
+        """上传图片到媒体库
+
+        image 可以是完整字节，也可以是异步字节流（边下载边上传，不在内存中缓冲整张图片）；
+        流式上传时已知长度应通过 content_length 传入，否则使用分块传输编码。
+        """
         headers = {
             "Content-Disposition": f'attachment; filename="{filename}"',
             "Content-Type": mime_type,
         }
-        async with self._client() as client:
-            resp = await client.post(
-                f"{self.base_url}/wp-json/wp/v2/media",
-                content=image_bytes,
-                headers=headers,
-            )
-            resp.raise_for_status()
-            result = resp.json()
+        if content_length is not None and not isinstance(image, bytes):
+            headers["Content-Length"] = str(content_length)
+        resp = await self._request(
+            "POST", "/wp-json/wp/v2/media", content=image, headers=headers
+        )
+        resp.raise_for_status()
+        result = resp.json()
 
         logger.info(f"[WP] 媒体上传 id={result.get('id')} file={filename}")
         return result
 
     async def search_media(self, search: str) -> dict | None:
         """搜索媒体库（用于去重）"""
-        async with self._client() as client:
-            resp = await client.get(
-                f"{self.base_url}/wp-json/wp/v2/media",
-                params={"search": search, "per_page": 1},
-            )
-            resp.raise_for_status()
-            items = resp.json()
+        resp = await self._request(
+            "GET", "/wp-json/wp/v2/media", params={"search": search, "per_page": 1}
+        )
+        resp.raise_for_status()
+        items = resp.json()
         return items[0] if items else None
 
+    async def get_media(self, media_id: int) -> dict | None:
+        """获取单个媒体（不存在时返回 None）"""
+        resp = await self._request(
+            "GET", f"/wp-json/wp/v2/media/{media_id}", params={"_fields": "id,source_url"}
+        )
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
     async def get_categories(self) -> list[dict]:
-        """获取所有文章分类"""
-        async with self._client() as client:
-            resp = await client.get(
-                f"{self.base_url}/wp-json/wp/v2/categories",
-                params={"per_page": 100},
-            )
-            resp.raise_for_status()
-            return resp.json()
+        """获取所有文章分类（分页拉取，跨任务缓存）"""
+        return (await category_cache.get(self)).categories
+
+    async def get_category_index(self) -> CategoryIndex:
+        """获取全部分类及名称索引（跨任务缓存）"""
+        return await category_cache.get(self)
 
     async def create_category(self, name: str, parent: int = 0) -> dict:
         """创建文章分类"""
-        async with self._client() as client:
-            resp = await client.post(
-                f"{self.base_url}/wp-json/wp/v2/categories",
-                json={"name": name, "parent": parent},
-            )
-            resp.raise_for_status()
-            result = resp.json()
+        resp = await self._request(
+            "POST", "/wp-json/wp/v2/categories", json={"name": name, "parent": parent}
+        )
+        resp.raise_for_status()
+        result = resp.json()
+        category_cache.invalidate(self.base_url)
         logger.info(f"[WP] 分类创建 id={result.get('id')} name={name}")
         return result
 
+    async def list_terms(self, taxonomy: str, fields: str = "id,name") -> list[dict]:
+        """分页拉取某分类法（tags / categories）的全部词条"""
+        return await self._list_all(f"/wp-json/wp/v2/{taxonomy}", {"_fields": fields})
+
+    async def list_media(self, fields: str = "id,source_url", **params) -> list[dict]:
+        """分页拉取媒体库全部条目（可附加 media_type 等过滤参数）"""
+        return await self._list_all("/wp-json/wp/v2/media", {"_fields": fields, **params})
+
+    async def _list_all(self, path: str, params: dict) -> list[dict]:
+        """按 X-WP-TotalPages 分页拉取集合的全部条目"""
+        async def fetch_page(page: int) -> httpx.Response:
+            resp = await self._request(
+                "GET", path, params={**params, "per_page": _PER_PAGE, "page": page}
+            )
+            resp.raise_for_status()
+            return resp
+
+        first = await fetch_page(1)
+        items = list(first.json())
+        try:
+            total_pages = int(first.headers.get("X-WP-TotalPages", 1))
+        except ValueError:
+            total_pages = 1
+
+        if total_pages > 1:
+            sem = asyncio.Semaphore(_PAGE_CONCURRENCY)
+
+            async def bounded(page: int) -> list[dict]:
+                async with sem:
+                    return (await fetch_page(page)).json()
+
+            pages = await asyncio.gather(*(bounded(p) for p in range(2, total_pages + 1)))
+            for page_items in pages:
+                items.extend(page_items)
+        return items
+
     async def _resolve_tag_ids(self, tag_names: list[str]) -> list[int]:
-        """将标签名转为 tag ID（不存在则创建）"""
-        ids = []
-        async with self._client() as client:
-            for name in tag_names:
-                # 先搜索
-                resp = await client.get(
-                    f"{self.base_url}/wp-json/wp/v2/tags",
-                    params={"search": name, "per_page": 1},
-                )
-                resp.raise_for_status()
-                existing = resp.json()
-                if existing and existing[0].get("name") == name:
-                    ids.append(existing[0]["id"])
-                else:
-                    # 创建
-                    resp = await client.post(
-                        f"{self.base_url}/wp-json/wp/v2/tags",
-                        json={"name": name},
-                    )
-                    if resp.status_code in (200, 201):
-                        ids.append(resp.json()["id"])
-        return ids
+        """将标签名转为 tag ID（本地缓存优先，未知标签并发解析，不存在则创建）"""
+        return await tag_cache.resolve(self, tag_names)
+
+    async def resolve_tag_id(self, name: str) -> int | None:
+        """解析单个标签：先搜索，不存在则创建"""
+        resp = await self._request(
+            "GET", "/wp-json/wp/v2/tags", params={"search": name, "per_page": 10, "_fields": "id,name"}
+        )
+        resp.raise_for_status()
+        for tag in resp.json():
+            if html.unescape(tag.get("name", "")).strip().lower() == name.strip().lower():
+                return tag["id"]
+
+        resp = await self._request("POST", "/wp-json/wp/v2/tags", json={"name": name})
+        if resp.status_code in (200, 201):
+            return resp.json()["id"]
+
+        # 并发创建或搜索漏检时返回 term_exists，错误数据中带有已有标签的 ID
+        try:
+            error = resp.json()
+        except ValueError:
+            error = {}
+        if error.get("code") == "term_exists":
+            term_id = (error.get("data") or {}).get("term_id")
+            if term_id:
+                return int(term_id)
+        logger.warning(f"[WP] 标签创建失败 '{name}': HTTP {resp.status_code}")
+        return None
 
     async def check_connection(self) -> bool:
         """测试连接"""
         try:
-            async with self._client() as client:
-                resp = await client.get(
-                    f"{self.base_url}/wp-json/wp/v2/posts",
-                    params={"per_page": 1},
-                )
-                return resp.status_code == 200
+            resp = await self._request("GET", "/wp-json/wp/v2/posts", params={"per_page": 1})
+            return resp.status_code == 200
         except Exception:
             return False
@@ -0,0 +1,175 @@
+"""WordPress 媒体去重索引
+
+图片上传前按 (app_id, 来源 URL 哈希) 查本地 wp_media_index 表，
+已上传过的图片直接复用 media ID，不再对媒体库做全文搜索（search_media）。
+
+- 上传成功后写入索引（含来源 URL、ETag、文件名）
+- backfill() 分页拉取 /wp/v2/media，按文件名（steam_{app_id}_{序号}_{URL 哈希}）
+  回填索引，用于接入本索引之前已上传的图片
+- SC_WP_MEDIA_VERIFY=true 时仍用 search_media 做一致性校验（见 ImageDownloadProcessor）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import posixpath
+import re
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.core.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from app.wordpress.client import WordPressClient
+
+logger = logging.getLogger(__name__)
+
+# 上传文件名格式，WordPress 可能追加 -1 / -scaled 等后缀
+_FILENAME_RE = re.compile(r"^steam_(\d+)_\d+_([0-9a-f]{8})")
+
+
+def url_hash(url: str) -> str:
+    """来源 URL 哈希（写入文件名，也是索引键）"""
+    return hashlib.md5(url.encode()).hexdigest()[:8]
+
+
+def media_filename(app_id: int, index: int, url: str, ext: str = "jpg") -> str:
+    return f"steam_{app_id}_{index}_{url_hash(url)}.{ext}"
+
+
+def parse_filename(source_url: str) -> tuple[int, str] | None:
+    """媒体库文件地址 → (app_id, URL 哈希)，非本工具上传的文件返回 None"""
+    name = posixpath.basename(urlparse(source_url).path)
+    match = _FILENAME_RE.match(name)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+class MediaIndex:
+    """按站点记录已上传图片的 media ID"""
+
+    def __init__(self):
+        self._backfill_flight = SingleFlight("wp_media_backfill")
+        self.hits = 0
+        self.misses = 0
+        self.last_backfill: dict[str, dict] = {}
+
+    async def lookup(self, wp: WordPressClient, app_id: int, urls: list[str]) -> dict[str, int]:
+        """批量查询已上传的图片 {来源 URL: media ID}（一次数据库查询）"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        keys = {url: (app_id, url_hash(url)) for url in urls}
+        try:
+            async with async_session() as session:
+                found = await crud.get_wp_media(session, wp.base_url, list(set(keys.values())))
+        except Exception as e:
+            logger.warning(f"[MediaIndex] 查询索引失败: {e}")
+            found = {}
+
+        result = {url: found[key] for url, key in keys.items() if key in found}
+        self.hits += len(result)
+        self.misses += len(urls) - len(result)
+        return result
+
+    async def remember(
+        self,
+        wp: WordPressClient,
+        app_id: int,
+        url: str,
+        media_id: int,
+        filename: str = "",
+        etag: str | None = None,
+    ):
+        """记录一次上传（失败只记日志）"""
+        await self._upsert(wp.base_url, [{
+            "app_id": app_id,
+            "url_hash": url_hash(url),
+            "media_id": media_id,
+            "filename": filename,
+            "source_url": url,
+            "etag": etag,
+        }])
+
+    async def forget(self, wp: WordPressClient, media_id: int):
+        """媒体已从媒体库删除时移除索引"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        try:
+            async with async_session() as session:
+                await crud.delete_wp_media(session, wp.base_url, media_id)
+        except Exception as e:
+            logger.warning(f"[MediaIndex] 删除索引失败 media_id={media_id}: {e}")
+
+    async def _upsert(self, site: str, items: list[dict]):
+        from app.db.engine import async_session
+        from app.db import crud
+
+        try:
+            async with async_session() as session:
+                await crud.upsert_wp_media(session, site, items)
+        except Exception as e:
+            logger.warning(f"[MediaIndex] 写入索引失败: {e}")
+
+    async def backfill(self, wp: WordPressClient) -> dict:
+        """从媒体库全量回填索引（同一站点的并发回填合并为一次）"""
+        return await self._backfill_flight.do(wp.base_url, lambda: self._backfill(wp))
+
+    async def _backfill(self, wp: WordPressClient) -> dict:
+        start = time.monotonic()
+        items = await wp.list_media(fields="id,source_url", media_type="image")
+
+        rows = []
+        for item in items:
+            parsed = parse_filename(item.get("source_url") or "")
+            if parsed is None:
+                continue
+            app_id, hashed = parsed
+            rows.append({
+                "app_id": app_id,
+                "url_hash": hashed,
+                "media_id": item["id"],
+                "filename": posixpath.basename(urlparse(item["source_url"]).path),
+            })
+        await self._upsert(wp.base_url, rows)
+
+        result = {
+            "scanned": len(items),
+            "indexed": len(rows),
+            "elapsed": round(time.monotonic() - start, 1),
+        }
+        self.last_backfill[wp.base_url] = result
+        logger.info(f"[MediaIndex] 回填完成 | 媒体={len(items)} 索引={len(rows)} | {wp.base_url}")
+        return result
+
+    async def clear(self, site: str | None = None) -> int:
+        """清空某站点的索引"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        site = (site or settings.wp_url).rstrip("/")
+        async with async_session() as session:
+            return await crud.delete_wp_media(session, site)
+
+    async def stats(self) -> dict:
+        from app.db.engine import async_session
+        from app.db import crud
+
+        async with async_session() as session:
+            sites = await crud.count_wp_media(session)
+        return {
+            "sites": sites,
+            "hits": self.hits,
+            "misses": self.misses,
+            "verify": settings.wp_media_verify,
+            "last_backfill": self.last_backfill,
+        }
+
+
+# 全局索引（所有 WordPressClient 实例共享）
+media_index = MediaIndex()
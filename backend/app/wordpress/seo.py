@@ -4,10 +4,17 @@
 - zrz_seo_title
 - zrz_seo_keywords
 - zrz_seo_description
+
+发布时优先随创建文章一起提交 meta（一次写入）；站点拒绝或忽略创建时的 meta
+（meta 未注册到 REST）时，回退为创建后再 update_post 写入，并记住该站点以后直接走两步。
 """
 
+from __future__ import annotations
+
 import logging
 
+import httpx
+
 from app.core.context import SEOData
 from app.wordpress.client import WordPressClient
 
@@ -21,12 +28,78 @@ SEO_META_KEYS = {
 }
 
 
-async def write_b2_seo(wp_client: WordPressClient, post_id: int, seo: SEOData):
-    """将 SEO 数据写入 B2 主题的 meta 字段"""
-    meta = {
+# 站点是否接受创建文章时提交的 SEO meta（站点地址 → bool）
+_meta_on_create: dict[str, bool] = {}
+
+
+def b2_seo_meta(seo: SEOData) -> dict:
+    """SEO 数据 → B2 meta 字段"""
+    return {
         SEO_META_KEYS["title"]: seo.title,
         SEO_META_KEYS["keywords"]: seo.keywords,
         SEO_META_KEYS["description"]: seo.description,
     }
-    await wp_client.set_post_meta(post_id, meta)
+
+
+async def write_b2_seo(wp_client: WordPressClient, post_id: int, seo: SEOData):
+    """将 SEO 数据写入 B2 主题的 meta 字段"""
+    await wp_client.set_post_meta(post_id, b2_seo_meta(seo))
     logger.info(f"[B2 SEO] 写入完成 post_id={post_id} title={seo.title[:30]}")
+
+
+def _normalize_meta(value) -> str:
+    # 未声明 single 的 meta 以列表返回；WordPress 还会修剪空白、转换类型
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    return str(value if value is not None else "").strip()
+
+
+def _meta_applied(post: dict, meta: dict) -> bool:
+    """创建响应中是否带回了提交的 meta（未注册的 meta 会被 WordPress 静默丢弃）
+
+    只要求键存在：值可能被站点清理或转换，不影响「meta 已注册、一次写入可用」的判断。
+    """
+    saved = post.get("meta")
+    if not isinstance(saved, dict) or not all(k in saved for k in meta):
+        return False
+    changed = [k for k, v in meta.items() if _normalize_meta(saved[k]) != _normalize_meta(v)]
+    if changed:
+        logger.debug(f"[B2 SEO] 站点调整了 meta 值: {', '.join(changed)}")
+    return True
+
+
+def _is_meta_rejected(error: httpx.HTTPStatusError) -> bool:
+    return error.response.status_code == 400 and "meta" in error.response.text
+
+
+async def create_post_with_b2_seo(
+    wp_client: WordPressClient, seo: SEOData | None, **post_fields
+) -> dict:
+    """创建文章并写入 B2 SEO，能一次完成时只发一次请求"""
+    if seo is None:
+        return await wp_client.create_post(**post_fields)
+
+    extra_meta = post_fields.pop("meta", None) or {}
+    meta = b2_seo_meta(seo)
+    site = wp_client.base_url
+    if _meta_on_create.get(site, True):
+        try:
+            post = await wp_client.create_post(**post_fields, meta={**extra_meta, **meta})
+        except httpx.HTTPStatusError as e:
+            if not _is_meta_rejected(e):
+                raise
+            logger.warning(f"[B2 SEO] 站点拒绝创建时写入 meta，改为两步写入: {e.response.text[:200]}")
+            _meta_on_create[site] = False
+        else:
+            if _meta_applied(post, meta):
+                _meta_on_create[site] = True
+                logger.info(f"[B2 SEO] 随文章一并写入 post_id={post.get('id')} title={seo.title[:30]}")
+                return post
+            logger.warning("[B2 SEO] 创建响应未带回 SEO meta，改为两步写入")
+            _meta_on_create[site] = False
+            await write_b2_seo(wp_client, post["id"], seo)
+            return post
+
+    post = await wp_client.create_post(**post_fields, meta=extra_meta or None)
+    await write_b2_seo(wp_client, post["id"], seo)
+    return post
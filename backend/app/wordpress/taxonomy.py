@@ -0,0 +1,256 @@
+"""WordPress 分类法缓存
+
+标签（TagCache）：标签名 → tag ID，内存 + SQLite（wp_term_cache 表）两级缓存，按站点区分：
+- 首次使用时从 SQLite 载入；从未预取或已过期（wp_tag_prefetch_ttl）时，
+  后台分页拉取 /wp/v2/tags 全量写入缓存，不阻塞当前请求；预取失败后
+  _PREFETCH_RETRY 秒内不再重试
+- 缓存未命中的标签并发解析（搜索 → 创建），相同标签的并发解析合并为一次
+- 已知标签的解析不产生任何网络请求
+
+分类（CategoryCache）：分页拉取全部分类，内存缓存 wp_category_cache_ttl 秒，
+所有任务共享，附带预建的名称索引（原名 / 小写 / 归一化）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import logging
+import re
+import time
+from typing import TYPE_CHECKING
+
+from app.config import settings
+from app.core.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from app.wordpress.client import WordPressClient
+
+logger = logging.getLogger(__name__)
+
+_TAXONOMY = "tags"
+# 预取失败后的重试间隔（秒）
+_PREFETCH_RETRY = 300.0
+
+
+def normalize_term(name: str) -> str:
+    """WordPress 词条名按 slug 去重，大小写和首尾空白不区分"""
+    return " ".join(name.split()).lower()
+
+
+class TagCache:
+    """按站点缓存标签 ID"""
+
+    def __init__(self):
+        self._terms: dict[str, dict[str, int]] = {}      # site → {归一化名称: ID}
+        self._prefetched_at: dict[str, float] = {}
+        self._prefetch_failed_at: dict[str, float] = {}
+        self._prefetch_tasks: dict[str, asyncio.Task] = {}
+        self._load_flight = SingleFlight("wp_tag_load")
+        self._resolve_flight = SingleFlight("wp_tag_resolve")
+        self.hits = 0
+        self.misses = 0
+
+    async def _ensure_loaded(self, wp: WordPressClient) -> dict[str, int]:
+        site = wp.base_url
+        terms = self._terms.get(site)
+        if terms is None:
+            terms = await self._load_flight.do(site, lambda: self._load(site))
+
+        now = time.monotonic()
+        age = now - self._prefetched_at.get(site, float("-inf"))
+        since_failure = now - self._prefetch_failed_at.get(site, float("-inf"))
+        if (
+            age > settings.wp_tag_prefetch_ttl
+            and since_failure > _PREFETCH_RETRY
+            and site not in self._prefetch_tasks
+        ):
+            task = asyncio.create_task(self._prefetch(wp))
+            self._prefetch_tasks[site] = task
+            task.add_done_callback(lambda t: self._prefetch_done(site, t))
+        return terms
+
+    def _prefetch_done(self, site: str, task: asyncio.Task):
+        if self._prefetch_tasks.get(site) is task:
+            del self._prefetch_tasks[site]
+
+    async def _load(self, site: str) -> dict[str, int]:
+        """从 SQLite 载入"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        try:
+            async with async_session() as session:
+                terms = await crud.get_wp_terms(session, site, _TAXONOMY)
+        except Exception as e:
+            logger.warning(f"[TagCache] 读取缓存失败: {e}")
+            terms = {}
+        self._terms[site] = terms
+        logger.info(f"[TagCache] 已载入 {len(terms)} 个标签 | {site}")
+        return terms
+
+    async def _persist(self, site: str, terms: list[tuple[str, str, int]]):
+        from app.db.engine import async_session
+        from app.db import crud
+
+        try:
+            async with async_session() as session:
+                await crud.upsert_wp_terms(session, site, _TAXONOMY, terms)
+        except Exception as e:
+            logger.warning(f"[TagCache] 写入缓存失败: {e}")
+
+    async def _prefetch(self, wp: WordPressClient):
+        """后台分页拉取站点全部标签"""
+        site = wp.base_url
+        start = time.monotonic()
+        try:
+            items = await wp.list_terms(_TAXONOMY)
+        except Exception as e:
+            self._prefetch_failed_at[site] = time.monotonic()
+            logger.warning(f"[TagCache] 预取标签失败，{_PREFETCH_RETRY:.0f}s 后重试: {e}")
+            return
+
+        names = [(html.unescape(t["name"]), t["id"]) for t in items if t.get("name")]
+        rows = [(normalize_term(name), name, term_id) for name, term_id in names]
+        self._terms.setdefault(site, {}).update({key: term_id for key, _, term_id in rows})
+        await self._persist(site, rows)
+        self._prefetched_at[site] = time.monotonic()
+        self._prefetch_failed_at.pop(site, None)
+        logger.info(f"[TagCache] 预取 {len(rows)} 个标签 ({time.monotonic() - start:.1f}s) | {site}")
+
+    async def resolve(self, wp: WordPressClient, names: list[str]) -> list[int]:
+        """标签名 → ID 列表（保持顺序、去重；解析失败的标签跳过）"""
+        terms = await self._ensure_loaded(wp)
+
+        keys: dict[str, str] = {}
+        for name in names:
+            key = normalize_term(name)
+            if key and key not in keys:
+                keys[key] = name.strip()
+
+        unknown = [key for key in keys if key not in terms]
+        self.hits += len(keys) - len(unknown)
+        self.misses += len(unknown)
+        if unknown:
+            await asyncio.gather(*(self._resolve_one(wp, key, keys[key]) for key in unknown))
+
+        return [terms[key] for key in keys if key in terms]
+
+    async def _resolve_one(self, wp: WordPressClient, key: str, name: str):
+        site = wp.base_url
+
+        async def fetch() -> int | None:
+            try:
+                term_id = await wp.resolve_tag_id(name)
+            except Exception as e:
+                logger.warning(f"[TagCache] 解析标签失败 '{name}': {e}")
+                return None
+            if term_id:
+                self._terms.setdefault(site, {})[key] = term_id
+                await self._persist(site, [(key, name, term_id)])
+            return term_id
+
+        await self._resolve_flight.do((site, key), fetch)
+
+    async def invalidate(self, site: str | None = None) -> int:
+        """清除缓存（内存 + SQLite），下次使用时重新预取"""
+        from app.db.engine import async_session
+        from app.db import crud
+
+        site = (site or settings.wp_url).rstrip("/")
+        # 先停止进行中的预取，避免其在清除后把旧词条写回
+        task = self._prefetch_tasks.pop(site, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._terms.pop(site, None)
+        self._prefetched_at.pop(site, None)
+        self._prefetch_failed_at.pop(site, None)
+        async with async_session() as session:
+            return await crud.delete_wp_terms(session, site, _TAXONOMY)
+
+    def stats(self) -> dict:
+        return {
+            "sites": {site: len(terms) for site, terms in self._terms.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetching": list(self._prefetch_tasks),
+        }
+
+
+class CategoryIndex:
+    """一次拉取的全部分类及其名称索引"""
+
+    def __init__(self, categories: list[dict]):
+        for c in categories:
+            # REST API 返回的名称经过 HTML 转义（如 "A &amp; B"）
+            c["name"] = html.unescape(c.get("name", ""))
+        self.categories = categories
+        self.by_name: dict[str, int] = {c["name"]: c["id"] for c in categories}
+        self._keys: dict[str, int] = {}
+        for c in categories:
+            for key in (c["name"].lower(), _loose_key(c["name"]), c.get("slug")):
+                if key:
+                    self._keys.setdefault(key, c["id"])
+
+    def lookup(self, name: str) -> int | None:
+        """按原名 → 小写 → 归一化（忽略空白和标点）→ slug 查找"""
+        if name in self.by_name:
+            return self.by_name[name]
+        for key in (name.lower(), _loose_key(name)):
+            if key in self._keys:
+                return self._keys[key]
+        return None
+
+
+def _loose_key(name: str) -> str:
+    return re.sub(r"[\s\W_]+", "", name).lower()
+
+
+class CategoryCache:
+    """按站点缓存全部分类"""
+
+    def __init__(self):
+        self._indexes: dict[str, tuple[float, CategoryIndex]] = {}
+        self._flight = SingleFlight("wp_categories")
+        self.hits = 0
+        self.refreshes = 0
+
+    async def get(self, wp: WordPressClient) -> CategoryIndex:
+        site = wp.base_url
+        cached = self._indexes.get(site)
+        if cached and time.monotonic() - cached[0] < settings.wp_category_cache_ttl:
+            self.hits += 1
+            return cached[1]
+        return await self._flight.do(site, lambda: self._refresh(wp))
+
+    async def _refresh(self, wp: WordPressClient) -> CategoryIndex:
+        items = await wp.list_terms("categories", fields="id,name,slug,parent")
+        index = CategoryIndex(items)
+        self._indexes[wp.base_url] = (time.monotonic(), index)
+        self.refreshes += 1
+        logger.info(f"[CategoryCache] 已加载 {len(items)} 个分类 | {wp.base_url}")
+        return index
+
+    def invalidate(self, site: str | None = None):
+        """清除缓存，下次使用时重新拉取"""
+        if site is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(site.rstrip("/"), None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "sites": {
+                site: {"categories": len(index.categories), "age": round(now - loaded, 1)}
+                for site, (loaded, index) in self._indexes.items()
+            },
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+        }
+
+
+# 全局缓存（所有 WordPressClient 实例共享）
+tag_cache = TagCache()
+category_cache = CategoryCache()
@@ -0,0 +1,30 @@
+"""测试公共配置
+
+导入 app 之前设置必需的环境变量，数据库使用临时目录下的 SQLite 文件。
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="steam-collector-test-")
+os.environ.setdefault("SC_AUTH_PASSWORD", "test")
+os.environ.setdefault("SC_JWT_SECRET", "test-secret")
+os.environ["SC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+os.environ["SC_WP_URL"] = "https://wp.test"
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+async def db():
+    """每个测试使用空数据库"""
+    import app.db.models  # noqa: F401  注册全部模型
+    from app.db.engine import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    # 连接池绑定在当前测试的事件循环上
+    await engine.dispose()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from app.ai import batch as batch_module
+from app.ai.batch import BatchAnalyzer
+from app.config import settings
+from app.core.context import GameContext, SEOData
+
+RESULT = {"category": "RPG", "tags": ["rpg"], "seo": {}}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """替换单款分析与 LLM 请求，记录调用"""
+    log = {"single": [], "chat": []}
+    responses: list = []
+
+    class _Analyzer:
+        async def analyze(self, game_data, categories=None, with_category=True):
+            log["single"].append(game_data["app_id"])
+            return RESULT if with_category else {**RESULT, "category": None}
+
+    class _Client:
+        async def chat(self, **kwargs):
+            log["chat"].append(kwargs["prompt"])
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    monkeypatch.setattr(batch_module, "AIAnalyzer", _Analyzer)
+    monkeypatch.setattr(batch_module, "AIClient", _Client)
+    monkeypatch.setattr(settings, "ai_batch_size", 8)
+    monkeypatch.setattr(settings, "ai_batch_window", 5.0)
+    log["responses"] = responses
+    return log
+
+
+def _games(*app_ids):
+    return [(app_id, {"app_id": app_id, "name": f"Game {app_id}"}) for app_id in app_ids]
+
+
+def _batch_response(*app_ids):
+    return json.dumps({"results": [{"app_id": a, **RESULT} for a in app_ids]})
+
+
+async def test_single_worker_skips_window(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 1)
+    analyzer = BatchAnalyzer()
+
+    result = await asyncio.wait_for(analyzer.analyze(1, {"app_id": 1}), 1)
+
+    assert result == RESULT
+    assert calls["single"] == [1] and calls["chat"] == []
+
+
+async def test_flushes_when_every_worker_is_waiting(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 2)
+    calls["responses"].append(_batch_response(1, 2))
+    analyzer = BatchAnalyzer()
+
+    # 窗口为 5 秒，凑满 worker_concurrency 款后应立即发出
+    results = await asyncio.wait_for(
+        asyncio.gather(*(analyzer.analyze(a, g) for a, g in _games(1, 2))), 1
+    )
+
+    assert [r["category"] for r in results] == ["RPG", "RPG"]
+    assert len(calls["chat"]) == 1 and calls["single"] == []
+
+
+async def test_transport_error_fails_batch_without_splitting(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 4)
+    calls["responses"].append(ConnectionError("down"))
+    analyzer = BatchAnalyzer()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(analyzer.analyze(a, g) for a, g in _games(1, 2, 3, 4)), return_exceptions=True),
+        1,
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert len(calls["chat"]) == 1 and calls["single"] == []
+    assert analyzer.stats()["splits"] == 0
+
+
+async def test_parse_failure_splits_and_retries(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 4)
+    calls["responses"].extend(["not json", _batch_response(1, 2), _batch_response(3, 4)])
+    analyzer = BatchAnalyzer()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(analyzer.analyze(a, g) for a, g in _games(1, 2, 3, 4))), 1
+    )
+
+    assert [r["tags"] for r in results] == [["rpg"]] * 4
+    assert len(calls["chat"]) == 3
+    assert analyzer.stats()["splits"] == 1
+
+
+async def test_local_category_skips_category_task(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 2)
+    calls["responses"].append(_batch_response(1, 2))
+    analyzer = BatchAnalyzer()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(
+            analyzer.analyze(a, g, ["角色扮演", "竞速"], with_category=False) for a, g in _games(1, 2)
+        )),
+        1,
+    )
+
+    assert [r["category"] for r in results] == [None, None]
+    assert "竞速" not in calls["chat"][0] and "分类匹配" not in calls["chat"][0]
+
+
+async def test_category_task_groups_are_separate(calls, monkeypatch):
+    monkeypatch.setattr(settings, "worker_concurrency", 2)
+    monkeypatch.setattr(settings, "ai_batch_window", 0.01)
+    analyzer = BatchAnalyzer()
+
+    (_, g1), (_, g2) = _games(1, 2)
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            analyzer.analyze(1, g1, ["竞速"], with_category=True),
+            analyzer.analyze(2, g2, ["竞速"], with_category=False),
+        ),
+        1,
+    )
+
+    # 各自成组，窗口到期后单款回退到 AIAnalyzer
+    assert calls["single"] == [1, 2] and calls["chat"] == []
+    assert results[1]["category"] is None
+
+
+async def test_processor_passes_local_match_to_batch(monkeypatch):
+    from app.processors import ai_analyze
+    from app.wordpress.taxonomy import CategoryIndex
+
+    seen = {}
+
+    async def get_category_index(self):
+        return CategoryIndex([{"id": 7, "name": "角色扮演"}])
+
+    async def match(game_data, cat_name_to_id):
+        return "角色扮演", 7, 0.95
+
+    async def analyze(app_id, game_data, existing_categories=None, with_category=True):
+        seen["with_category"] = with_category
+        return {"category": None, "tags": ["rpg"], "seo": SEOData(title="t")}
+
+    monkeypatch.setattr(ai_analyze.WordPressClient, "get_category_index", get_category_index)
+    monkeypatch.setattr(ai_analyze.category_matcher, "match", match)
+    monkeypatch.setattr(ai_analyze.batch_analyzer, "analyze", analyze)
+
+    ctx = await ai_analyze.AIAnalyzeProcessor(batch=True).process(
+        GameContext(app_id=1, steam_data={"name": "Alpha"})
+    )
+
+    assert seen["with_category"] is False
+    assert ctx.category_id == 7 and ctx.tags == ["rpg"]
@@ -0,0 +1,32 @@
+from app.ai.cache import cache_key, get_cached, store
+from app.config import settings
+
+
+def test_cache_key_depends_on_every_field():
+    base = cache_key("m", "sys", "prompt", 0.3, True)
+    assert base == cache_key("m", "sys", "prompt", 0.3, True)
+    assert base != cache_key("m2", "sys", "prompt", 0.3, True)
+    assert base != cache_key("m", "sys2", "prompt", 0.3, True)
+    assert base != cache_key("m", "sys", "prompt2", 0.3, True)
+    assert base != cache_key("m", "sys", "prompt", 0.7, True)
+    assert base != cache_key("m", "sys", "prompt", 0.3, False)
+
+
+async def test_disabled_cache_is_bypassed(db, monkeypatch):
+    monkeypatch.setattr(settings, "ai_cache_enabled", False)
+    await store("k", "m", "response")
+    assert await get_cached("k") is None
+
+
+async def test_store_and_evict_least_recently_used(db, monkeypatch):
+    monkeypatch.setattr(settings, "ai_cache_enabled", True)
+    monkeypatch.setattr(settings, "ai_cache_max_entries", 2)
+
+    await store("a", "m", "A")
+    await store("b", "m", "B")
+    assert await get_cached("a") == "A"  # a 最近使用，b 最久未使用
+    await store("c", "m", "C")
+
+    assert await get_cached("b") is None
+    assert await get_cached("a") == "A"
+    assert await get_cached("c") == "C"
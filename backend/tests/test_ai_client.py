@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai import client as client_module
+from app.ai.backends import AIBackend
+from app.ai.client import AIClient, ai_scheduler
+from app.config import settings
+
+
+@pytest.fixture
+def backends(monkeypatch, db):
+    """按模型配置延迟 / 异常的假 acompletion，记录调用与取消"""
+    behaviour: dict[str, tuple[float, object]] = {}
+    log = {"calls": [], "cancelled": []}
+
+    async def acompletion(**kwargs):
+        model = kwargs["model"]
+        log["calls"].append(model)
+        delay, outcome = behaviour[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log["cancelled"].append(model)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=outcome))], usage=None)
+
+    monkeypatch.setattr(client_module, "acompletion", acompletion)
+    monkeypatch.setattr(settings, "ai_max_concurrency", 0)
+    monkeypatch.setattr(settings, "ai_rpm", 0)
+    monkeypatch.setattr(settings, "ai_tpm", 0)
+    log["behaviour"] = behaviour
+    return log
+
+
+def _client(name):
+    """每个测试用独立的模型名，避免共享的延迟统计互相影响"""
+    return AIClient(
+        provider="primary",
+        model=name,
+        api_key="k",
+        fallbacks=[AIBackend(provider="backup", model=name, api_key="k")],
+    )
+
+
+def _active(model_id):
+    return ai_scheduler.stats()["models"][model_id]["active"]
+
+
+async def test_failover_switches_after_error(backends, monkeypatch):
+    monkeypatch.setattr(settings, "ai_backend_mode", "failover")
+    backends["behaviour"].update({
+        "primary/failover": (0, RuntimeError("boom")),
+        "backup/failover": (0, "from backup"),
+    })
+
+    result = await _client("failover").chat("hi", cache=False)
+
+    assert result == "from backup"
+    assert backends["calls"] == ["primary/failover", "backup/failover"]
+    assert _active("primary/failover") == 0 and _active("backup/failover") == 0
+
+
+async def test_failover_raises_last_error_when_all_fail(backends, monkeypatch):
+    monkeypatch.setattr(settings, "ai_backend_mode", "failover")
+    backends["behaviour"].update({
+        "primary/exhausted": (0, RuntimeError("first")),
+        "backup/exhausted": (0, RuntimeError("second")),
+    })
+
+    with pytest.raises(RuntimeError, match="second"):
+        await _client("exhausted").chat("hi", cache=False)
+
+
+async def test_hedge_fast_backend_wins_and_loser_is_released(backends, monkeypatch):
+    monkeypatch.setattr(settings, "ai_backend_mode", "hedge")
+    monkeypatch.setattr(settings, "ai_hedge_delay", 0.02)
+    backends["behaviour"].update({
+        "primary/hedge": (5, "from primary"),
+        "backup/hedge": (0, "from backup"),
+    })
+
+    result = await asyncio.wait_for(_client("hedge").chat("hi", cache=False), 1)
+    await asyncio.sleep(0)  # 让被取消的请求完成清理
+
+    assert result == "from backup"
+    assert backends["cancelled"] == ["primary/hedge"]
+    assert _active("primary/hedge") == 0 and _active("backup/hedge") == 0
+
+
+async def test_hedge_not_launched_when_primary_is_fast(backends, monkeypatch):
+    monkeypatch.setattr(settings, "ai_backend_mode", "hedge")
+    monkeypatch.setattr(settings, "ai_hedge_delay", 1.0)
+    backends["behaviour"].update({
+        "primary/fast": (0, "from primary"),
+        "backup/fast": (0, "from backup"),
+    })
+
+    result = await _client("fast").chat("hi", cache=False)
+
+    assert result == "from primary"
+    assert backends["calls"] == ["primary/fast"]
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from app.ai.category_matcher import category_matcher
+from app.ai.combined import AICombined
+from app.config import settings
+from app.core.context import GameContext, SEOData
+from app.processors.ai_combined import AICombinedProcessor
+from app.wordpress.client import WordPressClient
+from app.wordpress.taxonomy import CategoryIndex
+
+RESPONSE = {
+    "category": "角色扮演",
+    "tags": ["rpg", "开放世界"],
+    "seo": {"title": "Alpha", "description": "d", "keywords": "k"},
+    "content": "改写后的介绍",
+}
+
+
+class _Client:
+    def __init__(self, response):
+        self.response = response
+
+    async def chat(self, **kwargs):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture(autouse=True)
+def categories(monkeypatch):
+    index = CategoryIndex([{"id": 1, "name": "未分类"}, {"id": 7, "name": "角色扮演"}, {"id": 9, "name": "动作"}])
+
+    async def get_category_index(self):
+        return index
+
+    monkeypatch.setattr(WordPressClient, "get_category_index", get_category_index)
+    monkeypatch.setattr(settings, "category_matcher_enabled", False)
+
+
+def _processor(response):
+    processor = AICombinedProcessor()
+    processor.combined = AICombined(_Client(response))
+    return processor
+
+
+def _ctx():
+    return GameContext(app_id=10, steam_data={"app_id": 10, "name": "Alpha"})
+
+
+async def test_merges_result_into_context():
+    ctx = await _processor(json.dumps(RESPONSE)).process(_ctx())
+
+    assert ctx.category_id == 7
+    assert ctx.tags == ["rpg", "开放世界"]
+    assert ctx.seo == SEOData(title="Alpha", description="d", keywords="k")
+    assert ctx.rewritten_content == "改写后的介绍"
+    assert not AICombinedProcessor().supports(ctx)
+
+
+async def test_local_category_overrides_llm(monkeypatch):
+    async def match(game_data, cat_name_to_id):
+        return "动作", 9, 0.9
+
+    monkeypatch.setattr(category_matcher, "match", match)
+
+    ctx = await _processor(json.dumps(RESPONSE)).process(_ctx())
+
+    assert ctx.category_id == 9
+    assert ctx.rewritten_content == "改写后的介绍"
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        RuntimeError("upstream down"),
+        "not json",
+        json.dumps({**RESPONSE, "content": "  "}),
+    ],
+)
+async def test_failure_leaves_context_for_fallback(response):
+    ctx = await _processor(response).process(_ctx())
+
+    assert ctx.category_id is None and ctx.tags is None
+    assert ctx.seo is None and ctx.rewritten_content is None
+    # 上下文未改动，后续的分析/改写处理器照常接手
+    assert AICombinedProcessor().supports(ctx)
@@ -0,0 +1,49 @@
+from app.ai.rewriter import AIRewriter
+from app.config import Settings
+from app.core.context import GameContext
+from app.processors.ai_rewrite import AIRewriteProcessor
+
+TEXT = "第一句话。第二句话。第三句话。"
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    async def chat(self, **kwargs):
+        self.calls.append("chat")
+        return TEXT
+
+    async def chat_stream(self, **kwargs):
+        self.calls.append("stream")
+        for ch in TEXT:
+            yield ch
+
+
+def test_defaults_keep_previous_behaviour():
+    defaults = Settings(_env_file=None)
+    assert defaults.ai_stream_rewrite is False
+    assert defaults.ai_rewrite_max_chars == 0
+
+
+async def test_processor_does_not_stream_by_default(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ai_stream_rewrite", False)
+    client = _FakeClient()
+    processor = AIRewriteProcessor()
+    processor.rewriter = AIRewriter(client)
+
+    ctx = await processor.process(GameContext(app_id=10, steam_data={"name": "Alpha"}))
+
+    assert ctx.rewritten_content == TEXT
+    assert client.calls == ["chat"]
+
+
+async def test_stream_max_chars():
+    rewriter = AIRewriter(_FakeClient())
+    data = {"name": "Alpha"}
+
+    assert await rewriter.rewrite_stream(data, max_chars=0) == TEXT
+    # 超出上限后截到最后一个完整句子
+    assert await rewriter.rewrite_stream(data, max_chars=8) == "第一句话。"
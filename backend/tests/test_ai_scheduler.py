@@ -0,0 +1,54 @@
+import asyncio
+
+from app.ai.client import _ModelBudget
+from app.config import settings
+
+
+async def test_concurrency_limit_queues_excess_calls(monkeypatch):
+    monkeypatch.setattr(settings, "ai_max_concurrency", 2)
+    monkeypatch.setattr(settings, "ai_rpm", 0)
+    monkeypatch.setattr(settings, "ai_tpm", 0)
+    budget = _ModelBudget("test/model")
+
+    first = await budget.acquire(10)
+    await budget.acquire(10)
+    third = asyncio.create_task(budget.acquire(10))
+    await asyncio.sleep(0.05)
+    assert not third.done()
+
+    first.release()
+    slot = await asyncio.wait_for(third, 1)
+    assert budget.stats()["active"] == 2
+    slot.release()
+
+
+async def test_zero_concurrency_means_unlimited(monkeypatch):
+    monkeypatch.setattr(settings, "ai_max_concurrency", 0)
+    monkeypatch.setattr(settings, "ai_rpm", 0)
+    monkeypatch.setattr(settings, "ai_tpm", 0)
+    budget = _ModelBudget("test/model")
+
+    slots = await asyncio.wait_for(asyncio.gather(*(budget.acquire(1) for _ in range(20))), 1)
+    assert budget.stats()["active"] == 20
+    for slot in slots:
+        slot.release()
+
+
+async def test_rpm_window_delays_requests(monkeypatch):
+    monkeypatch.setattr(settings, "ai_max_concurrency", 0)
+    monkeypatch.setattr(settings, "ai_rpm", 1)
+    monkeypatch.setattr(settings, "ai_tpm", 0)
+    budget = _ModelBudget("test/model")
+
+    (await budget.acquire(1)).release()
+    second = asyncio.create_task(budget.acquire(1))
+    await asyncio.sleep(0.05)
+    assert not second.done()  # 60 秒窗口内只允许 1 次
+    second.cancel()
+
+
+def test_no_global_cap_by_default():
+    from app.config import Settings
+
+    defaults = Settings(_env_file=None)
+    assert (defaults.ai_max_concurrency, defaults.ai_rpm, defaults.ai_tpm) == (0, 0, 0)
@@ -0,0 +1,77 @@
+from app.ai.text import compact_description, html_to_text, truncate_to_tokens
+
+# 节选自 Steam appdetails 的 detailed_description（含视频、图片容器与实体）
+STEAM_DESCRIPTION = (
+    '<h1>Special Edition</h1><p class="bb_paragraph">Intro text here.</p>'
+    '<video class="bb_img" autoplay muted loop playsinline>'
+    '<source src="https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/1/extras/a.webm?t=1" type="video/webm; codecs=vp9">'
+    '<source src="https://shared.akamai.steamstatic.com/store_item_assets/steam/apps/1/extras/a.mp4?t=1" type="video/mp4">'
+    "</video>"
+    '<p class="bb_paragraph">Important gameplay paragraph.</p>'
+    '<span class="bb_img_ctn"><img class="bb_img" src="https://x/ss.gif"><br>Screenshot caption</span>'
+    "<ul class=\"bb_ul\"><li>Co-op &amp; PvP</li><li>Mods<br>supported</li></ul>"
+    "<p>Wishlist now!</p><hr><p>Final words.</p>"
+)
+
+
+def test_video_sources_do_not_swallow_following_text():
+    text = html_to_text(
+        "<p>Intro text here.</p><video><source src=a><source src=b></video>"
+        "<p>Important gameplay paragraph.</p>"
+    )
+    assert "Intro text here." in text
+    assert "Important gameplay paragraph." in text
+
+
+def test_real_steam_markup():
+    text = compact_description(STEAM_DESCRIPTION, token_budget=1000)
+    lines = text.split("\n")
+
+    assert "Intro text here." in lines
+    assert "Important gameplay paragraph." in lines
+    assert "Co-op & PvP" in lines
+    assert "Final words." in lines
+    # 图片说明与宣传语被丢弃
+    assert "Screenshot caption" not in text
+    assert "Wishlist" not in text
+
+
+def test_nested_skipped_elements():
+    text = html_to_text(
+        '<div class="bb_img_ctn"><div><img src=x></div>caption</div><p>kept</p>'
+    )
+    assert text.strip() == "kept"
+
+
+def test_truncate_keeps_whole_sentences():
+    text = "First sentence. Second sentence is longer. Third."
+    assert truncate_to_tokens(text, 6) == "First sentence."
+    assert truncate_to_tokens(text, 1000) == text
+
+
+def test_noise_filter_only_drops_short_promo_lines():
+    paragraph = (
+        "Play as a streamer who gets famous on YouTube and must keep the audience "
+        "entertained while the city falls apart around you."
+    )
+    lines = compact_description(
+        f"<p>{paragraph}</p><p>Join our Discord!</p><p>Follow us on Twitter: https://x.com/game</p>"
+        "<p>游戏包含四十多个章节、十二种结局以及完整的创意工坊支持，更新日志与路线图请见官网 "
+        "https://example.com/news 上的开发者博客。</p>",
+        token_budget=1000,
+    ).split("\n")
+
+    # 长段落只去掉链接
+    assert lines == [
+        paragraph,
+        "游戏包含四十多个章节、十二种结局以及完整的创意工坊支持，更新日志与路线图请见官网 上的开发者博客。",
+    ]
+
+
+def test_hard_cut_uses_token_estimate():
+    word = "a" * 400  # 无句子边界，约 100 token
+    cut = truncate_to_tokens(word, 50)
+    assert len(cut) == 200
+
+    cjk = "汉" * 100
+    assert truncate_to_tokens(cjk, 30) == "汉" * 30
@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.ai.usage import call_context, current_context, record_call
+from app.db import crud
+from app.db.engine import async_session
+from app.db.models import AICallLog
+
+
+def test_context_nests_and_restores():
+    assert current_context() == {}
+    with call_context(record_id=1, stage="analyze"):
+        with call_context(stage="rewrite", style="news"):
+            assert current_context() == {"record_id": 1, "stage": "rewrite", "style": "news"}
+        assert current_context() == {"record_id": 1, "stage": "analyze"}
+    assert current_context() == {}
+
+
+def test_mutating_returned_context_does_not_leak():
+    current_context()["record_id"] = 99
+    assert current_context() == {}
+
+
+async def test_context_is_isolated_per_task():
+    async def worker(record_id):
+        with call_context(record_id=record_id):
+            await asyncio.sleep(0)
+            return current_context()["record_id"]
+
+    assert await asyncio.gather(worker(1), worker(2)) == [1, 2]
+    assert current_context() == {}
+
+
+async def test_record_call_stores_context(db):
+
+    await record_call("test/model", prompt_tokens=5)
+    with call_context(record_id=7, stage="rewrite", style="news"):
+        await record_call("test/model", prompt_tokens=10, completion_tokens=20, latency=1.5)
+
+    async with async_session() as session:
+        rows = await crud.list_ai_calls(session, 7)
+        untagged = (await session.execute(select(AICallLog).where(AICallLog.record_id.is_(None)))).scalars().all()
+    assert [(r.stage, r.style, r.prompt_tokens, r.completion_tokens) for r in rows] == [
+        ("rewrite", "news", 10, 20)
+    ]
+    assert [(r.stage, r.prompt_tokens) for r in untagged] == [("", 5)]
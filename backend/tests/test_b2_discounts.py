@@ -0,0 +1,90 @@
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.core.context import GameContext
+from app.core.events import event_bus
+from app.db import crud
+from app.extensions.b2 import integration as b2
+
+
+@pytest.fixture
+def b2_env(db, monkeypatch):
+    """两个已发布游戏，价格由 prices 字典提供，记录触发公告的游戏"""
+    monkeypatch.setattr(event_bus, "_handlers", defaultdict(list))
+    published = {
+        10: SimpleNamespace(game_name="Alpha", post_id=100),
+        20: SimpleNamespace(game_name="Beta", post_id=200),
+    }
+    prices: dict[int, dict] = {}
+    announced: list[int] = []
+
+    async def list_published_games(session):
+        return published
+
+    async def get_price_overviews(app_ids):
+        return {app_id: prices[app_id] for app_id in app_ids if app_id in prices}
+
+    integration = b2.B2Integration(wp_client=None)
+    check = integration._check_announcement
+
+    async def spy(post_id, ctx):
+        triggered = await check(post_id, ctx)
+        if triggered:
+            announced.append(ctx.app_id)
+        return triggered
+
+    monkeypatch.setattr(crud, "list_published_games", list_published_games)
+    monkeypatch.setattr(b2, "get_price_overviews", get_price_overviews)
+    monkeypatch.setattr(integration, "_check_announcement", spy)
+    return SimpleNamespace(integration=integration, prices=prices, announced=announced)
+
+
+async def test_first_refresh_is_baseline(b2_env):
+    b2_env.prices.update({10: {"discount_percent": 80}, 20: {}})
+
+    result = await b2_env.integration.refresh_discounts()
+
+    assert result == {"checked": 2, "changed": 0, "announced": 0}
+    assert b2_env.announced == []
+
+
+async def test_only_changed_discounts_are_announced(b2_env):
+    b2_env.prices.update({10: {"discount_percent": 80}, 20: {"discount_percent": 0}})
+    await b2_env.integration.refresh_discounts()
+
+    # 折扣不变：不重复公告
+    assert (await b2_env.integration.refresh_discounts())["announced"] == 0
+
+    b2_env.prices.update({10: {"discount_percent": 90}, 20: {"discount_percent": 60}})
+    result = await b2_env.integration.refresh_discounts()
+    assert result == {"checked": 2, "changed": 2, "announced": 2}
+    assert sorted(b2_env.announced) == [10, 20]
+
+    # 折扣结束：有变化但不满足公告条件
+    b2_env.prices.update({10: {"discount_percent": 0}, 20: {"discount_percent": 60}})
+    result = await b2_env.integration.refresh_discounts()
+    assert result == {"checked": 2, "changed": 1, "announced": 0}
+
+
+async def test_publish_records_baseline(b2_env):
+    ctx = GameContext(app_id=10, steam_data={"name": "Alpha", "price_overview": {"discount_percent": 75}})
+    await b2_env.integration.on_post_published(post_id=100, context=ctx)
+    assert b2_env.announced == [10]
+
+    from app.db.engine import async_session
+
+    async with async_session() as session:
+        assert await crud.get_price_states(session, settings.steam_country_code, [10, 20]) == {10: 75}
+
+    # 发布时已公告过的折扣，刷新时不再重复
+    b2_env.prices.update({10: {"discount_percent": 75}})
+    assert (await b2_env.integration.refresh_discounts())["announced"] == 0
+
+
+def test_integration_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(b2, "_integration", None)
+    monkeypatch.setattr(settings, "b2_enabled", False)
+    assert b2.get_integration() is None
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.core import cassette
+
+
+@pytest.fixture
+def cassette_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "cassette_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "cassette_latency_scale", 0.0)
+    monkeypatch.setattr(settings, "cassette_latency", None)
+    monkeypatch.setattr(settings, "cassette_error_rate", 0.0)
+    monkeypatch.setattr(cassette, "_cassettes", {})
+    return tmp_path
+
+
+def _reload(monkeypatch, mode: str):
+    """切换模式并丢弃内存中的录制，回放时从文件重新加载"""
+    monkeypatch.setattr(settings, "cassette_mode", mode)
+    monkeypatch.setattr(cassette, "_cassettes", {})
+
+
+def _client(inner: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    inner = inner or httpx.MockTransport(lambda request: httpx.Response(599))
+    return httpx.AsyncClient(transport=cassette.CassetteTransport("steam", inner))
+
+
+async def test_http_record_then_replay(cassette_dir, monkeypatch):
+    counter = iter(range(1, 10))
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={"n": next(counter)},
+            headers={"Retry-After": "3", "Set-Cookie": "secret"},
+        )
+
+    _reload(monkeypatch, "record")
+    async with _client(httpx.MockTransport(upstream)) as client:
+        first = await client.get("https://store.test/api?appids=10")
+        await client.get("https://store.test/api?appids=10")
+    assert first.json() == {"n": 1}
+    assert (cassette_dir / "steam.jsonl").exists()
+
+    _reload(monkeypatch, "replay")
+    async with _client() as client:
+        replayed = [await client.get("https://store.test/api?appids=10") for _ in range(3)]
+
+    # 按录制顺序回放，超出后重复最后一条
+    assert [r.json()["n"] for r in replayed] == [1, 2, 2]
+    assert replayed[0].headers["retry-after"] == "3"
+    assert "set-cookie" not in replayed[0].headers
+    assert cassette.stats()["cassettes"]["steam"]["replayed"] == 3
+
+
+async def test_http_replay_miss(cassette_dir, monkeypatch):
+    _reload(monkeypatch, "replay")
+    async with _client() as client:
+        with pytest.raises(httpx.ConnectError, match="未录制"):
+            await client.get("https://store.test/api?appids=99")
+
+    assert cassette.stats()["cassettes"]["steam"]["misses"] == 1
+
+
+async def test_llm_record_then_replay(cassette_dir, monkeypatch):
+    kwargs = {"model": "test/model", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.3}
+
+    async def call(kw):
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="hello"))], usage=usage)
+
+    _reload(monkeypatch, "record")
+    await cassette.llm_completion(kwargs, call)
+
+    _reload(monkeypatch, "replay")
+
+    async def offline(kw):
+        raise AssertionError("回放模式不应访问网络")
+
+    response = await cassette.llm_completion(kwargs, offline)
+    assert response.choices[0].message.content == "hello"
+    assert response.usage.total_tokens == 7
+
+    with pytest.raises(cassette.CassetteMiss):
+        await cassette.llm_completion({**kwargs, "temperature": 0.9}, offline)
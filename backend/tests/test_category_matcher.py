@@ -0,0 +1,72 @@
+import pytest
+
+from app.ai import category_matcher as cm
+from app.config import settings
+from app.db import crud
+
+
+def _game(genre: str, developer: str) -> dict:
+    return {"genres": [{"description": genre}], "developers": [developer]}
+
+
+SAMPLES = [(1, _game("RPG", "Studio A")) for _ in range(6)] + [(2, _game("Racing", "Studio B"))]
+
+
+@pytest.fixture
+def samples(monkeypatch):
+    """替换历史样本来源，记录加载次数"""
+    loads = []
+
+    async def list_category_samples(session, cc, language):
+        loads.append(1)
+        return list(SAMPLES)
+
+    monkeypatch.setattr(crud, "list_category_samples", list_category_samples)
+    return loads
+
+
+async def test_first_load_right_after_boot(samples, monkeypatch):
+    # 刚开机时 monotonic() 可能小于刷新间隔
+    monkeypatch.setattr(cm.time, "monotonic", lambda: 5.0)
+    matcher = cm.CategoryMatcher()
+
+    await matcher._ensure_loaded()
+
+    assert samples == [1]
+    assert matcher.stats()["samples"] == len(SAMPLES)
+
+
+async def test_invalidate_forces_reload(samples, monkeypatch):
+    monkeypatch.setattr(cm.time, "monotonic", lambda: 5.0)
+    matcher = cm.CategoryMatcher()
+    await matcher._ensure_loaded()
+    await matcher._ensure_loaded()
+    assert samples == [1]
+
+    matcher.invalidate()
+    await matcher._ensure_loaded()
+    assert samples == [1, 1]
+
+
+async def test_match_confident_category(samples, monkeypatch):
+    monkeypatch.setattr(settings, "category_matcher_enabled", True)
+    monkeypatch.setattr(settings, "category_matcher_confidence", 0.8)
+    monkeypatch.setattr(settings, "category_matcher_min_samples", 5)
+    matcher = cm.CategoryMatcher()
+    categories = {"角色扮演": 1, "竞速": 2}
+
+    assert await matcher.match(_game("RPG", "Studio A"), categories) == ("角色扮演", 1, 1.0)
+    # 只有一个样本支持：交给 LLM
+    assert await matcher.match(_game("Racing", "Studio B"), categories) is None
+    # 分类已不存在时不投票
+    assert await matcher.match(_game("RPG", "Studio A"), {"竞速": 2}) is None
+
+
+def test_ngram_index_fuzzy_match():
+    index = cm.NgramIndex({"角色扮演": 1, "动作冒险": 2, "Racing Games": 3})
+
+    assert index.best("角色 扮演") == ("角色扮演", 1, 1.0)
+    name, term_id, score = index.best("动作冒险类")
+    assert (name, term_id) == ("动作冒险", 2) and 0.5 <= score < 1.0
+    assert index.best("racing-game")[1] == 3
+    assert index.best("模拟经营") is None
@@ -0,0 +1,50 @@
+import base64
+
+import httpx
+
+from app.core import http
+from app.wordpress.client import WordPressClient
+
+
+async def test_clients_are_shared_per_upstream():
+    await http.close_clients()
+    try:
+        steam = http.get_client("steam")
+        assert http.get_client("steam") is steam
+        assert http.get_client("wordpress") is not steam
+        assert steam.timeout.read == http.UPSTREAMS["steam"]
+    finally:
+        await http.close_clients()
+
+
+async def test_closed_client_is_recreated():
+    await http.close_clients()
+    client = http.get_client("images")
+    await client.aclose()
+
+    replacement = http.get_client("images")
+    assert replacement is not client and not replacement.is_closed
+
+    await http.close_clients()
+    assert http._clients == {}
+    assert replacement.is_closed
+
+
+async def test_wordpress_auth_is_sent_per_request():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"id": 1})
+
+    http._clients["wordpress"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        await WordPressClient("https://a.test", "alice", "pw-a").update_post(1, title="x")
+        await WordPressClient("https://b.test", "bob", "pw-b").update_post(1, title="x")
+    finally:
+        await http.close_clients()
+
+    def basic(user: str, password: str) -> str:
+        return "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+
+    assert seen == [basic("alice", "pw-a"), basic("bob", "pw-b")]
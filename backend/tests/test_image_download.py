@@ -0,0 +1,98 @@
+import httpx
+import pytest
+
+from app.config import settings
+from app.core import http
+from app.core.context import GameContext
+from app.processors.image_download import ImageDownloadProcessor
+
+HEADER = "https://cdn.test/apps/10/header.jpg"
+SHOT_1 = "https://cdn.test/apps/10/ss_1.jpg"
+SHOT_2 = "https://cdn.test/apps/10/ss_2.jpg"
+IMAGES = {
+    "/apps/10/header.jpg": b"H" * 300,
+    "/apps/10/ss_1.jpg": b"1" * 200,
+    "/apps/10/ss_2.jpg": b"2" * 100,
+}
+
+
+async def _chunks(data: bytes):
+    for i in range(0, len(data), 64):
+        yield data[i:i + 64]
+
+
+@pytest.fixture
+def upstream(monkeypatch, db):
+    """模拟图片 CDN 与 WordPress 媒体库，记录每次上传"""
+    monkeypatch.setattr(settings, "image_optimize", False)
+    monkeypatch.setattr(settings, "wp_media_verify", False)
+    monkeypatch.setattr(settings, "image_chunk_size", 64)
+    state = {"downloads": [], "uploads": []}
+
+    def images(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        state["downloads"].append(path)
+        data = IMAGES[path]
+        if path.endswith("ss_2.jpg"):
+            # 未声明长度：分块传输
+            return httpx.Response(200, content=_chunks(data))
+        return httpx.Response(200, content=data, headers={"ETag": f'"{path}"'})
+
+    async def wordpress(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/wp-json/wp/v2/media"
+        body = await request.aread()
+        state["uploads"].append({
+            "filename": request.headers["content-disposition"].split('"')[1],
+            "length": request.headers.get("content-length"),
+            "body": body,
+        })
+        return httpx.Response(201, json={"id": 100 + len(state["uploads"])})
+
+    http._clients["images"] = httpx.AsyncClient(transport=httpx.MockTransport(images))
+    http._clients["wordpress"] = httpx.AsyncClient(transport=httpx.MockTransport(wordpress))
+    yield state
+    http._clients.pop("images", None)
+    http._clients.pop("wordpress", None)
+
+
+def _ctx():
+    steam_data = {
+        "header_image": HEADER,
+        "screenshots": [{"path_full": SHOT_1}, {"path_full": SHOT_2}],
+    }
+    return GameContext(app_id=10, steam_data=steam_data)
+
+
+async def test_streams_images_to_media_library(upstream):
+    ctx = await ImageDownloadProcessor().process(_ctx())
+
+    assert sorted(ctx.image_ids) == [101, 102, 103]
+    uploads = {u["filename"].split("_")[2]: u for u in upstream["uploads"]}
+    assert uploads["0"]["body"] == IMAGES["/apps/10/header.jpg"]
+    assert uploads["0"]["length"] == "300"
+    # 源站未给出长度时按分块编码上传，内容仍完整
+    assert uploads["2"]["body"] == IMAGES["/apps/10/ss_2.jpg"]
+    assert uploads["2"]["length"] is None
+
+    # 再次处理命中媒体索引，不产生任何请求
+    again = await ImageDownloadProcessor().process(_ctx())
+    assert sorted(again.image_ids) == [101, 102, 103]
+    assert len(upstream["downloads"]) == 3 and len(upstream["uploads"]) == 3
+
+
+async def test_featured_only_defers_screenshots(upstream):
+    ctx = await ImageDownloadProcessor(featured_only=True).process(_ctx())
+
+    assert ctx.image_ids == [101]
+    assert ctx.deferred_images == [SHOT_1, SHOT_2]
+    assert upstream["downloads"] == ["/apps/10/header.jpg"]
+
+
+async def test_oversized_image_is_skipped(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "image_max_bytes", 250)
+
+    ctx = await ImageDownloadProcessor().process(_ctx())
+
+    # 头图超过上限（声明长度直接拒绝），截图正常上传
+    assert sorted(ctx.image_ids) == [101, 102]
+    assert all(not u["filename"].startswith("steam_10_0_") for u in upstream["uploads"])
@@ -0,0 +1,32 @@
+from app.images.mirror import rewrite_gallery
+from app.processors.content_build import ContentBuildProcessor
+
+CDN = "https://cdn.akamai.steamstatic.com/steam/apps/1/ss_1.1920x1080.jpg?t=1&v=2"
+OTHER = "https://cdn.akamai.steamstatic.com/steam/apps/1/ss_2.1920x1080.jpg?t=1"
+
+
+def _gallery() -> str:
+    builder = ContentBuildProcessor()
+    return builder._gallery([builder._image(CDN, alt="Game 截图"), builder._image(OTHER, alt="Game 截图")])
+
+
+def test_rewrites_uploaded_images_only():
+    content, count = rewrite_gallery(_gallery(), {CDN: (42, "https://wp.test/up/steam_1_1.jpg")})
+
+    assert count == 1
+    assert '<!-- wp:image {"id":42,"sizeSlug":"large"} -->' in content
+    assert '<img src="https://wp.test/up/steam_1_1.jpg" alt="Game 截图" class="wp-image-42"/>' in content
+    assert f'<img src="{OTHER}"' in content
+    assert CDN not in content
+
+
+def test_matches_html_escaped_source_url():
+    escaped = _gallery().replace(CDN, CDN.replace("&", "&#038;"))
+    content, count = rewrite_gallery(escaped, {CDN: (7, "https://wp.test/up/a.jpg")})
+    assert count == 1
+    assert "wp-image-7" in content
+
+
+def test_leaves_content_without_matches_unchanged():
+    original = _gallery()
+    assert rewrite_gallery(original, {"https://cdn/none.jpg": (1, "x")}) == (original, 0)
@@ -0,0 +1,73 @@
+import io
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.config import settings
+from app.images import optimizer
+
+
+def _png(width: int, height: int) -> bytes:
+    Image = pytest.importorskip("PIL.Image")
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "image_optimize", True)
+    monkeypatch.setattr(settings, "image_format", "jpeg")
+    monkeypatch.setattr(settings, "image_quality", 80)
+    monkeypatch.setattr(settings, "image_max_width", 32)
+    monkeypatch.setattr(settings, "image_max_height", 32)
+    monkeypatch.setattr(settings, "image_optimize_workers", 1)
+    yield
+    optimizer.shutdown()
+
+
+def test_optimize_bytes_resizes_and_reencodes():
+    data = _png(64, 48)
+
+    result = optimizer.optimize_bytes(data, "jpeg", 80, 32, 32)
+
+    assert result is not None
+    encoded, mime_type, ext, width, height = result
+    assert (mime_type, ext, width, height) == ("image/jpeg", "jpg", 32, 24)
+    assert encoded[:2] == b"\xff\xd8"
+
+
+def test_small_image_without_gain_is_kept():
+    data = _png(4, 4)
+    assert optimizer.optimize_bytes(data, "jpeg", 95, 32, 32) is None
+
+
+async def test_optimize_in_process_pool(enabled):
+    data = _png(64, 48)
+
+    result = await optimizer.optimize(data)
+
+    assert result is not None
+    assert (result.width, result.height, result.ext) == (32, 24, "jpg")
+    assert result.original_size == len(data)
+
+
+async def test_returns_none_without_pillow(enabled, monkeypatch):
+    monkeypatch.setattr(optimizer, "optimizer_available", lambda: False)
+    assert not optimizer.is_enabled()
+    assert await optimizer.optimize(b"not an image") is None
+
+
+async def test_broken_pool_is_rebuilt(enabled, monkeypatch):
+    class _BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(optimizer, "optimizer_available", lambda: True)
+    monkeypatch.setattr(optimizer, "_pool", _BrokenPool())
+
+    assert await optimizer.optimize(b"data") is None
+    assert optimizer._pool is None
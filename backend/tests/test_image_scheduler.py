@@ -0,0 +1,61 @@
+import asyncio
+
+from app.images.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_FEATURED,
+    PRIORITY_GALLERY,
+    _PriorityLimiter,
+)
+
+
+async def test_limit_is_never_exceeded():
+    limiter = _PriorityLimiter("test", lambda: 2)
+    active = peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with limiter.slot(PRIORITY_GALLERY):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(work() for _ in range(10)))
+    assert peak == 2
+    assert limiter.stats()["active"] == 0
+
+
+async def test_waiters_are_served_by_priority_then_arrival():
+    limiter = _PriorityLimiter("test", lambda: 1)
+    order = []
+    await limiter.acquire(PRIORITY_GALLERY)
+
+    async def waiter(name, priority):
+        async with limiter.slot(priority):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(waiter("bg", PRIORITY_BACKGROUND)),
+        asyncio.create_task(waiter("gallery-1", PRIORITY_GALLERY)),
+        asyncio.create_task(waiter("gallery-2", PRIORITY_GALLERY)),
+        asyncio.create_task(waiter("featured", PRIORITY_FEATURED)),
+    ]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["featured", "gallery-1", "gallery-2", "bg"]
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    limiter = _PriorityLimiter("test", lambda: 1)
+    await limiter.acquire(PRIORITY_GALLERY)
+
+    cancelled = asyncio.create_task(limiter.acquire(PRIORITY_FEATURED))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+
+    limiter.release()
+    await asyncio.wait_for(limiter.acquire(PRIORITY_GALLERY), 1)
+    assert limiter.stats()["active"] == 1
@@ -0,0 +1,40 @@
+import pytest
+
+from app.steam import catalog
+
+
+@pytest.fixture
+async def fts(db):
+    await catalog.init_catalog()
+    if not catalog.is_available():
+        pytest.skip("SQLite 未编译 FTS5")
+
+
+def test_build_match_query():
+    assert catalog.build_match_query("Elden Ring") == '"elden"* "ring"*'
+    assert catalog.build_match_query("艾尔登法环") == '"艾 尔 登 法 环"'
+    assert catalog.build_match_query("dark 之魂") == '"dark"* "之 魂"'
+
+
+def test_parse_app_list_formats():
+    assert catalog.parse_app_list(b'{"applist": {"apps": [{"appid": 1, "name": "A"}]}}') == [(1, "A")]
+    assert catalog.parse_app_list(b"appid,name\n2,B\n3, \n") == [(2, "B")]
+
+
+async def test_exact_title_found_beyond_first_candidates(fts):
+    # 精确匹配的条目位于前 500 个 rowid 之后
+    apps = [(i, f"Dark Thing {i}") for i in range(1, 3000)]
+    apps.append((5000, "Dark"))
+    await catalog.import_apps(apps)
+
+    items = await catalog.search("dark", limit=5)
+    assert items[0]["id"] == 5000
+    assert items[0]["name"] == "Dark"
+
+
+async def test_cjk_and_appid_search(fts):
+    await catalog.import_apps([(1245620, "艾尔登法环"), (10, "Counter-Strike")])
+
+    assert [i["id"] for i in await catalog.search("艾尔登")] == [1245620]
+    assert [i["id"] for i in await catalog.search("counter str")] == [10]
+    assert [i["id"] for i in await catalog.search("10")] == [10]
@@ -0,0 +1,31 @@
+import httpx
+
+from app.config import settings
+from app.core import http
+from app.steam import api
+from app.steam.cache import app_details_cache
+
+
+async def test_app_details_cached_until_invalidated(db, monkeypatch):
+    monkeypatch.setattr(settings, "steam_request_delay", 0.0)
+    monkeypatch.setattr(settings, "steam_cache_ttl", 3600)
+    monkeypatch.setattr(settings, "steam_catalog_search", False)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.params["appids"])
+        return httpx.Response(200, json={"10": {"success": True, "data": {"name": "Alpha"}}})
+
+    http._clients["steam"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await app_details_cache.invalidate()
+    try:
+        assert await api.get_app_details(10) == {"name": "Alpha"}
+        assert await api.get_app_details(10) == {"name": "Alpha"}
+        assert requests == ["10"]
+
+        await app_details_cache.invalidate(10)
+        await api.get_app_details(10)
+        assert requests == ["10", "10"]
+    finally:
+        await app_details_cache.invalidate()
+        http._clients.pop("steam", None)
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.steam.ratelimit import TokenBucketLimiter
+
+
+async def test_requests_are_spaced_by_delay(monkeypatch):
+    monkeypatch.setattr(settings, "steam_request_delay", 0.05)
+    monkeypatch.setattr(settings, "steam_rate_burst", 1)
+    limiter = TokenBucketLimiter()
+
+    start = time.monotonic()
+    for _ in range(4):
+        await limiter.acquire()
+    # 第一个令牌立即可用，之后每个间隔 0.05s
+    assert time.monotonic() - start >= 0.14
+    assert limiter.acquired == 4
+
+
+async def test_burst_allows_immediate_requests(monkeypatch):
+    monkeypatch.setattr(settings, "steam_request_delay", 10.0)
+    monkeypatch.setattr(settings, "steam_rate_burst", 3)
+    limiter = TokenBucketLimiter()
+
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+    assert time.monotonic() - start < 0.1
+
+
+async def test_penalize_blocks_until_retry_after(monkeypatch):
+    monkeypatch.setattr(settings, "steam_request_delay", 0.0)
+    limiter = TokenBucketLimiter()
+    await limiter.acquire()
+
+    limiter.penalize(0.1)
+    start = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+    assert limiter.stats()["throttled"] == 1
@@ -0,0 +1,76 @@
+import httpx
+import pytest
+
+from app.api.auth import get_current_user
+from app.config import settings
+from app.main import app
+from app.wordpress.taxonomy import CategoryCache, category_cache
+
+SITE = "https://wp.test"
+
+
+class _WordPress:
+    def __init__(self, base_url=SITE):
+        self.base_url = base_url
+        self.calls = 0
+
+    async def list_terms(self, taxonomy, fields="id,name"):
+        self.calls += 1
+        return [{"id": 1, "name": "A &amp; B", "slug": "a-b"}, {"id": 2, "name": f"Round {self.calls}"}]
+
+
+def _age(cache, site, seconds):
+    loaded, index = cache._indexes[site]
+    cache._indexes[site] = (loaded - seconds, index)
+
+
+async def test_cached_until_ttl_expires(monkeypatch):
+    monkeypatch.setattr(settings, "wp_category_cache_ttl", 600)
+    cache = CategoryCache()
+    wp = _WordPress()
+
+    first = await cache.get(wp)
+    assert await cache.get(wp) is first
+    assert first.by_name["A & B"] == 1
+    assert (wp.calls, cache.hits) == (1, 1)
+
+    _age(cache, SITE, 601)
+    refreshed = await cache.get(wp)
+    assert refreshed.by_name["Round 2"] == 2
+    assert (wp.calls, cache.refreshes) == (2, 2)
+
+
+async def test_invalidate_single_site(monkeypatch):
+    monkeypatch.setattr(settings, "wp_category_cache_ttl", 600)
+    cache = CategoryCache()
+    wp, other = _WordPress(), _WordPress("https://other.test")
+    await cache.get(wp)
+    await cache.get(other)
+
+    cache.invalidate(SITE + "/")
+    await cache.get(wp)
+    await cache.get(other)
+
+    assert (wp.calls, other.calls) == (2, 1)
+
+
+@pytest.fixture
+async def api(db):
+    app.dependency_overrides[get_current_user] = lambda: "admin"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def test_delete_endpoint_invalidates_categories(api, monkeypatch):
+    monkeypatch.setattr(settings, "wp_category_cache_ttl", 600)
+    wp = _WordPress()
+    await category_cache.get(wp)
+
+    resp = await api.delete("/api/settings/wp-cache")
+
+    assert resp.json() == {"ok": True, "deleted_tags": 0, "deleted_media": 0}
+    assert SITE not in (await api.get("/api/settings/wp-cache")).json()["categories"]["sites"]
+    await category_cache.get(wp)
+    assert wp.calls == 2
+    category_cache.invalidate()
@@ -0,0 +1,25 @@
+from app.wordpress.media import media_filename, media_index, parse_filename, url_hash
+from app.wordpress.client import WordPressClient
+
+URL = "https://cdn.akamai.steamstatic.com/steam/apps/10/header.jpg?t=1"
+
+
+def test_filename_round_trip():
+    name = media_filename(10, 0, URL, ext="webp")
+    assert name == f"steam_10_0_{url_hash(URL)}.webp"
+    assert parse_filename(f"https://wp.test/wp-content/uploads/2024/01/{name}") == (10, url_hash(URL))
+
+
+def test_parse_filename_tolerates_wordpress_suffixes():
+    name = media_filename(10, 3, URL)[:-4] + "-scaled.jpg"
+    assert parse_filename(f"https://wp.test/uploads/{name}") == (10, url_hash(URL))
+    assert parse_filename("https://wp.test/uploads/other-image.jpg") is None
+
+
+async def test_lookup_after_remember(db):
+    wp = WordPressClient()
+    await media_index.remember(wp, 10, URL, 55, "steam_10_0.jpg", etag='"abc"')
+
+    assert await media_index.lookup(wp, 10, [URL, "https://cdn/other.jpg"]) == {URL: 55}
+    # 同一 URL 在其他游戏下不命中
+    assert await media_index.lookup(wp, 11, [URL]) == {}
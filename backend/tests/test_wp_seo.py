@@ -0,0 +1,58 @@
+import json
+
+import httpx
+import pytest
+
+from app.core import http
+from app.core.context import SEOData
+from app.wordpress import seo as seo_module
+from app.wordpress.client import WordPressClient
+
+SEO = SEOData(title="  Alpha下载  ", description="desc", keywords="a,b")
+
+
+@pytest.fixture
+def wordpress(monkeypatch):
+    """模拟 WordPress：create_meta 决定创建响应中带回的 meta"""
+    monkeypatch.setattr(seo_module, "_meta_on_create", {})
+    state = {"requests": [], "create_meta": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        state["requests"].append((request.url.path, body))
+        if request.url.path.endswith("/posts"):
+            return httpx.Response(201, json={"id": 5, "meta": state["create_meta"](body.get("meta", {}))})
+        return httpx.Response(200, json={"id": 5})
+
+    http._clients["wordpress"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield state
+    http._clients.pop("wordpress", None)
+
+
+async def test_sanitized_meta_counts_as_applied(wordpress):
+    # WordPress 修剪空白，并以列表形式返回未声明 single 的 meta
+    wordpress["create_meta"] = lambda meta: {k: [str(v).strip()] for k, v in meta.items()}
+    wp = WordPressClient()
+
+    for _ in range(2):
+        await seo_module.create_post_with_b2_seo(wp, SEO, title="Alpha", content="c")
+
+    assert [path for path, _ in wordpress["requests"]] == ["/wp-json/wp/v2/posts"] * 2
+    assert seo_module._meta_on_create[wp.base_url] is True
+
+
+async def test_unregistered_meta_falls_back_to_two_steps(wordpress):
+    wordpress["create_meta"] = lambda meta: []  # 未注册任何 meta
+    wp = WordPressClient()
+
+    await seo_module.create_post_with_b2_seo(wp, SEO, title="Alpha", content="c")
+    await seo_module.create_post_with_b2_seo(wp, SEO, title="Beta", content="c")
+
+    paths = [path for path, _ in wordpress["requests"]]
+    assert paths == [
+        "/wp-json/wp/v2/posts", "/wp-json/wp/v2/posts/5",
+        "/wp-json/wp/v2/posts", "/wp-json/wp/v2/posts/5",
+    ]
+    # 记住站点后，创建请求不再携带 SEO meta
+    assert "meta" not in wordpress["requests"][2][1]
+    assert wordpress["requests"][3][1]["meta"]["zrz_seo_title"] == SEO.title
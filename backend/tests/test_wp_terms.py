@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.db import crud
+from app.wordpress.taxonomy import TagCache
+
+SITE = "https://wp.test"
+
+
+@pytest.fixture(params=["native", "fallback"])
+async def session(request, db, monkeypatch):
+    """分别测试方言 upsert 与逐行 merge 回退"""
+    from app.db.engine import async_session, engine
+
+    if request.param == "fallback":
+        monkeypatch.setattr(engine.sync_engine.dialect, "name", "generic")
+    async with async_session() as session:
+        yield session
+
+
+async def test_upsert_wp_terms_overwrites(session):
+    await crud.upsert_wp_terms(session, SITE, "tags", [("rpg", "RPG", 1), ("indie", "Indie", 2)])
+    await crud.upsert_wp_terms(session, SITE, "tags", [("rpg", "Rpg", 3)])
+
+    assert await crud.get_wp_terms(session, SITE, "tags") == {"rpg": 3, "indie": 2}
+    assert await crud.get_wp_terms(session, SITE, "categories") == {}
+
+
+async def test_upsert_wp_media_keeps_source_url(session):
+    item = {"app_id": 10, "url_hash": "abcd1234", "media_id": 5, "filename": "a.jpg"}
+    await crud.upsert_wp_media(session, SITE, [{**item, "source_url": "https://cdn/a.jpg", "etag": '"e"'}])
+    # 回填条目不带 source_url / etag
+    await crud.upsert_wp_media(session, SITE, [{**item, "media_id": 6, "filename": "a-1.jpg"}])
+
+    from app.db.models import WPMediaIndex
+
+    session.expire_all()
+    row = await session.get(WPMediaIndex, (SITE, 10, "abcd1234"))
+    assert (row.media_id, row.filename) == (6, "a-1.jpg")
+    assert (row.source_url, row.etag) == ("https://cdn/a.jpg", '"e"')
+
+
+class _SlowWordPress:
+    base_url = SITE
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def list_terms(self, taxonomy):
+        self.started.set()
+        await self.release.wait()
+        return [{"id": 1, "name": "Stale"}]
+
+
+async def test_invalidate_cancels_running_prefetch(db):
+    cache = TagCache()
+    wp = _SlowWordPress()
+    await cache._ensure_loaded(wp)
+    await asyncio.wait_for(wp.started.wait(), 1)
+    task = cache._prefetch_tasks[SITE]
+
+    await cache.invalidate(SITE)
+    wp.release.set()
+    await asyncio.sleep(0)
+
+    assert task.cancelled()
+    assert cache.stats()["prefetching"] == []
+    assert SITE not in cache._terms
+    assert await cache._load(SITE) == {}
+
+
+class _FailingWordPress:
+    base_url = SITE
+
+    def __init__(self):
+        self.calls = 0
+
+    async def list_terms(self, taxonomy):
+        self.calls += 1
+        raise ConnectionError("down")
+
+
+async def test_failed_prefetch_backs_off(db, monkeypatch):
+    from app.wordpress import taxonomy
+
+    clock = [1000.0]
+    monkeypatch.setattr(taxonomy.time, "monotonic", lambda: clock[0])
+    cache = TagCache()
+    wp = _FailingWordPress()
+
+    async def settle():
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    await cache._ensure_loaded(wp)
+    await settle()
+    await cache._ensure_loaded(wp)
+    await settle()
+    assert wp.calls == 1
+
+    clock[0] += taxonomy._PREFETCH_RETRY + 1
+    await cache._ensure_loaded(wp)
+    await settle()
+    assert wp.calls == 2
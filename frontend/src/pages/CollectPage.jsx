@@ -36,6 +36,7 @@ function CollectPage() {
     const [options, setOptions] = useState({
         enable_rewrite: true,
         enable_analyze: true,
+        combined_ai: false,
         rewrite_style: 'resource_site',
         post_status: 'draft',
     });
@@ -141,6 +142,7 @@ function CollectPage() {
     };
 
     const formatPrice = (price) => {
+        if (price === null) return '—';  // 本地目录结果无价格信息
         if (!price) return '免费';
         const val = price.final / 100;
         return `¥${val.toFixed(2)}`;
@@ -199,6 +201,13 @@ function CollectPage() {
                             >
                                 启用 AI 分析（分类 + 标签 + SEO）
                             </Checkbox>
+                            <Checkbox
+                                checked={options.combined_ai}
+                                disabled={!options.enable_rewrite || !options.enable_analyze}
+                                onChange={(e) => setOptions({ ...options, combined_ai: e.target.checked })}
+                            >
+                                合并为单次 AI 调用
+                            </Checkbox>
                         </Space>
                     </Col>
                 </Row>